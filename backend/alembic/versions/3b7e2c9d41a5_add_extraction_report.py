@@ -0,0 +1,31 @@
+"""Add extraction report
+
+Revision ID: 3b7e2c9d41a5
+Revises: 86145da9400f
+Create Date: 2026-10-16 09:12:44.201337
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e2c9d41a5"
+down_revision: Union[str, Sequence[str], None] = "86145da9400f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "documents", sa.Column("extraction_report", sa.JSON(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("documents", "extraction_report")
@@ -0,0 +1,32 @@
+"""Add medical record edited at
+
+Revision ID: 5d0f3a8e6c21
+Revises: 3b7e2c9d41a5
+Create Date: 2026-10-16 11:40:02.518734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d0f3a8e6c21"
+down_revision: Union[str, Sequence[str], None] = "3b7e2c9d41a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "documents",
+        sa.Column("medical_record_edited_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("documents", "medical_record_edited_at")
@@ -0,0 +1,150 @@
+"""Move file data to blob store
+
+Revision ID: 9c2e4b7a1d38
+Revises: 5d0f3a8e6c21
+Create Date: 2026-10-16 15:05:31.774012
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.adapters.blob.local_blob_store import LocalBlobStore
+from app.core.config import config
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2e4b7a1d38"
+down_revision: Union[str, Sequence[str], None] = "5d0f3a8e6c21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows whose file is moved per committed batch. Files are read one at a
+# time, so memory holds a single file however large the batch.
+BATCH_SIZE = 500
+
+documents = sa.table(
+    "documents",
+    sa.column("id", sa.String),
+    sa.column("file_data", sa.LargeBinary),
+    sa.column("file_hash", sa.String),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every batch is committed on its own, so an interrupted upgrade resumes
+    # with the rows that still have no hash. The column is committed along
+    # with the first batch and is already there when the upgrade is rerun.
+    # A blob is always written before the hash referencing it.
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("documents")}
+    if "file_hash" not in columns:
+        op.add_column(
+            "documents", sa.Column("file_hash", sa.String(64), nullable=True)
+        )
+
+    store = LocalBlobStore(config.blob_store_dir)
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while True:
+            ids = connection.execute(
+                sa.select(documents.c.id)
+                .where(documents.c.file_hash.is_(None))
+                .order_by(documents.c.id)
+                .limit(BATCH_SIZE)
+            ).scalars().all()
+            if not ids:
+                break
+            hashes = []
+            for document_id in ids:
+                file_data = connection.execute(
+                    sa.select(documents.c.file_data).where(
+                        documents.c.id == document_id
+                    )
+                ).scalar_one()
+                hashes.append(
+                    {"document_id": document_id, "hash": store.put(bytes(file_data))}
+                )
+            connection.execute(
+                documents.update()
+                .where(documents.c.id == sa.bindparam("document_id"))
+                .values(file_hash=sa.bindparam("hash")),
+                hashes,
+            )
+
+    # file_data is only dropped once every blob can be read back
+    _verify_blobs(store)
+
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.alter_column("file_hash", existing_type=sa.String(64), nullable=False)
+        batch_op.drop_column("file_data")
+    indexes = {index["name"] for index in sa.inspect(bind).get_indexes("documents")}
+    if "ix_documents_file_hash" not in indexes:
+        op.create_index("ix_documents_file_hash", "documents", ["file_hash"])
+
+
+def _verify_blobs(store: LocalBlobStore) -> None:
+    connection = op.get_bind()
+    after_id = None
+    while True:
+        query = (
+            sa.select(documents.c.id, documents.c.file_hash)
+            .order_by(documents.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if after_id is not None:
+            query = query.where(documents.c.id > after_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            break
+        for document_id, file_hash in rows:
+            if not store.exists(file_hash):
+                raise RuntimeError(
+                    f"Blob {file_hash} of document {document_id} is missing, "
+                    f"file_data is kept"
+                )
+        after_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_documents_file_hash", table_name="documents")
+    op.add_column("documents", sa.Column("file_data", sa.LargeBinary(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        store = LocalBlobStore(config.blob_store_dir)
+        after_id = None
+        while True:
+            query = (
+                sa.select(documents.c.id, documents.c.file_hash)
+                .where(documents.c.file_data.is_(None))
+                .order_by(documents.c.id)
+                .limit(BATCH_SIZE)
+            )
+            if after_id is not None:
+                query = query.where(documents.c.id > after_id)
+            rows = connection.execute(query).all()
+            if not rows:
+                break
+            for document_id, file_hash in rows:
+                file_data = store.get(file_hash)
+                if file_data is None:
+                    raise RuntimeError(
+                        f"Blob {file_hash} of document {document_id} is missing"
+                    )
+                connection.execute(
+                    documents.update()
+                    .where(documents.c.id == document_id)
+                    .values(file_data=file_data)
+                )
+            after_id = rows[-1][0]
+
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.alter_column(
+            "file_data", existing_type=sa.LargeBinary(), nullable=False
+        )
+        batch_op.drop_column("file_hash")
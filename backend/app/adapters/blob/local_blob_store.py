@@ -0,0 +1,61 @@
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+from app.domain.blob_store import BlobStore, blob_hash
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs stored one file per SHA-256 digest under a directory, sharded by
+    the first two bytes of the digest (ab/cd/abcd...) so no directory grows
+    too large. Files are written to a temporary name and renamed into place,
+    so a blob is either absent or complete, also to concurrent writers of
+    the same content.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        if not _DIGEST_PATTERN.fullmatch(digest):
+            raise ValueError(f"Invalid blob digest: {digest}")
+        return self.directory / digest[:2] / digest[2:4] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = blob_hash(data)
+        path = self._path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                # On disk before the row referencing it is committed
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Stored blob {digest[:12]} ({len(data)} bytes)")
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            return self._path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
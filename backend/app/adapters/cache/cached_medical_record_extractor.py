@@ -0,0 +1,155 @@
+import logging
+from typing import Iterable, Iterator, Optional
+from app.domain.medical_record_extractor import (
+    IncrementalExtraction,
+    MedicalRecordExtractor,
+    normalize_text,
+)
+from app.domain.models.medical_record import MedicalRecord
+from app.domain.models.record_extraction import RecordExtraction
+from app.adapters.cache.keys import content_key
+from app.adapters.cache.tiered_cache import TieredCache
+from app.adapters.mappers.record_mapper import (
+    deserialize_medical_record,
+    serialize_dataclass,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CachedMedicalRecordExtractor(MedicalRecordExtractor):
+    """
+    Serves records for texts that were already extracted from a cache keyed
+    by the normalized text and the wrapped extractor settings, which include
+    its rules version, so identical texts skip NLP entirely.
+
+    Texts are normalized before being extracted too, so a cached record is
+    always the one the wrapped extractor returns for the normalized text.
+    """
+
+    def __init__(
+        self,
+        extractor: MedicalRecordExtractor,
+        cache: TieredCache,
+        settings: Optional[dict] = None,
+    ):
+        self.extractor = extractor
+        self.cache = cache
+        # The settings are fixed once the extractor is built; records cached
+        # under other settings are never served
+        self._settings = settings if settings is not None else extractor.settings()
+
+    def settings(self) -> dict:
+        return self._settings
+
+    def extract(self, text: str) -> MedicalRecord:
+        if not isinstance(text, str):
+            return self.extractor.extract(text)
+        text = normalize_text(text)
+        key = self._key(text)
+        record = self._get(key)
+        if record is not None:
+            logger.info(f"Medical record cache hit {key[:12]}")
+            return record
+
+        record = self.extractor.extract(text)
+        self._set(key, record)
+        return record
+
+    def extract_many(
+        self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1
+    ) -> Iterator[RecordExtraction]:
+        batch = []
+        for index, text in enumerate(texts):
+            batch.append((index, text))
+            if len(batch) >= batch_size:
+                yield from self._extract_batch(batch, batch_size, n_process)
+                batch = []
+        if batch:
+            yield from self._extract_batch(batch, batch_size, n_process)
+
+    def _extract_batch(
+        self, batch: list, batch_size: int, n_process: int
+    ) -> Iterator[RecordExtraction]:
+        # Hits are answered from the cache and only the misses are sent, in
+        # one call, to the wrapped extractor
+        results = {}
+        misses = []
+        for index, text in batch:
+            if not isinstance(text, str):
+                # Left to the wrapped extractor to report
+                misses.append((index, None, text))
+                continue
+            text = normalize_text(text)
+            key = self._key(text)
+            record = self._get(key)
+            if record is not None:
+                results[index] = RecordExtraction(index=index, record=record)
+            else:
+                misses.append((index, key, text))
+
+        if misses:
+            extracted = self.extractor.extract_many(
+                (text for _, _, text in misses),
+                batch_size=batch_size,
+                n_process=n_process,
+            )
+            for (index, key, _), result in zip(misses, extracted):
+                if result.ok and key is not None:
+                    self._set(key, result.record)
+                results[index] = RecordExtraction(
+                    index=index, record=result.record, error=result.error
+                )
+
+        for index, _ in batch:
+            yield results[index]
+
+    def start_incremental(self) -> IncrementalExtraction:
+        return CachedIncrementalExtraction(self)
+
+    def _key(self, normalized_text: str) -> str:
+        return content_key(
+            "medical_record", normalized_text.encode("utf-8"), self._settings
+        )
+
+    def _get(self, key: str) -> Optional[MedicalRecord]:
+        value = self.cache.get(key)
+        if value is None:
+            return None
+        # Deserialized on every hit, so callers never share a record
+        return deserialize_medical_record(value) or MedicalRecord()
+
+    def _set(self, key: str, record: MedicalRecord) -> None:
+        self.cache.set(key, serialize_dataclass(record))
+
+
+class CachedIncrementalExtraction(IncrementalExtraction):
+    """
+    Feeds pages to the wrapped extractor's incremental extraction as they
+    arrive, and on finish serves the record from the cache when the whole
+    text was already extracted.
+    """
+
+    def __init__(self, extractor: CachedMedicalRecordExtractor):
+        super().__init__(extractor)
+        self.inner = extractor.extractor.start_incremental()
+
+    def add_page(self, text: str) -> None:
+        super().add_page(text)
+        self.inner.add_page(text)
+
+    def finish(self) -> MedicalRecord:
+        text = self.text
+        normalized = normalize_text(text)
+        key = self.extractor._key(normalized)
+        record = self.extractor._get(key)
+        if record is not None:
+            logger.info(f"Medical record cache hit {key[:12]}")
+            return record
+
+        record = self.inner.finish()
+        # The pages were extracted as they came, which only matches what
+        # extract() caches when the text needed no normalization
+        if text == normalized:
+            self.extractor._set(key, record)
+        return record
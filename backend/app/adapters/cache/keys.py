@@ -0,0 +1,16 @@
+import hashlib
+import json
+
+
+def content_key(namespace: str, data: bytes, settings: dict) -> str:
+    """
+    Content-addressed cache key: the same bytes processed with the same
+    settings always map to the same key.
+    """
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
@@ -0,0 +1,58 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LRUMemoryCache:
+    """
+    Thread-safe in-memory cache capped at max_bytes, evicting the least
+    recently used entries first. Values must be JSON-serializable, and each is
+    counted by the size of its JSON encoding, as DiskCache stores it.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def set(self, key: str, value: Any) -> None:
+        # Measured outside the lock, a large text takes a while to encode
+        size = len(json.dumps(value).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
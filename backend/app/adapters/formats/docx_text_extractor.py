@@ -0,0 +1,107 @@
+import zipfile
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from app.domain.text_extractor import TextExtractor
+from app.domain.models.text_extraction import TextExtraction
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY = f"{W_NS}body"
+W_P = f"{W_NS}p"
+W_R = f"{W_NS}r"
+W_T = f"{W_NS}t"
+W_TAB = f"{W_NS}tab"
+W_BR = f"{W_NS}br"
+W_TC = f"{W_NS}tc"
+W_TR = f"{W_NS}tr"
+W_TBL = f"{W_NS}tbl"
+# Alternative renderings of the same content, e.g. a text box as a drawing
+# and again as VML; only the preferred one (mc:Choice) is read
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+TABLE_CELL_SEPARATOR = " | "
+
+
+class DocxTextExtractor(TextExtractor):
+    """
+    Streams word/document.xml and emits paragraphs and table rows in body
+    order. Parsed elements are cleared as soon as their text is collected,
+    so memory stays flat on long documents.
+    """
+
+    def extract(self, file_data: bytes, file_type: str) -> TextExtraction:
+        with zipfile.ZipFile(BytesIO(file_data)) as archive:
+            with archive.open("word/document.xml") as document_xml:
+                lines = list(self._iter_lines(document_xml))
+        return TextExtraction(text="\n".join(lines).strip())
+
+    def _iter_lines(self, document_xml):
+        # Text of every open paragraph with its count of open runs, innermost
+        # last (text boxes nest paragraphs inside a run of the outer one), and
+        # the cells/rows of every open table (tables can be nested in cells)
+        paragraphs: list[tuple[list[str], int]] = []
+        cells: list[list[str]] = []
+        cell_paragraphs: list[list[str]] = []
+        table_depth = 0
+        fallback_depth = 0
+        body = None
+
+        for event, element in ET.iterparse(document_xml, events=("start", "end")):
+            tag = element.tag
+            if tag == MC_FALLBACK:
+                fallback_depth += 1 if event == "start" else -1
+                continue
+            if fallback_depth:
+                continue
+
+            if event == "start":
+                if tag == W_BODY:
+                    body = element
+                elif tag == W_P:
+                    paragraphs.append(([], 0))
+                elif tag == W_R and paragraphs:
+                    text, runs = paragraphs[-1]
+                    paragraphs[-1] = (text, runs + 1)
+                elif tag == W_TBL:
+                    table_depth += 1
+                elif tag == W_TR:
+                    cells.append([])
+                elif tag == W_TC:
+                    cell_paragraphs.append([])
+                continue
+
+            # Text, tabs and breaks only count inside a run: w:tab is also a
+            # tab stop definition in the paragraph properties
+            in_run = bool(paragraphs) and paragraphs[-1][1] > 0
+            if tag == W_T and in_run:
+                paragraphs[-1][0].append(element.text or "")
+            elif tag == W_TAB and in_run:
+                paragraphs[-1][0].append("\t")
+            elif tag == W_BR and in_run:
+                paragraphs[-1][0].append("\n")
+            elif tag == W_R and paragraphs:
+                text, runs = paragraphs[-1]
+                paragraphs[-1] = (text, runs - 1)
+            elif tag == W_P:
+                text = "".join(paragraphs.pop()[0])
+                if table_depth:
+                    cell_paragraphs[-1].append(text)
+                else:
+                    yield text
+            elif tag == W_TC:
+                cell_text = " ".join(p for p in cell_paragraphs.pop() if p)
+                cells[-1].append(cell_text)
+            elif tag == W_TR:
+                row = TABLE_CELL_SEPARATOR.join(cells.pop())
+                if table_depth > 1:
+                    # Rows of a nested table become part of the enclosing cell
+                    cell_paragraphs[-1].append(row)
+                else:
+                    yield row
+            elif tag == W_TBL:
+                table_depth -= 1
+
+            if tag in (W_P, W_TBL):
+                element.clear()
+                # Drop finished top-level blocks so the tree does not grow
+                if table_depth == 0 and not paragraphs and body is not None:
+                    body.clear()
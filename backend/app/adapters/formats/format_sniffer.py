@@ -0,0 +1,54 @@
+import zipfile
+from io import BytesIO
+
+FORMAT_PDF = "pdf"
+FORMAT_JPEG = "jpeg"
+FORMAT_PNG = "png"
+FORMAT_DOCX = "docx"
+FORMAT_TXT = "txt"
+
+# Extensions that name the same format
+EXTENSION_ALIASES = {"jpg": FORMAT_JPEG}
+
+# The PDF spec allows leading junk before the header, readers scan 1KB for it
+PDF_HEADER_SEARCH_BYTES = 1024
+TEXT_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+
+def normalize_format(file_type: str) -> str:
+    file_type = file_type.lower().lstrip(".")
+    return EXTENSION_ALIASES.get(file_type, file_type)
+
+
+def sniff_format(file_data: bytes, declared_type: str) -> str:
+    """
+    Detect the real format of a file from its leading bytes.
+
+    Args:
+        file_data: Raw file bytes
+        declared_type: Type derived from the filename extension
+
+    Returns:
+        Detected format, or the normalized declared type when the content has
+        no recognizable signature
+    """
+    if b"%PDF-" in file_data[:PDF_HEADER_SEARCH_BYTES]:
+        return FORMAT_PDF
+    if file_data.startswith(b"\xff\xd8\xff"):
+        return FORMAT_JPEG
+    if file_data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return FORMAT_PNG
+    if file_data.startswith(b"PK\x03\x04") and _is_docx(file_data):
+        return FORMAT_DOCX
+    if file_data.startswith(TEXT_BOMS):
+        return FORMAT_TXT
+    return normalize_format(declared_type)
+
+
+def _is_docx(file_data: bytes) -> bool:
+    try:
+        with zipfile.ZipFile(BytesIO(file_data)) as archive:
+            # Only the central directory is read, not the members
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
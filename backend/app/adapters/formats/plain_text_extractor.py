@@ -0,0 +1,48 @@
+import codecs
+from typing import Optional
+from app.domain.text_extractor import TextExtractor
+from app.domain.models.text_extraction import TextExtraction
+
+# Share of NUL bytes at odd/even positions above which BOM-less text is
+# taken to be UTF-16 (ASCII-range characters have a zero high byte)
+UTF16_NUL_RATIO = 0.3
+SAMPLE_BYTES = 4096
+
+
+class PlainTextExtractor(TextExtractor):
+    """
+    Decodes text files, detecting UTF-8/UTF-16 with or without BOM and falling
+    back to Windows-1252, which clinic software on Windows commonly writes.
+    """
+
+    def extract(self, file_data: bytes, file_type: str) -> TextExtraction:
+        return TextExtraction(text=decode_text(file_data))
+
+
+def decode_text(file_data: bytes) -> str:
+    encoding = _detect_unicode_encoding(file_data)
+    if encoding:
+        return file_data.decode(encoding, errors="ignore")
+
+    try:
+        return file_data.decode("utf-8")
+    except UnicodeDecodeError:
+        return file_data.decode("cp1252", errors="ignore")
+
+
+def _detect_unicode_encoding(file_data: bytes) -> Optional[str]:
+    if file_data.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if file_data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    sample = file_data[:SAMPLE_BYTES]
+    if len(sample) < 2:
+        return None
+    even_nuls = sample[0::2].count(0) / len(sample[0::2])
+    odd_nuls = sample[1::2].count(0) / len(sample[1::2])
+    if odd_nuls > UTF16_NUL_RATIO and even_nuls < UTF16_NUL_RATIO:
+        return "utf-16-le"
+    if even_nuls > UTF16_NUL_RATIO and odd_nuls < UTF16_NUL_RATIO:
+        return "utf-16-be"
+    return None
@@ -0,0 +1,69 @@
+import logging
+import time
+from typing import Callable, Optional
+from app.domain.text_extractor import TextExtractor
+from app.domain.models.text_extraction import TextExtraction
+from app.adapters.formats.format_sniffer import normalize_format, sniff_format
+
+logger = logging.getLogger(__name__)
+
+
+class TextExtractorRegistry(TextExtractor):
+    """
+    Dispatches each file to the extractor registered for its format. The
+    format is sniffed from the content, so a mislabeled upload still reaches
+    the right extractor, and new formats only need a register() call.
+    """
+
+    def __init__(self):
+        self._extractors: dict[str, TextExtractor] = {}
+
+    def register(self, file_format: str, extractor: TextExtractor) -> None:
+        self._extractors[normalize_format(file_format)] = extractor
+
+    def formats(self) -> list[str]:
+        return sorted(self._extractors)
+
+    def settings(self) -> dict:
+        return {
+            file_format: extractor.settings()
+            for file_format, extractor in self._extractors.items()
+        }
+
+    def extract(self, file_data: bytes, file_type: str) -> TextExtraction:
+        return self._extract(file_data, file_type)
+
+    def extract_streaming(
+        self, file_data: bytes, file_type: str, on_page: Callable[[str], None]
+    ) -> TextExtraction:
+        return self._extract(file_data, file_type, on_page)
+
+    def _extract(
+        self,
+        file_data: bytes,
+        file_type: str,
+        on_page: Optional[Callable[[str], None]] = None,
+    ) -> TextExtraction:
+        file_format = sniff_format(file_data, file_type)
+        if file_format != normalize_format(file_type):
+            logger.info(f"File declared as {file_type} was detected as {file_format}")
+
+        extractor = self._extractors.get(file_format)
+        if extractor is None:
+            logger.error(f"No text extractor registered for format: {file_format}")
+            return TextExtraction(text="")
+
+        try:
+            start_time = time.time()
+            if on_page is None:
+                result = extractor.extract(file_data, file_format)
+            else:
+                result = extractor.extract_streaming(file_data, file_format, on_page)
+            duration = time.time() - start_time
+            logger.info(
+                f"Text extraction for {file_format} took {duration:.2f} seconds"
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Text extraction failed for {file_format}: {e}")
+            return TextExtraction(text="")
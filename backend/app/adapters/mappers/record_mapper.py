@@ -0,0 +1,181 @@
+from datetime import datetime
+from dataclasses import asdict, is_dataclass
+from typing import Any, Optional
+from app.domain.models.medical_record import MedicalRecord
+from app.domain.models.pet_info import PetInfo
+from app.domain.models.veterinary_info import VeterinaryInfo
+from app.domain.models.visit import Visit
+from app.domain.models.physical_examination import PhysicalExamination
+from app.domain.models.medication import Medication
+from app.domain.models.laboratory_test import LaboratoryTest
+from app.domain.models.vaccination import Vaccination
+from app.domain.models.text_extraction import ExtractionReport, PageExtraction
+
+# JSON forms of the domain records, shared by the database, the API and the
+# caches so none of them depends on another for it
+
+
+def serialize_dataclass(obj: Any) -> Any:
+    if obj is None:
+        return None
+
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+
+    if isinstance(obj, list):
+        return [serialize_dataclass(item) for item in obj]
+
+    if is_dataclass(obj):
+        result = {}
+        for key, value in asdict(obj).items():
+            result[key] = serialize_dataclass(value)
+        return result
+
+    if isinstance(obj, dict):
+        return {key: serialize_dataclass(value) for key, value in obj.items()}
+
+    return obj
+
+
+def serialize_extraction_report(report: Optional[ExtractionReport]) -> Optional[dict]:
+    if report is None:
+        return None
+
+    data = serialize_dataclass(report)
+    data["pages_by_method"] = report.pages_by_method()
+    data["pages_by_tier"] = report.pages_by_tier()
+    data["timed_out_pages"] = report.timed_out_pages()
+    data["partial"] = bool(data["timed_out_pages"])
+    return data
+
+
+def deserialize_extraction_report(data: Optional[dict]) -> Optional[ExtractionReport]:
+    if data is None:
+        return None
+
+    return ExtractionReport(
+        pages=[
+            PageExtraction(
+                page_number=p.get("page_number"),
+                method=p.get("method"),
+                tier=p.get("tier"),
+                confidence=p.get("confidence"),
+                timed_out=p.get("timed_out", False),
+            )
+            for p in data.get("pages", [])
+        ]
+    )
+
+
+def _parse_date(date_str: Optional[str]) -> Optional[datetime]:
+    if not date_str:
+        return None
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        return None
+
+
+def deserialize_medical_record(data: Optional[dict]) -> Optional[MedicalRecord]:
+    """
+    Rebuild the MedicalRecord dataclasses from their serialize_dataclass()
+    form, as stored in medical_record_data.
+    """
+    if not data:
+        return None
+
+    pet_info = None
+    if data.get("pet_info"):
+        p = data["pet_info"]
+        pet_info = PetInfo(
+            name=p.get("name"),
+            species=p.get("species"),
+            breed=p.get("breed"),
+            birth_date=_parse_date(p.get("birth_date")),
+            sex=p.get("sex"),
+            reproductive_status=p.get("reproductive_status"),
+            weight=p.get("weight"),
+            microchip=p.get("microchip"),
+            hair_type=p.get("hair_type"),
+            coat_color=p.get("coat_color"),
+        )
+
+    veterinary_info = None
+    if data.get("veterinary_info"):
+        v = data["veterinary_info"]
+        veterinary_info = VeterinaryInfo(
+            clinic_name=v.get("clinic_name"),
+            clinic_address=v.get("clinic_address"),
+            clinic_phone=v.get("clinic_phone"),
+        )
+
+    visits = [_deserialize_visit(v) for v in data.get("visits") or []]
+
+    return MedicalRecord(
+        pet_info=pet_info, veterinary_info=veterinary_info, visits=visits
+    )
+
+
+def _deserialize_visit(v: dict) -> Visit:
+    phys_exam = None
+    if v.get("physical_examination"):
+        pe = v["physical_examination"]
+        phys_exam = PhysicalExamination(
+            weight=pe.get("weight"),
+            temperature=pe.get("temperature"),
+            heart_rate=pe.get("heart_rate"),
+            respiratory_rate=pe.get("respiratory_rate"),
+            mucous_membranes=pe.get("mucous_membranes"),
+            crt=pe.get("crt"),
+            hydration_status=pe.get("hydration_status"),
+            general_condition=pe.get("general_condition"),
+            abdominal_palpation=pe.get("abdominal_palpation"),
+            findings=pe.get("findings", []),
+        )
+
+    treatments = [
+        Medication(
+            name=t.get("name"),
+            dosage=t.get("dosage"),
+            frequency=t.get("frequency"),
+            duration=t.get("duration"),
+            route=t.get("route"),
+            observations=t.get("observations"),
+        )
+        for t in v.get("treatment") or []
+    ]
+
+    lab_tests = [
+        LaboratoryTest(
+            test_name=l.get("test_name"),
+            test_date=_parse_date(l.get("test_date")),
+            results=l.get("results"),
+            findings=l.get("findings", []),
+        )
+        for l in v.get("laboratory_tests") or []
+    ]
+
+    vaccinations = [
+        Vaccination(
+            vaccine_name=vac.get("vaccine_name"),
+            date_administered=_parse_date(vac.get("date_administered")),
+            next_dose_date=_parse_date(vac.get("next_dose_date")),
+            applied=vac.get("applied", False),
+        )
+        for vac in v.get("vaccinations") or []
+    ]
+
+    return Visit(
+        visit_date=_parse_date(v.get("visit_date")),
+        visit_type=v.get("visit_type"),
+        clinic_name=v.get("clinic_name"),
+        reason=v.get("reason"),
+        anamnesis=v.get("anamnesis"),
+        physical_examination=phys_exam,
+        diagnosis=v.get("diagnosis", []),
+        treatment=treatments,
+        plan=v.get("plan"),
+        laboratory_tests=lab_tests,
+        vaccinations=vaccinations,
+        observations=v.get("observations"),
+    )
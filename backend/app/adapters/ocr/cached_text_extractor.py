@@ -0,0 +1,69 @@
+import logging
+from typing import Callable, Optional
+from dataclasses import asdict
+from app.domain.text_extractor import TextExtractor
+from app.domain.models.text_extraction import (
+    ExtractionReport,
+    PageExtraction,
+    TextExtraction,
+)
+from app.adapters.cache.keys import content_key
+from app.adapters.cache.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+
+class CachedTextExtractor(TextExtractor):
+    """
+    Serves repeated uploads of the same file from a content-addressed cache
+    keyed by the file bytes, the file type and the wrapped engine settings.
+    """
+
+    def __init__(self, extractor: TextExtractor, cache: TieredCache):
+        self.extractor = extractor
+        self.cache = cache
+
+    def settings(self) -> dict:
+        return self.extractor.settings()
+
+    def extract(self, file_data: bytes, file_type: str) -> TextExtraction:
+        return self._extract(file_data, file_type)
+
+    def extract_streaming(
+        self, file_data: bytes, file_type: str, on_page: Callable[[str], None]
+    ) -> TextExtraction:
+        # Cache hits are returned whole, without calling on_page
+        return self._extract(file_data, file_type, on_page)
+
+    def _extract(
+        self,
+        file_data: bytes,
+        file_type: str,
+        on_page: Optional[Callable[[str], None]] = None,
+    ) -> TextExtraction:
+        key = content_key(
+            f"document:{file_type.lower()}", file_data, self.extractor.settings()
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"OCR cache hit for {file_type} document {key[:12]}")
+            return _from_cache_value(cached)
+
+        if on_page is None:
+            result = self.extractor.extract(file_data, file_type)
+        else:
+            result = self.extractor.extract_streaming(file_data, file_type, on_page)
+        # Empty text is also what a failed extraction returns, and timed out
+        # pages are partial, so neither is cached to let them be retried.
+        if result.text and not result.report.timed_out_pages():
+            self.cache.set(key, asdict(result))
+        return result
+
+
+def _from_cache_value(value: dict) -> TextExtraction:
+    return TextExtraction(
+        text=value["text"],
+        report=ExtractionReport(
+            pages=[PageExtraction(**page) for page in value["report"]["pages"]]
+        ),
+    )
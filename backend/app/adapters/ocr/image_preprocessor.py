@@ -0,0 +1,96 @@
+import logging
+import time
+from typing import Optional
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# DPI metadata below this is almost always a camera default (72/96), not a
+# real scan resolution, so the resolution is estimated from the pixel size.
+MIN_TRUSTED_DPI = 100
+# A4 width in inches, used to estimate the resolution of photos of a page
+ASSUMED_PAGE_WIDTH_INCHES = 8.27
+# Resizing by less than this fraction is not worth the resampling cost
+RESIZE_TOLERANCE = 0.1
+
+
+class ImagePreprocessor:
+    """
+    Normalizes page images before OCR: applies EXIF orientation, converts to
+    grayscale, resamples to a target DPI and optionally binarizes.
+    """
+
+    def __init__(
+        self,
+        target_dpi: int = 200,
+        grayscale: bool = True,
+        binarize: bool = False,
+        binarize_threshold: int = 160,
+    ):
+        self.target_dpi = target_dpi
+        self.grayscale = grayscale
+        self.binarize = binarize
+        self.binarize_threshold = binarize_threshold
+
+    def settings(self) -> dict:
+        return {
+            "target_dpi": self.target_dpi,
+            "grayscale": self.grayscale,
+            "binarize": self.binarize,
+            "binarize_threshold": self.binarize_threshold,
+        }
+
+    def process(
+        self, image: Image.Image, source_dpi: Optional[float] = None
+    ) -> Image.Image:
+        """
+        Args:
+            image: Page image
+            source_dpi: Known resolution of the image (e.g. the PDF render DPI).
+                When omitted it is read from the image metadata or estimated.
+
+        Returns:
+            Preprocessed image ready for OCR
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        image = ImageOps.exif_transpose(image)
+        timings["exif_transpose"] = time.perf_counter() - start
+
+        if self.grayscale and image.mode != "L":
+            start = time.perf_counter()
+            image = image.convert("L")
+            timings["grayscale"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        image = self._resample(image, source_dpi or self._estimate_dpi(image))
+        timings["resample"] = time.perf_counter() - start
+
+        if self.binarize:
+            start = time.perf_counter()
+            threshold = self.binarize_threshold
+            image = image.convert("L").point(lambda p: 255 if p > threshold else 0)
+            timings["binarize"] = time.perf_counter() - start
+
+        logger.info(
+            "Image preprocessing took "
+            + ", ".join(f"{step}={t * 1000:.1f}ms" for step, t in timings.items())
+        )
+        return image
+
+    def _estimate_dpi(self, image: Image.Image) -> float:
+        dpi = image.info.get("dpi")
+        if dpi and dpi[0] >= MIN_TRUSTED_DPI:
+            return float(dpi[0])
+        # Assume the page fills the shorter side of the photo
+        return min(image.size) / ASSUMED_PAGE_WIDTH_INCHES
+
+    def _resample(self, image: Image.Image, source_dpi: float) -> Image.Image:
+        scale = self.target_dpi / source_dpi
+        if abs(scale - 1) < RESIZE_TOLERANCE:
+            return image
+
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        resample = Image.Resampling.LANCZOS if scale < 1 else Image.Resampling.BICUBIC
+        return image.resize(size, resample=resample)
@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import time
+import concurrent.futures
+from typing import Callable, Iterable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_shared_lock = threading.Lock()
+_shared: Optional["OCRScheduler"] = None
+
+
+class OCRScheduler:
+    """
+    Process-wide executor for CPU-bound OCR work. Every page of every request
+    is queued here, so the number of pages being OCR'd at once never exceeds
+    the number of workers, however many uploads arrive concurrently.
+
+    Tesseract parallelizes internally with OpenMP, which oversubscribes the
+    CPU when several pages run side by side. The scheduler caps Tesseract's
+    own threads (OMP_THREAD_LIMIT) and parallelizes across pages instead.
+    """
+
+    def __init__(self, workers: Optional[int] = None, tesseract_threads: int = 1):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        # Applied to the process by shared_scheduler, reported in stats
+        self.tesseract_threads = tesseract_threads
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="ocr"
+        )
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        logger.info(
+            f"OCR scheduler started with {self.workers} workers, "
+            f"{tesseract_threads} Tesseract thread(s) each"
+        )
+
+    def submit(self, fn: Callable[..., R], *args) -> "concurrent.futures.Future[R]":
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.queued += 1
+        return self._executor.submit(self._run, submitted_at, fn, *args)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """
+        Run fn over items on the scheduler and return the results in order.
+        Must not be called from a scheduler worker, which would deadlock
+        once every worker waits on tasks queued behind it.
+        """
+        futures = [self.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def _run(self, submitted_at: float, fn: Callable[..., R], *args) -> R:
+        started_at = time.monotonic()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds += started_at - submitted_at
+        failed = False
+        try:
+            return fn(*args)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.failed += failed
+                self.busy_seconds += time.monotonic() - started_at
+
+    def stats(self) -> dict:
+        with self._lock:
+            uptime = time.monotonic() - self._started_at
+            return {
+                "workers": self.workers,
+                "tesseract_threads": self.tesseract_threads,
+                "queue_length": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "utilization": self.running / self.workers,
+                "average_utilization": (
+                    self.busy_seconds / (self.workers * uptime) if uptime else 0.0
+                ),
+                "average_wait_seconds": (
+                    self.wait_seconds / self.completed if self.completed else 0.0
+                ),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def shared_scheduler(
+    workers: Optional[int] = None, tesseract_threads: int = 1
+) -> OCRScheduler:
+    """
+    The process-wide scheduler, created by the first call with its arguments;
+    later calls return it as it is. Creating it caps Tesseract's threads for
+    the whole process, once.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            # Read by the tesseract binary and by libtesseract when a worker
+            # process loads it, both of which inherit this environment
+            os.environ["OMP_THREAD_LIMIT"] = str(tesseract_threads)
+            _shared = OCRScheduler(workers, tesseract_threads)
+        return _shared
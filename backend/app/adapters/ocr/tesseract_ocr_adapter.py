@@ -1,70 +1,476 @@
 import pytesseract
 import logging
+import subprocess
+import tempfile
 import time
-import concurrent.futures
-from pdf2image import convert_from_bytes
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple, Optional
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pdf2image.exceptions import PDFPopplerTimeoutError
 from PIL import Image
 from io import BytesIO
 from app.domain.text_extractor import TextExtractor
+from app.adapters.cache.keys import content_key
+from app.adapters.cache.tiered_cache import TieredCache
+from app.adapters.ocr.image_preprocessor import ImagePreprocessor
+from app.adapters.ocr.ocr_scheduler import OCRScheduler, shared_scheduler
+from app.domain.models.text_extraction import (
+    ExtractionReport,
+    PageExtraction,
+    TextExtraction,
+    PAGE_METHOD_OCR,
+    PAGE_METHOD_TEXT_LAYER,
+    OCR_TIER_ACCURATE,
+    OCR_TIER_FAST,
+)
 
 logger = logging.getLogger(__name__)
 
+# pdf2image's default rendering resolution, used when no preprocessor is set
+DEFAULT_PDF_DPI = 200
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+class OCRTimeoutError(Exception):
+    pass
+
+
+class OCRResult(NamedTuple):
+    text: str
+    tier: Optional[str] = None
+    confidence: Optional[float] = None
+    timed_out: bool = False
+
+
+@contextmanager
+def _tesseract_timeout():
+    # pytesseract kills the tesseract process on timeout and raises a bare
+    # RuntimeError with this message
+    try:
+        yield
+    except RuntimeError as e:
+        if str(e) == "Tesseract process timeout":
+            raise OCRTimeoutError(str(e)) from e
+        raise
+
 
 class TesseractOCRAdapter(TextExtractor):
-    def extract_text(self, file_data: bytes, file_type: str) -> str:
+    engine_name = "tesseract"
+
+    def __init__(
+        self,
+        pdf_page_window: int = 4,
+        scheduler: Optional[OCRScheduler] = None,
+        lang: str = "eng",
+        use_pdf_text_layer: bool = True,
+        text_layer_min_chars: int = 20,
+        page_cache: Optional[TieredCache] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        tiered: bool = False,
+        fast_scale: float = 0.5,
+        fast_config: str = "--psm 6",
+        confidence_threshold: float = 80.0,
+        page_timeout: Optional[float] = None,
+        document_timeout: Optional[float] = None,
+    ):
+        # Number of PDF pages rasterized at once. Pages are OCR'd and released
+        # window by window so peak memory does not grow with the page count.
+        self.pdf_page_window = max(1, pdf_page_window)
+        # Shared executor that runs the OCR of every page, across requests
+        self.scheduler = scheduler or shared_scheduler()
+        self.lang = lang
+        self.use_pdf_text_layer = use_pdf_text_layer
+        # Pages whose embedded text is shorter than this are treated as scanned
+        self.text_layer_min_chars = text_layer_min_chars
+        # Optional cache of OCR results per rendered page image
+        self.page_cache = page_cache
+        self.preprocessor = preprocessor
+        # Tiered mode runs a cheap pass on a downscaled page first and only
+        # re-OCRs at full quality when its mean word confidence is too low.
+        self.tiered = tiered
+        self.fast_scale = fast_scale
+        self.fast_config = fast_config
+        self.confidence_threshold = confidence_threshold
+        # Time budgets in seconds. Work running past them is killed and the
+        # affected pages are reported as timed out with empty text.
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+
+    def settings(self) -> dict:
+        return {
+            **self._ocr_settings(),
+            "use_pdf_text_layer": self.use_pdf_text_layer,
+            "text_layer_min_chars": self.text_layer_min_chars,
+        }
+
+    def _ocr_settings(self) -> dict:
+        return {
+            "engine": self.engine_name,
+            "lang": self.lang,
+            "preprocessing": (
+                self.preprocessor.settings() if self.preprocessor else None
+            ),
+            "tiering": (
+                {
+                    "fast_scale": self.fast_scale,
+                    "fast_config": self.fast_config,
+                    "confidence_threshold": self.confidence_threshold,
+                }
+                if self.tiered
+                else None
+            ),
+        }
+
+    @staticmethod
+    def _deadline(
+        timeout: Optional[float], parent: Optional[float] = None
+    ) -> Optional[float]:
+        if not timeout:
+            return parent
+        deadline = time.monotonic() + timeout
+        return deadline if parent is None else min(deadline, parent)
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise OCRTimeoutError("OCR time budget exhausted")
+        return remaining
+
+    @property
+    def pdf_dpi(self) -> int:
+        # Render straight at the target resolution so pages need no resampling
+        return self.preprocessor.target_dpi if self.preprocessor else DEFAULT_PDF_DPI
+
+    def extract(self, file_data: bytes, file_type: str) -> TextExtraction:
+        return self._extract(file_data, file_type)
+
+    def extract_streaming(
+        self, file_data: bytes, file_type: str, on_page: Callable[[str], None]
+    ) -> TextExtraction:
+        return self._extract(file_data, file_type, on_page)
+
+    def _extract(
+        self,
+        file_data: bytes,
+        file_type: str,
+        on_page: Optional[Callable[[str], None]] = None,
+    ) -> TextExtraction:
         try:
             start_time = time.time()
             logger.info(f"Starting OCR for file type: {file_type}")
-            result = ""
+            result = TextExtraction(text="")
+            deadline = self._deadline(self.document_timeout)
             if file_type.lower() == "pdf":
-                result = self._extract_from_pdf(file_data)
+                result = self._extract_from_pdf(file_data, deadline, on_page)
             elif file_type.lower() in ["jpg", "jpeg", "png"]:
-                result = self._extract_from_image(file_data)
-            elif file_type.lower() == "txt":
-                result = file_data.decode("utf-8", errors="ignore")
-            elif file_type.lower() == "docx":
-                result = self._extract_from_docx(file_data)
+                ocr = self._extract_from_image(
+                    file_data, self._deadline(self.page_timeout, deadline)
+                )
+                result = TextExtraction(
+                    text=ocr.text,
+                    report=ExtractionReport(pages=[self._ocr_page_report(1, ocr)]),
+                )
+                if on_page is not None:
+                    on_page(ocr.text)
 
             duration = time.time() - start_time
             logger.info(f"OCR completed for {file_type} in {duration:.2f} seconds")
             return result
         except Exception as e:
             logger.error(f"OCR failed: {e}")
-            return ""
+            return TextExtraction(text="")
+
+    def _extract_from_pdf(
+        self,
+        file_data: bytes,
+        deadline: Optional[float] = None,
+        on_page: Optional[Callable[[str], None]] = None,
+    ) -> TextExtraction:
+        # Poppler reads from disk, so the PDF is spilled once and every window
+        # is rendered from the same file instead of re-writing the bytes.
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+            pdf_file.write(file_data)
+            pdf_file.flush()
+
+            page_count = pdfinfo_from_path(pdf_file.name)["Pages"]
+            page_texts = self._read_text_layer(pdf_file.name, page_count, deadline)
+            pages = {
+                page_number: PageExtraction(
+                    page_number=page_number, method=PAGE_METHOD_TEXT_LAYER
+                )
+                for page_number, text in enumerate(page_texts, 1)
+                if text is not None
+            }
+            ocr_pages = [
+                page_number
+                for page_number in range(1, page_count + 1)
+                if page_number not in pages
+            ]
+            logger.info(
+                f"PDF has {page_count} pages: {page_count - len(ocr_pages)} with a text layer, "
+                f"{len(ocr_pages)} to OCR in windows of {self.pdf_page_window}"
+            )
+
+            # Pages are handed to on_page in order, as soon as every page
+            # before them has been read
+            emitted = 0
+
+            def emit_ready_pages():
+                nonlocal emitted
+                while emitted < page_count and page_texts[emitted] is not None:
+                    on_page(page_texts[emitted])
+                    emitted += 1
+
+            if on_page is not None:
+                emit_ready_pages()
 
-    def _extract_from_pdf(self, file_data: bytes) -> str:
+            for first_page, last_page in self._page_windows(ocr_pages):
+                try:
+                    window_results = self._extract_from_pdf_window(
+                        pdf_file.name, first_page, last_page, deadline
+                    )
+                except (OCRTimeoutError, PDFPopplerTimeoutError):
+                    logger.warning(
+                        f"PDF pages {first_page}-{last_page} skipped, document time budget exhausted"
+                    )
+                    window_results = [OCRResult(text="", timed_out=True)] * (
+                        last_page - first_page + 1
+                    )
+                for page_number, ocr in enumerate(window_results, first_page):
+                    page_texts[page_number - 1] = ocr.text
+                    pages[page_number] = self._ocr_page_report(page_number, ocr)
+                if on_page is not None:
+                    emit_ready_pages()
+
+        report = ExtractionReport(pages=[pages[n] for n in sorted(pages)])
+        if self.tiered:
+            logger.info(f"OCR pages per tier: {report.pages_by_tier()}")
+        if report.timed_out_pages():
+            logger.warning(f"OCR timed out for pages {report.timed_out_pages()}")
+        return TextExtraction(text="\n".join(page_texts).strip(), report=report)
+
+    def _ocr_page_report(self, page_number: int, ocr: OCRResult) -> PageExtraction:
+        return PageExtraction(
+            page_number=page_number,
+            method=PAGE_METHOD_OCR,
+            tier=ocr.tier,
+            confidence=ocr.confidence,
+            timed_out=ocr.timed_out,
+        )
+
+    def _read_text_layer(
+        self, pdf_path: str, page_count: int, deadline: Optional[float] = None
+    ) -> list[Optional[str]]:
+        """
+        Return the embedded text of every page, or None for pages that have no
+        usable text layer and need OCR.
+        """
+        pages: list[Optional[str]] = [None] * page_count
+        if not self.use_pdf_text_layer:
+            return pages
+
+        try:
+            completed = subprocess.run(
+                ["pdftotext", "-enc", "UTF-8", pdf_path, "-"],
+                capture_output=True,
+                check=True,
+                timeout=self._remaining(deadline),
+            )
+        except (
+            OSError,
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            OCRTimeoutError,
+        ) as e:
+            logger.warning(f"Could not read PDF text layer, falling back to OCR: {e}")
+            return pages
+
+        # pdftotext terminates every page with a form feed
+        output = completed.stdout.decode("utf-8", errors="ignore")
+        for i, page_text in enumerate(output.split("\f")[:page_count]):
+            if len(page_text.strip()) >= self.text_layer_min_chars:
+                pages[i] = page_text
+        return pages
+
+    def _page_windows(self, page_numbers: list[int]) -> Iterator[tuple[int, int]]:
+        """
+        Group sorted page numbers into contiguous (first, last) ranges of at
+        most pdf_page_window pages, since poppler renders page ranges.
+        """
+        first_page = None
+        last_page = None
+        for page_number in page_numbers:
+            if (
+                first_page is not None
+                and page_number == last_page + 1
+                and page_number - first_page < self.pdf_page_window
+            ):
+                last_page = page_number
+                continue
+            if first_page is not None:
+                yield first_page, last_page
+            first_page = last_page = page_number
+        if first_page is not None:
+            yield first_page, last_page
+
+    def _extract_from_pdf_window(
+        self,
+        pdf_path: str,
+        first_page: int,
+        last_page: int,
+        deadline: Optional[float] = None,
+    ) -> list[OCRResult]:
         start_time = time.time()
-        images = convert_from_bytes(file_data)
+        # Rasterizing is CPU-bound too, so it takes a scheduler slot as well
+        images = self.scheduler.submit(
+            lambda: convert_from_path(
+                pdf_path,
+                dpi=self.pdf_dpi,
+                first_page=first_page,
+                last_page=last_page,
+                grayscale=bool(self.preprocessor and self.preprocessor.grayscale),
+                timeout=self._remaining(deadline),
+            )
+        ).result()
         logger.info(
-            f"PDF converted to {len(images)} images in {time.time() - start_time:.2f} seconds"
+            f"PDF pages {first_page}-{last_page} converted to images in {time.time() - start_time:.2f} seconds"
         )
 
         def process_page(args):
             i, image = args
             page_start = time.time()
-            text = pytesseract.image_to_string(image)
+            try:
+                result = self._ocr_page(
+                    image,
+                    source_dpi=self.pdf_dpi,
+                    deadline=self._deadline(self.page_timeout, deadline),
+                )
+            except OCRTimeoutError:
+                logger.warning(f"OCR for page {i} exceeded its time budget")
+                return OCRResult(text="", timed_out=True)
             logger.info(
-                f"OCR for page {i+1} took {time.time() - page_start:.2f} seconds"
+                f"OCR for page {i} took {time.time() - page_start:.2f} seconds"
             )
-            return text
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            results = list(executor.map(process_page, enumerate(images)))
+            return result
 
-        return "\n".join(results).strip()
+        try:
+            return self.scheduler.map(process_page, enumerate(images, first_page))
+        finally:
+            for image in images:
+                image.close()
 
-    def _extract_from_image(self, file_data: bytes) -> str:
+    def _extract_from_image(
+        self, file_data: bytes, deadline: Optional[float] = None
+    ) -> OCRResult:
         image = Image.open(BytesIO(file_data))
-        return pytesseract.image_to_string(image)
-
-    def _extract_from_docx(self, file_data: bytes) -> str:
         try:
-            from docx import Document
-
-            doc = Document(BytesIO(file_data))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
-        except ImportError:
-            raise Exception("python-docx not installed")
+            return self.scheduler.submit(
+                lambda: self._ocr_page(image, deadline=deadline)
+            ).result()
+        except OCRTimeoutError:
+            logger.warning("OCR for image exceeded its time budget")
+            return OCRResult(text="", timed_out=True)
+
+    def _ocr_page(
+        self,
+        image: Image.Image,
+        source_dpi: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> OCRResult:
+        if self.page_cache is None:
+            return self._ocr_preprocessed(
+                self._preprocess(image, source_dpi), deadline
+            )
+
+        orientation = image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+        key = content_key(
+            f"page:{image.mode}:{image.width}x{image.height}:{orientation}:{source_dpi}",
+            image.tobytes(),
+            self._ocr_settings(),
+        )
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return OCRResult(**cached)
+
+        result = self._ocr_preprocessed(self._preprocess(image, source_dpi), deadline)
+        self.page_cache.set(key, result._asdict())
+        return result
+
+    def _ocr_preprocessed(
+        self, image: Image.Image, deadline: Optional[float] = None
+    ) -> OCRResult:
+        if not self.tiered:
+            return OCRResult(
+                text=self._ocr_image(image, timeout=self._remaining(deadline))
+            )
+
+        fast_image = image
+        if self.fast_scale < 1:
+            fast_image = image.resize(
+                (
+                    max(1, round(image.width * self.fast_scale)),
+                    max(1, round(image.height * self.fast_scale)),
+                )
+            )
+        text, confidence = self._ocr_image_fast(
+            fast_image, timeout=self._remaining(deadline)
+        )
+        if confidence is not None and confidence >= self.confidence_threshold:
+            return OCRResult(text=text, tier=OCR_TIER_FAST, confidence=confidence)
+
+        logger.info(
+            f"Fast OCR confidence {confidence} below {self.confidence_threshold}, "
+            "re-running at full quality"
+        )
+        return OCRResult(
+            text=self._ocr_image(image, timeout=self._remaining(deadline)),
+            tier=OCR_TIER_ACCURATE,
+            confidence=confidence,
+        )
+
+    def _preprocess(
+        self, image: Image.Image, source_dpi: Optional[float]
+    ) -> Image.Image:
+        if self.preprocessor is None:
+            return image
+        return self.preprocessor.process(image, source_dpi=source_dpi)
+
+    def _ocr_image(self, image: Image.Image, timeout: Optional[float] = None) -> str:
+        with _tesseract_timeout():
+            return pytesseract.image_to_string(
+                image, lang=self.lang, timeout=timeout or 0
+            )
+
+    def _ocr_image_fast(
+        self, image: Image.Image, timeout: Optional[float] = None
+    ) -> tuple[str, Optional[float]]:
+        """
+        Cheap OCR pass returning the text and the mean word confidence (0-100),
+        or None when no word was recognized.
+        """
+        with _tesseract_timeout():
+            data = pytesseract.image_to_data(
+                image,
+                lang=self.lang,
+                config=self.fast_config,
+                output_type=pytesseract.Output.DICT,
+                timeout=timeout or 0,
+            )
+
+        lines: dict[tuple[int, int, int], list[str]] = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if confidence < 0 or not word.strip():
+                continue
+            confidences.append(confidence)
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(line_key, []).append(word)
+
+        text = "\n".join(" ".join(words) for words in lines.values())
+        if not confidences:
+            return text, None
+        return text, sum(confidences) / len(confidences)
@@ -0,0 +1,218 @@
+import logging
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection
+from typing import Optional
+from PIL import Image
+from app.adapters.ocr.tesseract_ocr_adapter import (
+    OCRTimeoutError,
+    TesseractOCRAdapter,
+)
+from app.adapters.cache.tiered_cache import TieredCache
+from app.adapters.ocr.image_preprocessor import ImagePreprocessor
+from app.adapters.ocr.ocr_scheduler import OCRScheduler
+
+logger = logging.getLogger(__name__)
+
+# Per-process Tesseract handle. Each worker initializes it once and reuses it
+# for every page it receives, so traineddata is loaded once per worker.
+_worker_api = None
+
+
+def _init_worker(lang: str) -> None:
+    global _worker_api
+    from tesserocr import PyTessBaseAPI
+
+    _worker_api = PyTessBaseAPI(lang=lang)
+
+
+def _worker_main(connection: Connection, initializer, initargs: tuple) -> None:
+    # Runs the tasks received on connection one at a time until the parent
+    # closes it
+    initializer(*initargs)
+    while True:
+        try:
+            fn, image = connection.recv()
+        except EOFError:
+            return
+        try:
+            result = (True, fn(image))
+        except Exception as e:
+            result = (False, e)
+        connection.send(result)
+
+
+def _ocr_in_worker(image: Image.Image) -> str:
+    _worker_api.SetImage(image)
+    return _worker_api.GetUTF8Text()
+
+
+def _ocr_fast_in_worker(image: Image.Image) -> tuple[str, Optional[float]]:
+    from tesserocr import PSM
+
+    # Single-block segmentation skips page layout analysis
+    _worker_api.SetPageSegMode(PSM.SINGLE_BLOCK)
+    try:
+        _worker_api.SetImage(image)
+        text = _worker_api.GetUTF8Text()
+        confidences = _worker_api.AllWordConfidences()
+    finally:
+        _worker_api.SetPageSegMode(PSM.AUTO)
+    if not confidences:
+        return text, None
+    return text, sum(confidences) / len(confidences)
+
+
+class _Worker:
+    """A pool worker process and the parent's end of its pipe."""
+
+    def __init__(self, process: multiprocessing.Process, connection: Connection):
+        self.process = process
+        self.connection = connection
+
+
+class TesserocrPoolAdapter(TesseractOCRAdapter):
+    """
+    Tesseract engine backed by a pool of worker processes that keep an
+    initialized tesserocr API alive across pages and requests, instead of
+    forking the tesseract binary for every page.
+
+    Each page is sent to an idle worker of its own, so a page running past
+    its timeout is stopped by killing that worker alone; the pages of other
+    requests running on the other workers are left alone.
+    """
+
+    engine_name = "tesserocr"
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        pdf_page_window: int = 4,
+        scheduler: Optional[OCRScheduler] = None,
+        lang: str = "eng",
+        use_pdf_text_layer: bool = True,
+        text_layer_min_chars: int = 20,
+        page_cache: Optional[TieredCache] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        tiered: bool = False,
+        fast_scale: float = 0.5,
+        confidence_threshold: float = 80.0,
+        page_timeout: Optional[float] = None,
+        document_timeout: Optional[float] = None,
+    ):
+        super().__init__(
+            pdf_page_window=pdf_page_window,
+            scheduler=scheduler,
+            lang=lang,
+            use_pdf_text_layer=use_pdf_text_layer,
+            text_layer_min_chars=text_layer_min_chars,
+            page_cache=page_cache,
+            preprocessor=preprocessor,
+            tiered=tiered,
+            fast_scale=fast_scale,
+            fast_config="psm=SINGLE_BLOCK",
+            confidence_threshold=confidence_threshold,
+            page_timeout=page_timeout,
+            document_timeout=document_timeout,
+        )
+        # Each scheduler worker waits on at most one pool task, so a larger
+        # pool would only hold idle Tesseract instances
+        self.pool_size = pool_size or self.scheduler.workers
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: list[_Worker] = []
+        self._workers = 0
+        self._workers_changed = threading.Condition()
+
+    def _start_worker(self) -> _Worker:
+        logger.info(
+            f"Starting Tesseract engine pool worker {self._workers}/{self.pool_size} (lang={self.lang})"
+        )
+        connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_connection, _init_worker, (self.lang,)),
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        return _Worker(process, connection)
+
+    def _acquire_worker(self, deadline: Optional[float]) -> _Worker:
+        with self._workers_changed:
+            while not self._idle and self._workers >= self.pool_size:
+                if not self._workers_changed.wait(self._remaining(deadline)):
+                    raise OCRTimeoutError("No Tesseract engine pool worker free")
+            if self._idle:
+                return self._idle.pop()
+            self._workers += 1
+        try:
+            return self._start_worker()
+        except Exception:
+            self._discard_worker(None)
+            raise
+
+    def _release_worker(self, worker: _Worker) -> None:
+        with self._workers_changed:
+            self._idle.append(worker)
+            self._workers_changed.notify()
+
+    def _discard_worker(self, worker: Optional[_Worker]) -> None:
+        with self._workers_changed:
+            self._workers -= 1
+            self._workers_changed.notify()
+        if worker is not None:
+            # A running task cannot be cancelled, so its worker is killed to
+            # stop the work instead of leaving it running in the background
+            worker.process.kill()
+            worker.process.join(timeout=5)
+            worker.connection.close()
+
+    @staticmethod
+    def _stop_worker(worker: _Worker) -> None:
+        # Closing the pipe ends the worker's loop
+        worker.connection.close()
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.kill()
+
+    def _ocr_image(self, image: Image.Image, timeout: Optional[float] = None) -> str:
+        return self._run_in_pool(_ocr_in_worker, image, timeout)
+
+    def _ocr_image_fast(
+        self, image: Image.Image, timeout: Optional[float] = None
+    ) -> tuple[str, Optional[float]]:
+        return self._run_in_pool(_ocr_fast_in_worker, image, timeout)
+
+    def _run_in_pool(self, fn, image: Image.Image, timeout: Optional[float]):
+        # One retry covers a worker that died under the page (crash or OOM
+        # kill). It only gets the time left.
+        deadline = self._deadline(timeout)
+        for attempt in range(2):
+            worker = self._acquire_worker(deadline)
+            try:
+                worker.connection.send((fn, image))
+                if not worker.connection.poll(self._remaining(deadline)):
+                    raise OCRTimeoutError("Tesseract engine pool task timeout")
+                ok, result = worker.connection.recv()
+            except OCRTimeoutError:
+                self._discard_worker(worker)
+                raise
+            except (EOFError, OSError):
+                logger.error("Tesseract engine pool worker died, restarting it")
+                self._discard_worker(worker)
+                if attempt == 1:
+                    raise
+                continue
+            self._release_worker(worker)
+            if not ok:
+                raise result
+            return result
+
+    def close(self) -> None:
+        # Stops the idle workers; workers still running a page go idle once
+        # it is done and are stopped with the process
+        with self._workers_changed:
+            idle, self._idle = self._idle, []
+            self._workers -= len(idle)
+        for worker in idle:
+            self._stop_worker(worker)
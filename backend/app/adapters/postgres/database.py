@@ -1,4 +1,4 @@
-from sqlalchemy import String, create_engine
+from sqlalchemy import String, create_engine, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
 
 from app.core.config import config
@@ -9,3 +9,9 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
     pass
+
+
+def check_connection() -> None:
+    """Raise if the database cannot be reached through the engine pool."""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
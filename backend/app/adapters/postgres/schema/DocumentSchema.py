@@ -1,33 +1,14 @@
 from datetime import datetime, timezone
-from dataclasses import asdict, is_dataclass
-from typing import Any
-from sqlalchemy import Column, String, Integer, DateTime, Text, LargeBinary, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
+from sqlalchemy.orm import deferred
 from app.adapters.postgres.database import Base
+from app.adapters.mappers.record_mapper import (
+    serialize_dataclass,
+    serialize_extraction_report,
+)
 from app.domain.models.document import Document
 
 
-def serialize_dataclass(obj: Any) -> Any:
-    if obj is None:
-        return None
-
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-
-    if isinstance(obj, list):
-        return [serialize_dataclass(item) for item in obj]
-
-    if is_dataclass(obj):
-        result = {}
-        for key, value in asdict(obj).items():
-            result[key] = serialize_dataclass(value)
-        return result
-
-    if isinstance(obj, dict):
-        return {key: serialize_dataclass(value) for key, value in obj.items()}
-
-    return obj
-
-
 class DocumentSchema(Base):
     __tablename__ = "documents"
 
@@ -35,9 +16,12 @@ class DocumentSchema(Base):
     filename = Column(String(255), nullable=False)
     file_type = Column(String(50), nullable=False)
     file_size = Column(Integer, nullable=False)
-    file_data = Column(LargeBinary, nullable=False)
-    extracted_text = Column(Text, nullable=True)
-    medical_record_data = Column(JSON, nullable=True)
+    # SHA-256 of the original file, kept in the blob store
+    file_hash = Column(String(64), nullable=False, index=True)
+    # Heavy columns are only read when a load asks for them
+    extracted_text = deferred(Column(Text, nullable=True))
+    medical_record_data = deferred(Column(JSON, nullable=True))
+    extraction_report = deferred(Column(JSON, nullable=True))
     created_at = Column(
         DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
@@ -47,6 +31,7 @@ class DocumentSchema(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    medical_record_edited_at = Column(DateTime, nullable=True)
 
     def __repr__(self) -> str:
         return f"DocumentSchema(id={self.id}, filename={self.filename})"
@@ -58,7 +43,7 @@ class DocumentSchema(Base):
         orm.filename = domain.filename
         orm.file_type = domain.file_type
         orm.file_size = domain.file_size
-        orm.file_data = domain.file_data
+        orm.file_hash = domain.file_hash
         orm.extracted_text = domain.extracted_text
         # Serialize MedicalRecord dataclass to JSON-compatible dict (adapter layer responsibility)
         orm.medical_record_data = (
@@ -66,6 +51,8 @@ class DocumentSchema(Base):
             if domain.medical_record
             else None
         )
+        orm.extraction_report = serialize_extraction_report(domain.extraction_report)
         orm.created_at = domain.created_at
         orm.updated_at = domain.updated_at
+        orm.medical_record_edited_at = domain.medical_record_edited_at
         return orm
@@ -1,7 +1,35 @@
-from sqlalchemy.orm import Session
-from app.domain.models.document import Document
-from app.domain.document_repository import DocumentRepository
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session, undefer
+from app.domain.models.document import NOT_LOADED, Document
+from app.domain.models.medical_record import MedicalRecord
+from app.domain.document_repository import (
+    PROJECTION_FULL,
+    PROJECTION_METADATA,
+    PROJECTION_RECORD,
+    DocumentRepository,
+)
 from app.adapters.postgres.schema.DocumentSchema import DocumentSchema
+from app.adapters.mappers.record_mapper import (
+    deserialize_extraction_report,
+    deserialize_medical_record,
+    serialize_dataclass,
+)
+
+# Deferred columns read up front by each projection
+_PROJECTION_COLUMNS = {
+    PROJECTION_METADATA: (),
+    PROJECTION_RECORD: ("medical_record_data",),
+    PROJECTION_FULL: ("extracted_text", "medical_record_data", "extraction_report"),
+}
+
+# Column and deserializer of each lazily loaded Document field
+_FIELD_COLUMNS = {
+    "extracted_text": ("extracted_text", None),
+    "medical_record": ("medical_record_data", deserialize_medical_record),
+    "extraction_report": ("extraction_report", deserialize_extraction_report),
+}
 
 
 class SQLDocumentRepository(DocumentRepository):
@@ -16,189 +44,211 @@ class SQLDocumentRepository(DocumentRepository):
         self.db.commit()
         return document
 
-    def get_by_id(self, document_id: str) -> Document:
+    def get_by_id(
+        self, document_id: str, projection: str = PROJECTION_FULL
+    ) -> Document:
+        columns = _PROJECTION_COLUMNS.get(projection)
+        if columns is None:
+            raise ValueError(f"Unknown projection: {projection}")
         orm = (
             self.db.query(DocumentSchema)
+            .options(*[undefer(getattr(DocumentSchema, c)) for c in columns])
             .filter(DocumentSchema.id == document_id)
             .first()
         )
         if not orm:
             return None
 
-        # Map ORM to Domain
-        # We need to reconstruct the domain object from the ORM object
-        # Since DocumentSchema stores medical_record as JSON, we need to deserialize it back to dataclasses
-        # For now, let's assume we can just pass the dict if the domain model supports it,
-        # but the domain model uses dataclasses.
-        # We need a deserializer.
-
-        # Let's implement a simple deserializer here or in DocumentSchema
-        # For now, I'll do it here for simplicity, but ideally it should be in a mapper.
-
-        from app.domain.models.document import Document
-        from app.domain.models.medical_record import MedicalRecord
-        from app.domain.models.pet_info import PetInfo
-        from app.domain.models.veterinary_info import VeterinaryInfo
-        from app.domain.models.visit import Visit
-        from app.domain.models.physical_examination import PhysicalExamination
-        from app.domain.models.medication import Medication
-        from app.domain.models.laboratory_test import LaboratoryTest
-        from app.domain.models.vaccination import Vaccination
-        from datetime import datetime
-
-        def parse_date(date_str):
-            if not date_str:
-                return None
-            try:
-                return datetime.fromisoformat(date_str)
-            except ValueError:
-                return None
-
-        medical_record = None
-        if orm.medical_record_data:
-            data = orm.medical_record_data
-
-            pet_info = None
-            if data.get("pet_info"):
-                p = data["pet_info"]
-                pet_info = PetInfo(
-                    name=p.get("name"),
-                    species=p.get("species"),
-                    breed=p.get("breed"),
-                    birth_date=parse_date(p.get("birth_date")),
-                    sex=p.get("sex"),
-                    reproductive_status=p.get("reproductive_status"),
-                    weight=p.get("weight"),
-                    microchip=p.get("microchip"),
-                    hair_type=p.get("hair_type"),
-                    coat_color=p.get("coat_color"),
-                )
-
-            veterinary_info = None
-            if data.get("veterinary_info"):
-                v = data["veterinary_info"]
-                veterinary_info = VeterinaryInfo(
-                    clinic_name=v.get("clinic_name"),
-                    clinic_address=v.get("clinic_address"),
-                    clinic_phone=v.get("clinic_phone"),
-                )
-
-            visits = []
-            if data.get("visits"):
-                for v in data["visits"]:
-                    phys_exam = None
-                    if v.get("physical_examination"):
-                        pe = v["physical_examination"]
-                        phys_exam = PhysicalExamination(
-                            weight=pe.get("weight"),
-                            temperature=pe.get("temperature"),
-                            heart_rate=pe.get("heart_rate"),
-                            respiratory_rate=pe.get("respiratory_rate"),
-                            mucous_membranes=pe.get("mucous_membranes"),
-                            crt=pe.get("crt"),
-                            hydration_status=pe.get("hydration_status"),
-                            general_condition=pe.get("general_condition"),
-                            abdominal_palpation=pe.get("abdominal_palpation"),
-                            findings=pe.get("findings", []),
-                        )
-
-                    treatments = []
-                    if v.get("treatment"):
-                        for t in v["treatment"]:
-                            treatments.append(
-                                Medication(
-                                    name=t.get("name"),
-                                    dosage=t.get("dosage"),
-                                    frequency=t.get("frequency"),
-                                    duration=t.get("duration"),
-                                    route=t.get("route"),
-                                    observations=t.get("observations"),
-                                )
-                            )
-
-                    lab_tests = []
-                    if v.get("laboratory_tests"):
-                        for l in v["laboratory_tests"]:
-                            lab_tests.append(
-                                LaboratoryTest(
-                                    test_name=l.get("test_name"),
-                                    test_date=parse_date(l.get("test_date")),
-                                    results=l.get("results"),
-                                    findings=l.get("findings", []),
-                                )
-                            )
-
-                    vaccinations = []
-                    if v.get("vaccinations"):
-                        for vac in v["vaccinations"]:
-                            vaccinations.append(
-                                Vaccination(
-                                    vaccine_name=vac.get("vaccine_name"),
-                                    date_administered=parse_date(
-                                        vac.get("date_administered")
-                                    ),
-                                    next_dose_date=parse_date(
-                                        vac.get("next_dose_date")
-                                    ),
-                                    applied=vac.get("applied", False),
-                                )
-                            )
-
-                    visits.append(
-                        Visit(
-                            visit_date=parse_date(v.get("visit_date")),
-                            visit_type=v.get("visit_type"),
-                            clinic_name=v.get("clinic_name"),
-                            reason=v.get("reason"),
-                            anamnesis=v.get("anamnesis"),
-                            physical_examination=phys_exam,
-                            diagnosis=v.get("diagnosis", []),
-                            treatment=treatments,
-                            plan=v.get("plan"),
-                            laboratory_tests=lab_tests,
-                            vaccinations=vaccinations,
-                            observations=v.get("observations"),
-                        )
-                    )
-
-            medical_record = MedicalRecord(
-                pet_info=pet_info, veterinary_info=veterinary_info, visits=visits
-            )
-
+        # Deferred columns left out of the projection are not read here; the
+        # document loads them on first access
+        loaded = set(columns)
         return Document(
             id=orm.id,
             filename=orm.filename,
             file_type=orm.file_type,
             file_size=orm.file_size,
-            file_data=orm.file_data,
-            extracted_text=orm.extracted_text,
-            medical_record=medical_record,
+            file_hash=orm.file_hash,
+            extracted_text=(
+                orm.extracted_text if "extracted_text" in loaded else NOT_LOADED
+            ),
+            medical_record=(
+                deserialize_medical_record(orm.medical_record_data)
+                if "medical_record_data" in loaded
+                else NOT_LOADED
+            ),
+            extraction_report=(
+                deserialize_extraction_report(orm.extraction_report)
+                if "extraction_report" in loaded
+                else NOT_LOADED
+            ),
             created_at=orm.created_at,
             updated_at=orm.updated_at,
+            medical_record_edited_at=orm.medical_record_edited_at,
+            loader=lambda field: self._load_field(document_id, field),
         )
 
-    def update(self, document: Document) -> Document:
-        orm = (
-            self.db.query(DocumentSchema)
-            .filter(DocumentSchema.id == document.id)
-            .first()
-        )
-        if orm:
-            # Update fields
-            orm.extracted_text = document.extracted_text
-
-            # Serialize MedicalRecord
-            from app.adapters.postgres.schema.DocumentSchema import serialize_dataclass
+    def _load_field(self, document_id: str, field: str):
+        column, deserialize = _FIELD_COLUMNS[field]
+        value = self.db.execute(
+            select(getattr(DocumentSchema, column)).where(
+                DocumentSchema.id == document_id
+            )
+        ).scalar_one_or_none()
+        return deserialize(value) if deserialize else value
 
-            orm.medical_record_data = (
+    def update(self, document: Document) -> Document:
+        # Written without reading the row first, and only with the heavy
+        # fields given to the document, so those left out of its load or
+        # read lazily are left as stored
+        values = {"medical_record_edited_at": document.medical_record_edited_at}
+        if document.is_assigned("extracted_text"):
+            values["extracted_text"] = document.extracted_text
+        if document.is_assigned("medical_record"):
+            values["medical_record_data"] = (
                 serialize_dataclass(document.medical_record)
                 if document.medical_record
                 else None
             )
+        table = DocumentSchema.__table__
+        self.db.execute(
+            update(table).where(table.c.id == document.id).values(**values)
+        )
+        self.db.commit()
+        return document
 
-            # Update timestamp handled by onupdate in schema, but we can force it if needed
-            # orm.updated_at = datetime.now(timezone.utc)
+    def update_medical_record(
+        self, document_id: str, medical_record: MedicalRecord, edited_at: datetime
+    ) -> Optional[Document]:
+        table = DocumentSchema.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == document_id)
+            .values(
+                medical_record_data=(
+                    serialize_dataclass(medical_record) if medical_record else None
+                ),
+                medical_record_edited_at=edited_at,
+                updated_at=datetime.now(timezone.utc),
+            )
+        )
+        # The record written is the one given, and the text is left out of
+        # the response, so neither is sent back
+        columns = [
+            c
+            for c in table.c
+            if c.name not in ("medical_record_data", "extracted_text")
+        ]
+        if self.db.get_bind().dialect.update_returning:
+            # One round trip: no row returned means no document matched
+            row = self.db.execute(statement.returning(*columns)).first()
+        else:
+            result = self.db.execute(statement)
+            row = (
+                self.db.execute(
+                    select(*columns).where(table.c.id == document_id)
+                ).first()
+                if result.rowcount
+                else None
+            )
+        self.db.commit()
+        if row is None:
+            return None
 
-            self.db.commit()
-            self.db.refresh(orm)
-        return document
+        return Document(
+            id=row.id,
+            filename=row.filename,
+            file_type=row.file_type,
+            file_size=row.file_size,
+            file_hash=row.file_hash,
+            extracted_text=NOT_LOADED,
+            medical_record=medical_record,
+            extraction_report=deserialize_extraction_report(row.extraction_report),
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            medical_record_edited_at=row.medical_record_edited_at,
+            loader=lambda field: self._load_field(document_id, field),
+        )
+
+    def stream_extracted_texts(
+        self,
+        after_id: Optional[str] = None,
+        skip_edited: bool = False,
+        chunk_size: int = 500,
+    ) -> Iterator[Tuple[str, str]]:
+        bind = self.db.get_bind()
+        if not bind.dialect.supports_server_side_cursors:
+            # e.g. SQLite, where an open read also locks out the writes made
+            # while its rows are consumed, so rows are read a page at a time
+            yield from self._page_extracted_texts(after_id, skip_edited, chunk_size)
+            return
+
+        # On a connection of its own, so the server-side cursor survives the
+        # commits of the session while the rows are consumed
+        with bind.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(self._extracted_texts_query(after_id, skip_edited))
+            for document_id, extracted_text in result:
+                yield document_id, extracted_text
+
+    def _page_extracted_texts(
+        self, after_id: Optional[str], skip_edited: bool, chunk_size: int
+    ) -> Iterator[Tuple[str, str]]:
+        while True:
+            rows = self.db.execute(
+                self._extracted_texts_query(after_id, skip_edited).limit(chunk_size)
+            ).all()
+            if not rows:
+                return
+            for document_id, extracted_text in rows:
+                yield document_id, extracted_text
+            after_id = rows[-1][0]
+
+    def _extracted_texts_query(self, after_id: Optional[str], skip_edited: bool):
+        query = (
+            select(DocumentSchema.id, DocumentSchema.extracted_text)
+            .where(DocumentSchema.extracted_text.is_not(None))
+            .where(DocumentSchema.extracted_text != "")
+            .order_by(DocumentSchema.id)
+        )
+        if after_id is not None:
+            query = query.where(DocumentSchema.id > after_id)
+        if skip_edited:
+            query = query.where(DocumentSchema.medical_record_edited_at.is_(None))
+        return query
+
+    def update_medical_records(
+        self, records: Dict[str, MedicalRecord], skip_edited: bool = False
+    ) -> int:
+        if not records:
+            return 0
+
+        table = DocumentSchema.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("document_id"))
+            .values(
+                medical_record_data=bindparam(
+                    "record", type_=table.c.medical_record_data.type
+                ),
+                updated_at=bindparam("now", type_=table.c.updated_at.type),
+            )
+        )
+        if skip_edited:
+            statement = statement.where(table.c.medical_record_edited_at.is_(None))
+
+        now = datetime.now(timezone.utc)
+        params = [
+            {
+                "document_id": document_id,
+                "record": serialize_dataclass(record) if record else None,
+                "now": now,
+            }
+            for document_id, record in records.items()
+        ]
+        result = self.db.execute(statement, params)
+        self.db.commit()
+        # Not every driver reports the rows matched by an executemany
+        if self.db.get_bind().dialect.supports_sane_multi_rowcount:
+            return result.rowcount
+        return len(params)
@@ -0,0 +1,227 @@
+import hashlib
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from spacy.language import Language
+from spacy.tokens import Doc
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).parent.parent / "data" / "gazetteer_es.tsv"
+
+
+def _fold_char(c: str) -> str:
+    # The lowercase base letter of the decomposed character, e.g. "Ó" -> "o"
+    return unicodedata.normalize("NFD", c)[0].lower()[0]
+
+
+# Latin letters, which cover Spanish text, are folded through a translation
+# table; other characters are left as they are
+_FOLD_TABLE = {i: _fold_char(chr(i)) for i in range(0x250)}
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase text and strip its accents character by character, so the
+    folded text has the same length and offsets as the original.
+    """
+    return text.translate(_FOLD_TABLE)
+
+
+class Gazetteer:
+    """
+    Dictionary of terms compiled into an Aho-Corasick automaton, so a text
+    is matched against every term in one pass whose cost depends on the
+    length of the text and the matches found, not on the number of terms.
+
+    Terms and text are compared accent and case folded, and only whole
+    words match.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]] = ()):
+        # Trie of folded characters: children, the (length, label) of the
+        # terms added at each node, and once built the failure link and the
+        # terms ending at each node, its own and those of its suffixes
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terms: List[List[Tuple[int, str]]] = [[]]
+        self._fail: List[int] = []
+        self._outputs: List[List[Tuple[int, str]]] = []
+        self._built = False
+        # Longest term of each label, which bounds how far first() looks
+        self._max_length: Dict[str, int] = {}
+        # Each folded term of a label as first written in the gazetteer
+        self._spellings: Dict[Tuple[str, str], str] = {}
+        self._digest = hashlib.sha256()
+        self.size = 0
+        for term, label in terms:
+            self.add(term, label)
+        self._build()
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> "Gazetteer":
+        """
+        Load a gazetteer from a tab-separated file of label and term per
+        line. Blank lines and lines starting with '#' are ignored.
+        """
+        terms = []
+        with open(path or DEFAULT_GAZETTEER_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                label, term = line.split("\t", 1)
+                terms.append((term.strip(), label.strip()))
+        return Gazetteer(terms)
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of the terms, to key results extracted with them."""
+        return self._digest.hexdigest()[:16]
+
+    def add(self, term: str, label: str) -> None:
+        folded = fold(term)
+        if not folded:
+            return
+        node = 0
+        for c in folded:
+            next_node = self._goto[node].get(c)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][c] = next_node
+                self._goto.append({})
+                self._terms.append([])
+            node = next_node
+        if (len(folded), label) not in self._terms[node]:
+            self._terms[node].append((len(folded), label))
+            self._max_length[label] = max(
+                self._max_length.get(label, 0), len(folded)
+            )
+            self._spellings[(label, folded)] = term.strip()
+            self.size += 1
+            # Terms added after a search are only matched once rebuilt
+            self._built = False
+        self._digest.update(f"{label}\t{folded}\n".encode("utf-8"))
+
+    def term(self, text: str, label: str) -> Optional[str]:
+        """
+        The term of the label matching text, as written in the gazetteer,
+        e.g. "hurón" for "HURON", or None if there is none.
+        """
+        return self._spellings.get((label, fold(text.strip())))
+
+    def _build(self) -> None:
+        self._fail = [0] * len(self._goto)
+        self._outputs = [list(terms) for terms in self._terms]
+        # Breadth-first, so the failure link of a node is set before those of
+        # its children, which follow it
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(c, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._outputs[child] = (
+                    self._outputs[child] + self._outputs[self._fail[child]]
+                )
+        self._built = True
+
+    def _walk(self, folded: str) -> Iterator[Tuple[int, List[Tuple[int, str]]]]:
+        # End offset and terms ending there for every character of the text
+        if not self._built:
+            self._build()
+        node = 0
+        for end, c in enumerate(folded, start=1):
+            while node and c not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(c, 0)
+            yield end, self._outputs[node]
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Returns:
+            (start, end, label) of the whole-word terms found in text, in
+            order and without overlaps, the longest first where several
+            start at the same place
+        """
+        folded = fold(text)
+        candidates = []
+        for end, outputs in self._walk(folded):
+            for length, label in outputs:
+                start = end - length
+                if _is_boundary(folded, start - 1) and _is_boundary(folded, end):
+                    candidates.append((start, end, label))
+
+        position = 0
+        for start, end, label in sorted(candidates, key=lambda m: (m[0], -m[1])):
+            if start >= position:
+                yield start, end, label
+                position = end
+
+    def first(self, text: str, label: str) -> Optional[Tuple[int, int]]:
+        """
+        (start, end) of the first whole-word term with the given label in
+        text, the longest where several start there. The automaton stops as
+        soon as no longer or earlier term of the label can still end.
+        """
+        max_length = self._max_length.get(label)
+        if max_length is None:
+            return None
+        folded = fold(text)
+        best = None
+        for end, outputs in self._walk(folded):
+            if best is not None and end > best[0] + max_length:
+                break
+            for length, term_label in outputs:
+                start = end - length
+                if (
+                    term_label == label
+                    and (best is None or start <= best[0])
+                    and _is_boundary(folded, start - 1)
+                    and _is_boundary(folded, end)
+                ):
+                    best = (start, end)
+        return best
+
+
+def _is_boundary(text: str, i: int) -> bool:
+    return i < 0 or i >= len(text) or not text[i].isalnum()
+
+
+class GazetteerComponent:
+    """
+    Pipeline component adding an entity for every gazetteer term found in
+    the text, where no earlier component already set one.
+    """
+
+    def __init__(self, gazetteer: Gazetteer):
+        self.gazetteer = gazetteer
+
+    def __call__(self, doc: Doc) -> Doc:
+        taken = set()
+        for ent in doc.ents:
+            taken.update(range(ent.start, ent.end))
+
+        spans = []
+        for start, end, label in self.gazetteer.find(doc.text):
+            span = doc.char_span(start, end, label=label)
+            # Terms that do not fall on token boundaries are left out
+            if span is None or taken.intersection(range(span.start, span.end)):
+                continue
+            spans.append(span)
+
+        if spans:
+            doc.ents = sorted(list(doc.ents) + spans, key=lambda s: s.start)
+        return doc
+
+
+@Language.factory("gazetteer", default_config={"path": None})
+def create_gazetteer_component(
+    nlp: Language, name: str, path: Optional[str]
+) -> GazetteerComponent:
+    return GazetteerComponent(Gazetteer.load(path))
+
@@ -1,15 +1,15 @@
-import re
 from typing import List
 from app.domain.models.laboratory_test import LaboratoryTest
+from app.adapters.spacy.extractors.section_index import SectionIndex
+from app.adapters.spacy.extractors.instrumentation import instrumented
 
 
 class LaboratoryTestExtractor:
-    def extract(self, text: str) -> List[LaboratoryTest]:
+    @instrumented("visits.laboratory_test")
+    def extract(self, sections: SectionIndex) -> List[LaboratoryTest]:
         tests_list = []
-        test_lines = re.findall(
-            r"(Test|Analitica|Radiografia|Ecografia|Coprologico).*?[:\n](.*)",
-            text,
-            re.IGNORECASE,
+        test_lines = sections.labelled_lines(
+            ["Test", "Analitica", "Radiografia", "Ecografia", "Coprologico"]
         )
         for test_name, test_result in test_lines:
             tests_list.append(
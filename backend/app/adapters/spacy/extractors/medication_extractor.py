@@ -1,13 +1,15 @@
 from typing import List
 from app.domain.models.medication import Medication
-from app.adapters.spacy.extractors.utils import extract_section_text
+from app.adapters.spacy.extractors.section_index import SectionIndex
+from app.adapters.spacy.extractors.instrumentation import instrumented
 
 
 class MedicationExtractor:
-    def extract(self, text: str) -> List[Medication]:
+    @instrumented("visits.medication")
+    def extract(self, sections: SectionIndex) -> List[Medication]:
         treatment_list = []
-        treatment_text = extract_section_text(
-            text, "(?:Tratamiento|Tx|Receta|Plan)", ["Revision", "Observaciones"]
+        treatment_text = sections.section(
+            ["Tratamiento", "Tx", "Receta", "Plan"], ["Revision", "Observaciones"]
         )
         if treatment_text:
             treats = [
@@ -7,7 +7,23 @@ from spacy.matcher import Matcher
 from spacy.tokens import Doc
 
 from app.domain.models.pet_info import PetInfo
+from app.adapters.spacy.extractors.gazetteer import fold
 from app.adapters.spacy.extractors.utils import extract_regex_field
+from app.adapters.spacy.extractors.instrumentation import instrumented
+
+
+def normalize_species(term: str) -> str:
+    """
+    Species value for a species term matched in a text, whatever its case
+    and accents: dogs and cats by their English name, other species by the
+    term capitalized.
+    """
+    folded = fold(term)
+    if folded in ["perro", "perra", "canina"]:
+        return "Canine"
+    elif folded in ["gato", "gata", "felina"]:
+        return "Feline"
+    return term.lower().capitalize()
 
 
 class PetInfoExtractor:
@@ -32,15 +48,21 @@ class PetInfoExtractor:
         ]
         self.matcher.add("PET_NAME", name_patterns)
 
-        species_patterns = [
-            [{"LOWER": "especie"}, {"IS_PUNCT": True}, {"IS_ALPHA": True}],
-            [{"LOWER": {"IN": ["perro", "gato", "conejo", "hurón", "loro", "ave"]}}],
-        ]
-        self.matcher.add("SPECIES", species_patterns)
-
     def extract(self, doc: Doc, text: str) -> PetInfo:
-        pet_name = self._extract_pet_name(doc, text)
-        species = self._extract_species(doc, text)
+        return self.extract_with_matches(
+            text, self.match_pet_name(doc), self.match_species(doc)
+        )
+
+    @instrumented("pet_info")
+    def extract_with_matches(
+        self, text: str, pet_name: Optional[str], species: Optional[str]
+    ) -> PetInfo:
+        """
+        Build the pet info from name and species already matched on the
+        parsed text, falling back to regexes over the raw text for either.
+        """
+        pet_name = pet_name or self._extract_pet_name(text)
+        species = species or self._extract_species(text)
         breed = extract_regex_field(
             text, [r"Raza:\s*([^\n]+)", r"CANINA\s*-\s*([^\n]+)"]
         )
@@ -68,14 +90,29 @@ class PetInfoExtractor:
             coat_color=coat,
         )
 
-    def _extract_pet_name(self, doc: Doc, text: str) -> Optional[str]:
+    def match_pet_name(self, doc: Doc) -> Optional[str]:
         matches = self.matcher(doc, as_spans=True)
         for span in matches:
             if span.label_ == "PET_NAME":
                 name_text = span.text.split(":")[-1].strip()
                 if name_text:
                     return name_text
+        return None
 
+    def match_species(self, doc: Doc) -> Optional[str]:
+        for ent in doc.ents:
+            if ent.label_ == "SPECIES":
+                return self.species_of(ent.text)
+        return None
+
+    def species_of(self, matched: str) -> str:
+        """Species value of a SPECIES term matched by the gazetteer."""
+        # Matches are case and accent folded, so the term is spelled as in
+        # the gazetteer before being normalized
+        gazetteer = self.nlp.get_pipe("gazetteer").gazetteer
+        return normalize_species(gazetteer.term(matched, "SPECIES") or matched)
+
+    def _extract_pet_name(self, text: str) -> Optional[str]:
         patterns = [
             r"(?:Nombre|Paciente|Mascota):\s*([A-Za-zÁÉÍÓÚáéíóúñÑ]+)",
             r"^([A-Za-zÁÉÍÓÚáéíóúñÑ]+)\s*[-–]\s*(?:perro|gato|conejo)",
@@ -89,11 +126,7 @@ class PetInfoExtractor:
 
         return None
 
-    def _extract_species(self, doc: Doc, text: str) -> Optional[str]:
-        for ent in doc.ents:
-            if ent.label_ == "SPECIES":
-                return ent.text.capitalize()
-
+    def _extract_species(self, text: str) -> Optional[str]:
         patterns = [
             r"(?:Especie|Tipo):\s*(perro|perra|gato|gata|conejo|hurón|loro)",
             r"\b(perro|perra|gato|gata|conejo|hurón|loro)\b",
@@ -103,12 +136,6 @@ class PetInfoExtractor:
         for pattern in patterns:
             match = re.search(pattern, text, re.IGNORECASE)
             if match:
-                species = match.group(1).lower()
-                if species in ["perro", "perra", "canina"]:
-                    return "Canine"
-                elif species in ["gato", "gata", "felina"]:
-                    return "Feline"
-                else:
-                    return species.capitalize()
+                return normalize_species(match.group(1))
 
         return None
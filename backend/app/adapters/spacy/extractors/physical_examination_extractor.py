@@ -1,8 +1,10 @@
 import re
 from app.domain.models.physical_examination import PhysicalExamination
+from app.adapters.spacy.extractors.instrumentation import instrumented
 
 
 class PhysicalExaminationExtractor:
+    @instrumented("visits.physical_examination")
     def extract(self, text: str) -> PhysicalExamination:
         exam = PhysicalExamination()
 
@@ -0,0 +1,129 @@
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Every keyword a visit is split on: section headers, the keywords that end
+# a section, and the names of laboratory tests
+SECTION_KEYWORDS = [
+    "Anamnesis",
+    "Exploracion",
+    "EFG",
+    "Examen Fisico",
+    "Pruebas",
+    "Diagnostico",
+    "Dx",
+    "Tratamiento",
+    "Tx",
+    "Receta",
+    "Plan",
+    "Revision",
+    "Observaciones",
+    "Test",
+    "Analitica",
+    "Radiografia",
+    "Ecografia",
+    "Coprologico",
+]
+
+# Each keyword is its own group so lastindex tells which one matched, and
+# the lookahead finds keywords overlapping each other as well. The leading
+# class of first letters rejects most positions before the alternation is
+# tried at all.
+_FIRST_LETTERS = "".join(sorted({k[0].lower() for k in SECTION_KEYWORDS}))
+_KEYWORDS_PATTERN = re.compile(
+    f"(?=[{_FIRST_LETTERS}])"
+    "(?=(?:" + "|".join(f"({re.escape(k)})" for k in SECTION_KEYWORDS) + "))",
+    re.IGNORECASE,
+)
+_HEADER_DELIMITERS = ":\n"
+
+
+class SectionIndex:
+    """
+    Positions of every section keyword in a visit, found in one pass over its
+    text, so each field is read from the index instead of re-scanning the
+    text with its own regex.
+
+    Keywords are matched case-insensitively anywhere in the text.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._occurrences: Dict[str, List[int]] = {k: [] for k in SECTION_KEYWORDS}
+        for match in _KEYWORDS_PATTERN.finditer(text):
+            keyword = SECTION_KEYWORDS[match.lastindex - 1]
+            self._occurrences[keyword].append(match.start())
+
+    def occurrences(self, keywords: Sequence[str]) -> List[Tuple[int, int]]:
+        """
+        Returns:
+            Sorted (start, end) spans of every occurrence of the keywords
+        """
+        return sorted(
+            (start, start + len(keyword))
+            for keyword in keywords
+            for start in self._occurrences[keyword]
+        )
+
+    def section(
+        self, headers: Sequence[str], stop_keywords: Sequence[str]
+    ) -> Optional[str]:
+        """
+        Text of the first section introduced by one of the headers followed
+        by ':' or a newline. It runs up to the first occurrence of any stop
+        keyword, or to the end of the text.
+
+        Returns:
+            The stripped section text, None when no header is found, and an
+            empty string when no stop keywords are given
+        """
+        content_start = self._header_end(headers)
+        if content_start is None:
+            return None
+        if not stop_keywords:
+            return ""
+
+        end = len(self.text)
+        for keyword in stop_keywords:
+            starts = self._occurrences[keyword]
+            i = bisect_left(starts, content_start)
+            if i < len(starts) and starts[i] < end:
+                end = starts[i]
+        return self.text[content_start:end].strip()
+
+    def labelled_lines(self, keywords: Sequence[str]) -> List[Tuple[str, str]]:
+        """
+        (keyword, value) pairs for lines where a keyword is followed, on the
+        same line, by ':' and a value, or by a line break and a value on the
+        next line. The keyword is returned as written in the text.
+        """
+        pairs = []
+        position = 0
+        for start, end in self.occurrences(keywords):
+            if start < position:
+                continue
+            delimiter = self._next_delimiter(end)
+            if delimiter is None:
+                break
+            value_end = self.text.find("\n", delimiter + 1)
+            if value_end == -1:
+                value_end = len(self.text)
+            pairs.append(
+                (self.text[start:end], self.text[delimiter + 1 : value_end])
+            )
+            position = value_end
+        return pairs
+
+    def _header_end(self, headers: Sequence[str]) -> Optional[int]:
+        for _, end in self.occurrences(headers):
+            if end < len(self.text) and self.text[end] in _HEADER_DELIMITERS:
+                return end + 1
+        return None
+
+    def _next_delimiter(self, position: int) -> Optional[int]:
+        newline = self.text.find("\n", position)
+        line_end = newline if newline != -1 else len(self.text)
+        colon = self.text.find(":", position, line_end)
+        if colon != -1:
+            return colon
+        return newline if newline != -1 else None
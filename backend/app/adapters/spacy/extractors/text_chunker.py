@@ -0,0 +1,40 @@
+from typing import Iterator, Tuple
+from app.adapters.spacy.extractors.visit_segmenter import segment_visits
+
+
+def chunk_text(text: str, max_chars: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split text into chunks of at most max_chars for parsing one at a time.
+    Chunks end where a visit starts, packing as many whole visits as fit.
+    A visit longer than max_chars is split at line breaks, and a line longer
+    than that at the last space, or at max_chars when it has none.
+
+    Returns:
+        Contiguous (start, end) offsets covering the whole text, in order
+    """
+    cuts = [span.start for span in segment_visits(text)] + [len(text)]
+    chunk_start = 0
+    segment_start = 0
+    for segment_end in cuts:
+        if segment_end - chunk_start <= max_chars:
+            segment_start = segment_end
+            continue
+        if segment_start > chunk_start:
+            yield chunk_start, segment_start
+            chunk_start = segment_start
+        while segment_end - chunk_start > max_chars:
+            cut = _split_point(text, chunk_start, chunk_start + max_chars)
+            yield chunk_start, cut
+            chunk_start = cut
+        segment_start = segment_end
+
+    if chunk_start < len(text):
+        yield chunk_start, len(text)
+
+
+def _split_point(text: str, start: int, limit: int) -> int:
+    for separator in ("\n", " "):
+        position = text.rfind(separator, start, limit)
+        if position != -1:
+            return position + 1
+    return limit
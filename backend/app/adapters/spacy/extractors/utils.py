@@ -31,12 +31,3 @@ def parse_date(date_str: str) -> Optional[datetime]:
 
     return None
 
-
-def extract_section_text(
-    text: str, header_pattern: str, stop_headers: List[str]
-) -> Optional[str]:
-    pattern = f"{header_pattern}[:\n](.*?)(?:{'|'.join(stop_headers)}|$)"
-    match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    return None
@@ -1,7 +1,9 @@
 from app.domain.models.veterinary_info import VeterinaryInfo
+from app.adapters.spacy.extractors.instrumentation import instrumented
 
 
 class VeterinaryInfoExtractor:
+    @instrumented("veterinary_info")
     def extract(self, text: str) -> VeterinaryInfo:
         lines = text.split("\n")
         clinic_name = None
@@ -1,5 +1,5 @@
 import re
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 
 from spacy.language import Language
 from spacy.matcher import Matcher
@@ -7,11 +7,10 @@ from spacy.tokens import Doc
 
 from app.domain.models.visit import Visit
 from app.domain.models.physical_examination import PhysicalExamination
-from app.adapters.spacy.extractors.utils import (
-    extract_regex_field,
-    parse_date,
-    extract_section_text,
-)
+from app.adapters.spacy.extractors.utils import extract_regex_field, parse_date
+from app.adapters.spacy.extractors.instrumentation import instrumented
+from app.adapters.spacy.extractors.section_index import SectionIndex
+from app.adapters.spacy.extractors.visit_segmenter import VisitSpan, segment_visits
 from app.adapters.spacy.extractors.physical_examination_extractor import (
     PhysicalExaminationExtractor,
 )
@@ -48,91 +47,39 @@ class VisitExtractor:
         self.matcher.add("DATE", date_patterns)
 
     def extract(self, doc: Doc, text: str) -> List[Visit]:
+        return self.extract_from_text(text)
+
+    @instrumented("visits")
+    def extract_from_text(self, text: str) -> List[Visit]:
+        return self._parse_spans(text, segment_visits(text))
+
+    @instrumented("visits.closed", matches=lambda result: len(result[0]))
+    def extract_closed(self, text: str, start: int = 0) -> Tuple[List[Visit], int]:
+        """
+        Parse the visits in text[start:] that are already closed by the
+        header of a following visit, for text that is still growing.
+
+        Returns:
+            The closed visits and the offset where the still open visit (or
+            the text not yet known to belong to any visit) begins
+        """
+        tail = text[start:]
+        spans = list(segment_visits(tail))
+        if not spans:
+            return [], start
+        return self._parse_spans(tail, spans[:-1]), start + spans[-1].start
+
+    def _parse_spans(self, text: str, spans: Iterable[VisitSpan]) -> List[Visit]:
         visits = []
-
-        # Use named groups to identify what we matched
-        visit_markers = [
-            # Date and Time: = 08/12/19 - 16:12 -
-            r"(?:^|\n)\s*[=-]\s*(?P<date_time>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\s*-\s*(?P<time>\d{1,2}:\d{2})",
-            # Date only: = 08/12/19
-            r"(?:^|\n)\s*[=-]\s*(?P<date_only>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-            # Explicit header: VISITA DEL DIA 08/12/2019
-            r"(?:^|\n)\s*VISITA.*DEL D[IÍ]A\s+(?P<date_explicit>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-            # Numbered visit: Visita 1
-            r"(?:^|\n)\s*(?:Visita|Consulta)\s+(?P<number>\d+)",
-        ]
-
-        found_sections = []
-        for pattern in visit_markers:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                start = match.start()
-                # Adjust start to skip the newline if it was matched
-                if text[start] == "\n":
-                    start += 1
-
-                date_str = None
-                time_str = None
-
-                groups = match.groupdict()
-                if groups.get("date_time"):
-                    date_str = groups["date_time"]
-                    time_str = groups.get("time")
-                elif groups.get("date_only"):
-                    date_str = groups["date_only"]
-                elif groups.get("date_explicit"):
-                    date_str = groups["date_explicit"]
-                # For numbered visits, we don't have a date in the header
-
-                found_sections.append(
-                    {
-                        "start": start,
-                        "end_header": match.end(),
-                        "date_str": date_str,
-                        "time_str": time_str,
-                        "full_match": match.group(0),
-                    }
-                )
-
-        # Deduplicate and sort
-        # If two matches start at the same position (ignoring whitespace/newlines), keep the longest one
-        found_sections.sort(key=lambda x: x["start"])
-
-        unique_sections = []
-        if found_sections:
-            current = found_sections[0]
-            for next_section in found_sections[1:]:
-                # If the next section starts within the current section's header, it's likely a sub-match or duplicate
-                if next_section["start"] < current["end_header"]:
-                    # Keep the one with the longer header (more specific match)
-                    if (next_section["end_header"] - next_section["start"]) > (
-                        current["end_header"] - current["start"]
-                    ):
-                        current = next_section
-                else:
-                    unique_sections.append(current)
-                    current = next_section
-            unique_sections.append(current)
-
-        for i, section in enumerate(unique_sections):
-            start = section["start"]
-            # The content starts after the header
-            content_start = section["end_header"]
-
-            end = (
-                unique_sections[i + 1]["start"]
-                if i + 1 < len(unique_sections)
-                else len(text)
-            )
-            section_text = text[content_start:end]
-
+        for span in spans:
             visit = self._parse_visit_section(
-                section_text, section.get("date_str"), section.get("time_str")
+                text[span.content_start : span.end], span.date_str, span.time_str
             )
             if visit:
                 visits.append(visit)
-
         return visits
 
+    @instrumented("visits.section")
     def _parse_visit_section(
         self, text: str, date_str: Optional[str] = None, time_str: Optional[str] = None
     ) -> Optional[Visit]:
@@ -150,13 +97,14 @@ class VisitExtractor:
             ],
         )
 
-        anamnesis = extract_section_text(
-            text, "Anamnesis", ["Exploracion", "Tratamiento", "Pruebas"]
+        sections = SectionIndex(text)
+
+        anamnesis = sections.section(
+            ["Anamnesis"], ["Exploracion", "Tratamiento", "Pruebas"]
         )
 
-        exam_text = extract_section_text(
-            text,
-            "(?:Exploracion|EFG|Examen Fisico)",
+        exam_text = sections.section(
+            ["Exploracion", "EFG", "Examen Fisico"],
             ["Tratamiento", "Pruebas", "Diagnostico"],
         )
         physical_exam = None
@@ -170,8 +118,8 @@ class VisitExtractor:
             physical_exam.weight = float(weight_match.group(1).replace(",", "."))
 
         diagnosis_list = []
-        diagnosis_text = extract_section_text(
-            text, "(?:Diagnostico|Dx)", ["Tratamiento", "Pruebas"]
+        diagnosis_text = sections.section(
+            ["Diagnostico", "Dx"], ["Tratamiento", "Pruebas"]
         )
         if diagnosis_text:
             diags = [
@@ -179,10 +127,10 @@ class VisitExtractor:
             ]
             diagnosis_list.extend(diags)
 
-        treatment_list = self.medication_extractor.extract(text)
-        tests_list = self.laboratory_test_extractor.extract(text)
+        treatment_list = self.medication_extractor.extract(sections)
+        tests_list = self.laboratory_test_extractor.extract(sections)
 
-        plan = extract_section_text(text, "(?:Plan|Revision)", [])
+        plan = sections.section(["Plan", "Revision"], [])
 
         if (
             reason
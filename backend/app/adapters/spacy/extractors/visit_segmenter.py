@@ -0,0 +1,54 @@
+import re
+from typing import Iterator, NamedTuple, Optional
+
+_DATE = r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}"
+
+# Every kind of visit header in one alternation, so the text is scanned
+# once. Where two kinds can start at the same place the longer one is tried
+# first: a date with its time before a bare date, and an explicit
+# "VISITA ... DEL DIA <date>" header before a numbered "Visita <n>".
+VISIT_HEADER_PATTERN = re.compile(
+    r"(?:^|\n)\s*(?:"
+    # Date and Time: = 08/12/19 - 16:12 -   or date only: = 08/12/19
+    rf"[=-]\s*(?P<date>{_DATE})(?:\s*-\s*(?P<time>\d{{1,2}}:\d{{2}}))?"
+    # Explicit header: VISITA DEL DIA 08/12/2019
+    rf"|VISITA.*DEL D[IÍ]A\s+(?P<date_explicit>{_DATE})"
+    # Numbered visit: Visita 1
+    r"|(?:Visita|Consulta)\s+(?P<number>\d+)"
+    r")",
+    re.IGNORECASE,
+)
+
+
+class VisitSpan(NamedTuple):
+    # Where the header starts, where it ends and the visit content begins,
+    # and where the next visit starts (or the text ends)
+    start: int
+    content_start: int
+    end: int
+    date_str: Optional[str] = None
+    time_str: Optional[str] = None
+
+
+def segment_visits(text: str) -> Iterator[VisitSpan]:
+    """
+    Split text into visits in a single pass over it.
+
+    Returns:
+        Ordered, non-overlapping VisitSpan for every visit header found
+    """
+    previous = None
+    for match in VISIT_HEADER_PATTERN.finditer(text):
+        start = match.start()
+        # Skip the newline if it was matched
+        if text[start] == "\n":
+            start += 1
+        if previous is not None:
+            yield VisitSpan(previous[0], previous[1], start, previous[2], previous[3])
+
+        # Numbered visits have no date in the header
+        date_str = match.group("date") or match.group("date_explicit")
+        previous = (start, match.end(), date_str, match.group("time"))
+
+    if previous is not None:
+        yield VisitSpan(previous[0], previous[1], len(text), previous[2], previous[3])
@@ -0,0 +1,50 @@
+import logging
+import re
+from app.domain.medical_record_extractor import (
+    EXTRACTION_MODE_FAST,
+    MedicalRecordExtractor,
+)
+from app.domain.models.medical_record import MedicalRecord
+from app.adapters.spacy.spacy_medical_record_extractor import (
+    SpacyMedicalRecordExtractor,
+)
+from app.adapters.spacy.extractors.instrumentation import instrumented
+
+logger = logging.getLogger(__name__)
+
+# A name label the PET_NAME Matcher pattern can read past, e.g. "Nombre - Toby"
+_NAME_LABEL_PATTERN = re.compile(r"\b(?:nombre|paciente)\s*[^\w\s]", re.IGNORECASE)
+
+
+class FastMedicalRecordExtractor(MedicalRecordExtractor):
+    """
+    Extracts records with the regexes alone, without building a spaCy Doc.
+    The NLP path only adds the pet name and species, so a text is escalated
+    to it when the regexes miss the species, which the gazetteer knows many
+    more words for, or miss a name that follows a label the Matcher reads.
+    """
+
+    def __init__(self, extractor: SpacyMedicalRecordExtractor):
+        self.extractor = extractor
+
+    def settings(self) -> dict:
+        return {**self.extractor.settings(), "mode": EXTRACTION_MODE_FAST}
+
+    def extract(self, text: str) -> MedicalRecord:
+        record = self.extractor.extract_without_nlp(text)
+        if not self._needs_nlp(text, record):
+            return record
+        logger.info("Pet name or species left to NLP, escalating")
+        return self._escalate(text)
+
+    @instrumented("medical_record.escalated")
+    def _escalate(self, text: str) -> MedicalRecord:
+        return self.extractor.extract(text)
+
+    def _needs_nlp(self, text: str, record: MedicalRecord) -> bool:
+        # Empty texts have nothing more to find
+        if record.pet_info is None:
+            return False
+        if not record.pet_info.species:
+            return True
+        return not record.pet_info.name and bool(_NAME_LABEL_PATTERN.search(text))
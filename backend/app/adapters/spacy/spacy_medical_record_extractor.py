@@ -1,68 +1,262 @@
 import spacy
+import hashlib
 import logging
 import time
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
-from app.domain.medical_record_extractor import MedicalRecordExtractor
+from spacy.tokens import Doc
+
+from app.domain.medical_record_extractor import (
+    IncrementalExtraction,
+    MedicalRecordExtractor,
+)
 from app.domain.models.medical_record import MedicalRecord
+from app.domain.models.record_extraction import RecordExtraction
 from app.adapters.spacy.extractors.pet_info_extractor import PetInfoExtractor
 from app.adapters.spacy.extractors.veterinary_info_extractor import (
     VeterinaryInfoExtractor,
 )
 from app.adapters.spacy.extractors.visit_extractor import VisitExtractor
+from app.adapters.spacy.extractors.text_chunker import chunk_text
+from app.adapters.spacy.extractors.instrumentation import instrumented
+
+# Registers the "gazetteer" pipeline component
+import app.adapters.spacy.extractors.gazetteer  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
+SPACY_PROFILE_FULL = "full"
+SPACY_PROFILE_LEAN = "lean"
+
+# The extractors only read token attributes set by the tokenizer and the
+# entities of the gazetteer, so the lean profile does not load the
+# statistical components at all.
+LEAN_EXCLUDED_COMPONENTS = [
+    "tok2vec",
+    "tagger",
+    "morphologizer",
+    "parser",
+    "senter",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+]
+
+
+def rules_version() -> str:
+    """
+    Fingerprint of the extraction rules: the source of this adapter and of
+    its extractors. Editing any of them changes the version, so records
+    cached by an older version are no longer served.
+    """
+    digest = hashlib.sha256()
+    adapter_dir = Path(__file__).parent
+    sources = [Path(__file__)] + sorted((adapter_dir / "extractors").glob("*.py"))
+    for source in sources:
+        digest.update(source.name.encode("utf-8"))
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
 
 class SpacyMedicalRecordExtractor(MedicalRecordExtractor):
 
-    def __init__(self, model_name: str = "es_core_news_sm"):
-        logger.info(f"Loading Spacy model: {model_name}")
+    def __init__(
+        self,
+        model_name: str = "es_core_news_sm",
+        profile: str = SPACY_PROFILE_LEAN,
+        chunk_chars: Optional[int] = 100_000,
+        gazetteer_path: Optional[str] = None,
+    ):
+        if profile not in (SPACY_PROFILE_FULL, SPACY_PROFILE_LEAN):
+            raise ValueError(f"Unknown Spacy profile: {profile}")
+        logger.info(f"Loading Spacy model: {model_name} ({profile} profile)")
         start_time = time.time()
-        self.nlp = spacy.load(model_name)
+        exclude = LEAN_EXCLUDED_COMPONENTS if profile == SPACY_PROFILE_LEAN else []
+        self.nlp = spacy.load(model_name, exclude=exclude)
+        self.profile = profile
         logger.info(f"Spacy model loaded in {time.time() - start_time:.2f} seconds")
-        self._add_entity_ruler()
+        self._add_gazetteer(gazetteer_path)
+        # Texts longer than this are parsed in chunks of at most this size,
+        # which bounds memory and keeps below spaCy's max_length
+        self.chunk_chars = chunk_chars
 
         self.pet_info_extractor = PetInfoExtractor(self.nlp)
         self.veterinary_info_extractor = VeterinaryInfoExtractor()
         self.visit_extractor = VisitExtractor(self.nlp)
+        self.rules_version = rules_version()
+
+    def settings(self) -> dict:
+        return {
+            "model": self.nlp.meta.get("name"),
+            "model_version": self.nlp.meta.get("version"),
+            "spacy_version": spacy.__version__,
+            "profile": self.profile,
+            "chunk_chars": self.chunk_chars,
+            "rules_version": self.rules_version,
+            "gazetteer": self.nlp.get_pipe("gazetteer").gazetteer.version,
+        }
+
+    def _add_gazetteer(self, gazetteer_path: Optional[str]):
+        # Before the statistical NER when loaded, so its entities take precedence
+        config = {"path": gazetteer_path}
+        if "ner" in self.nlp.pipe_names:
+            self.nlp.add_pipe("gazetteer", before="ner", config=config)
+        else:
+            self.nlp.add_pipe("gazetteer", config=config)
 
-    def _add_entity_ruler(self):
-        ruler = self.nlp.add_pipe("entity_ruler", before="ner")
-
-        patterns = [
-            {"label": "SPECIES", "pattern": "perro"},
-            {"label": "SPECIES", "pattern": "perra"},
-            {"label": "SPECIES", "pattern": "gato"},
-            {"label": "SPECIES", "pattern": "gata"},
-            {"label": "SPECIES", "pattern": "conejo"},
-            {"label": "SPECIES", "pattern": "hurón"},
-            {"label": "SPECIES", "pattern": "loro"},
-            {"label": "SYMPTOM", "pattern": "vómitos"},
-            {"label": "SYMPTOM", "pattern": "diarrea"},
-            {"label": "SYMPTOM", "pattern": "fiebre"},
-            {"label": "SYMPTOM", "pattern": "tos"},
-            {"label": "SYMPTOM", "pattern": "cojera"},
-            {"label": "SYMPTOM", "pattern": "decaimiento"},
-            {"label": "SYMPTOM", "pattern": "inapetencia"},
-            {"label": "MEDICATION", "pattern": "amoxicilina"},
-            {"label": "MEDICATION", "pattern": "meloxicam"},
-            {"label": "MEDICATION", "pattern": "prednisona"},
-            {"label": "MEDICATION", "pattern": "metronidazol"},
-            {"label": "MEDICATION", "pattern": "enrofloxacino"},
-        ]
-        ruler.add_patterns(patterns)
+    def start_incremental(self) -> IncrementalExtraction:
+        return SpacyIncrementalExtraction(self)
 
+    @instrumented("medical_record")
     def extract(self, text: str) -> MedicalRecord:
         if not text or not text.strip():
             return MedicalRecord()
+        if self._needs_chunking(text):
+            return self._extract_chunked(text)
 
         start_time = time.time()
         logger.info("Starting Spacy extraction")
-        doc = self.nlp(text)
+        doc = self._parse(text)
         logger.info(f"Spacy NLP processing took {time.time() - start_time:.2f} seconds")
 
-        doc = self.nlp(text)
+        return self._extract_from_doc(doc, text)
+
+    def extract_many(
+        self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1
+    ) -> Iterator[RecordExtraction]:
+        # Texts handed to nlp.pipe whose result was not yielded yet, oldest first
+        pending: deque[tuple[int, str]] = deque()
+        items = enumerate(texts)
+
+        def piped(text) -> bool:
+            # Worker processes hang on input the tokenizer rejects, and long
+            # texts are parsed in chunks, so neither goes through the pipe
+            return isinstance(text, str) and not self._needs_chunking(text)
+
+        def feed():
+            for index, text in items:
+                text = "" if text is None else text
+                pending.append((index, text))
+                if piped(text):
+                    yield text
+
+        def extract_unpiped():
+            while pending and not piped(pending[0][1]):
+                index, text = pending.popleft()
+                if isinstance(text, str):
+                    yield self._extract_one(index, text)
+                else:
+                    yield RecordExtraction(
+                        index=index, error=f"Expected text, got {type(text).__name__}"
+                    )
+
+        while True:
+            try:
+                for doc in self.nlp.pipe(
+                    feed(), batch_size=batch_size, n_process=n_process
+                ):
+                    yield from extract_unpiped()
+                    index, text = pending.popleft()
+                    yield self._record_extraction(index, text, doc)
+                yield from extract_unpiped()
+                return
+            except Exception as e:
+                # A text the pipeline cannot process aborts its whole batch, so
+                # the texts in flight are parsed one by one to isolate it
+                logger.warning(
+                    f"Batch Spacy processing failed, retrying {len(pending)} documents one by one: {e}"
+                )
+                if not pending:
+                    for index, text in items:
+                        yield self._extract_one(index, text)
+                    return
+                while pending:
+                    index, text = pending.popleft()
+                    yield self._extract_one(index, text)
+
+    def _extract_one(self, index: int, text: str) -> RecordExtraction:
+        try:
+            return RecordExtraction(index=index, record=self.extract(text))
+        except Exception as e:
+            logger.error(f"Medical record extraction failed for document {index}: {e}")
+            return RecordExtraction(index=index, error=str(e))
+
+    def _record_extraction(self, index: int, text: str, doc: Doc) -> RecordExtraction:
+        try:
+            if not text or not text.strip():
+                return RecordExtraction(index=index, record=MedicalRecord())
+            return RecordExtraction(
+                index=index, record=self._extract_from_doc(doc, text)
+            )
+        except Exception as e:
+            logger.error(f"Medical record extraction failed for document {index}: {e}")
+            return RecordExtraction(index=index, error=str(e))
+
+    @instrumented("nlp")
+    def _parse(self, text: str) -> Doc:
+        return self.nlp(text)
+
+    def _needs_chunking(self, text: str) -> bool:
+        return bool(self.chunk_chars) and len(text) > self.chunk_chars
+
+    def _extract_chunked(self, text: str) -> MedicalRecord:
+        """
+        Parse a long text chunk by chunk, cut on visit boundaries. Visits are
+        read from the raw text, and the pet name and species are the first
+        matches in document order, so the chunks are only parsed until both
+        are found.
+        """
+        start_time = time.time()
+        spans = list(chunk_text(text, self.chunk_chars))
+        logger.info(f"Starting chunked Spacy extraction of {len(spans)} chunks")
+
+        pet_name = None
+        species = None
+        parsed = 0
+        for start, end in spans:
+            doc = self._parse(text[start:end])
+            parsed += 1
+            pet_name = pet_name or self.pet_info_extractor.match_pet_name(doc)
+            species = species or self.pet_info_extractor.match_species(doc)
+            if pet_name and species:
+                break
+        logger.info(
+            f"Spacy NLP processing of {parsed}/{len(spans)} chunks took {time.time() - start_time:.2f} seconds"
+        )
+
+        return self._extract_with_matches(text, pet_name, species)
+
+    @instrumented("medical_record.regex")
+    def extract_without_nlp(self, text: str) -> MedicalRecord:
+        """
+        Extract the record with the regexes alone, without parsing the text.
+        The species comes from the gazetteer run over the raw text and the
+        pet name from the regex fallback instead of the Matcher.
+        """
+        if not text or not text.strip():
+            return MedicalRecord()
+        span = self.nlp.get_pipe("gazetteer").gazetteer.first(text, "SPECIES")
+        species = (
+            self.pet_info_extractor.species_of(text[span[0] : span[1]])
+            if span
+            else None
+        )
+        return self._extract_with_matches(text, None, species)
 
+    def _extract_with_matches(
+        self, text: str, pet_name: Optional[str], species: Optional[str]
+    ) -> MedicalRecord:
+        return MedicalRecord(
+            pet_info=self.pet_info_extractor.extract_with_matches(
+                text, pet_name, species
+            ),
+            veterinary_info=self.veterinary_info_extractor.extract(text),
+            visits=self.visit_extractor.extract_from_text(text),
+        )
+
+    def _extract_from_doc(self, doc: Doc, text: str) -> MedicalRecord:
         clinic_info = self.veterinary_info_extractor.extract(text)
         pet_info = self.pet_info_extractor.extract(doc, text)
         visits = self.visit_extractor.extract(doc, text)
@@ -70,3 +264,74 @@ class SpacyMedicalRecordExtractor(MedicalRecordExtractor):
         return MedicalRecord(
             pet_info=pet_info, veterinary_info=clinic_info, visits=visits
         )
+
+
+class SpacyIncrementalExtraction(IncrementalExtraction):
+    """
+    Parses each page as it arrives and closes a visit as soon as the header
+    of the next one shows up, so finish() only has the last visit and the
+    document-level fields left to do.
+    """
+
+    def __init__(self, extractor: SpacyMedicalRecordExtractor):
+        super().__init__(extractor)
+        self.pet_name = None
+        self.species = None
+        self.visits = []
+        # The pages joined as in the full text, from where the visit that
+        # may still continue on the next page starts. Closed visits are
+        # dropped, so a page only copies the open visit along with it.
+        self._open_text = ""
+
+    def add_page(self, text: str) -> None:
+        if self.pages:
+            self._open_text += "\n" + text
+        else:
+            self._open_text = text
+        super().add_page(text)
+
+        if text.strip():
+            start_time = time.time()
+            self._match_pet_info(text)
+            logger.info(
+                f"Spacy NLP processing of page {len(self.pages)} took {time.time() - start_time:.2f} seconds"
+            )
+
+        visits, open_visit_start = self.extractor.visit_extractor.extract_closed(
+            self._open_text
+        )
+        self.visits.extend(visits)
+        self._open_text = self._open_text[open_visit_start:]
+
+    def _match_pet_info(self, text: str) -> None:
+        # Long pages are parsed in chunks like whole documents, and only
+        # until both matches are found
+        extractor = self.extractor
+        if extractor._needs_chunking(text):
+            spans = chunk_text(text, extractor.chunk_chars)
+        else:
+            spans = [(0, len(text))]
+        for start, end in spans:
+            if self.pet_name is not None and self.species is not None:
+                break
+            doc = extractor._parse(text[start:end])
+            if self.pet_name is None:
+                self.pet_name = extractor.pet_info_extractor.match_pet_name(doc)
+            if self.species is None:
+                self.species = extractor.pet_info_extractor.match_species(doc)
+
+    def finish(self) -> MedicalRecord:
+        text = self.text
+        if not text:
+            return MedicalRecord()
+
+        visits = self.visits + self.extractor.visit_extractor.extract_from_text(
+            self._open_text
+        )
+        return MedicalRecord(
+            pet_info=self.extractor.pet_info_extractor.extract_with_matches(
+                text, self.pet_name, self.species
+            ),
+            veterinary_info=self.extractor.veterinary_info_extractor.extract(text),
+            visits=visits,
+        )
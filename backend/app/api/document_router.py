@@ -1,8 +1,10 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, status
 from fastapi.concurrency import run_in_threadpool
 from app.api.dtos.document import DocumentUploadResponse
 from app.api.dtos.medical_record_dto import MedicalRecordDTO
 from app.domain.document_service import DocumentService
+from app.domain.medical_record_extractor import EXTRACTION_MODES
 from app.core.dependencies import get_document_service
 
 router = APIRouter()
@@ -14,6 +16,11 @@ ALLOWED_EXTENSIONS = {"pdf", "jpg", "jpeg", "png", "docx", "txt"}
 @router.post("/document", response_model=DocumentUploadResponse)
 async def upload_document(
     file: UploadFile = File(...),
+    extraction_mode: Optional[str] = Query(
+        None,
+        description="nlp, or fast to use regexes alone unless key fields are missing. "
+        "Defaults to the deployment's EXTRACTION_MODE",
+    ),
     document_service: DocumentService = Depends(get_document_service),
 ):
     file_type = file.filename.split(".")[-1].lower()
@@ -21,6 +28,11 @@ async def upload_document(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type"
         )
+    if extraction_mode is not None and extraction_mode not in EXTRACTION_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported extraction mode",
+        )
 
     file_content = await file.read()
     if len(file_content) == 0:
@@ -35,7 +47,11 @@ async def upload_document(
         )
 
     document = await run_in_threadpool(
-        document_service.create_document, file.filename, file_type, file_content
+        document_service.create_document,
+        file.filename,
+        file_type,
+        file_content,
+        extraction_mode,
     )
     return DocumentUploadResponse.from_domain(document)
 
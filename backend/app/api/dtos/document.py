@@ -2,7 +2,10 @@ from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional, Any
 from app.domain.models.document import Document
-from app.adapters.postgres.schema.DocumentSchema import serialize_dataclass
+from app.adapters.mappers.record_mapper import (
+    serialize_dataclass,
+    serialize_extraction_report,
+)
 
 
 class DocumentUploadResponse(BaseModel):
@@ -12,11 +15,15 @@ class DocumentUploadResponse(BaseModel):
     file_type: str = Field(..., description="File type (pdf, jpg, docx, txt, etc.)")
     file_size: int = Field(..., description="File size in bytes")
     extracted_text: Optional[str] = Field(
-        None, description="Text extracted from document"
+        None,
+        description="Text extracted from document, left out when editing the record",
     )
     medical_record: Optional[dict[str, Any]] = Field(
         None, description="Structured medical record data extracted from document"
     )
+    extraction_report: Optional[dict[str, Any]] = Field(
+        None, description="How each page of the document was read (text layer or OCR)"
+    )
     created_at: datetime = Field(..., description="Creation timestamp")
 
     @staticmethod
@@ -26,11 +33,18 @@ class DocumentUploadResponse(BaseModel):
             filename=document.filename,
             file_type=document.file_type,
             file_size=document.file_size,
-            extracted_text=document.extracted_text,
+            # Left out when the document was loaded without it, rather than
+            # read just for the response
+            extracted_text=(
+                document.extracted_text
+                if document.is_loaded("extracted_text")
+                else None
+            ),
             medical_record=(
                 serialize_dataclass(document.medical_record)
                 if document.medical_record
                 else None
             ),
+            extraction_report=serialize_extraction_report(document.extraction_report),
             created_at=document.created_at,
         )
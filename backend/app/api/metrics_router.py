@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from app.core.dependencies import get_ocr_cache, get_ocr_scheduler, get_record_cache
+from app.adapters.spacy.extractors.instrumentation import extractor_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics/cache")
+def cache_metrics():
+    ocr_cache = get_ocr_cache()
+    record_cache = get_record_cache()
+    return {
+        "ocr": ocr_cache.stats() if ocr_cache is not None else None,
+        "medical_record": record_cache.stats() if record_cache is not None else None,
+    }
+
+
+@router.get("/metrics/ocr")
+def ocr_metrics():
+    return {"scheduler": get_ocr_scheduler().stats()}
+
+
+@router.get("/metrics/extraction")
+def extraction_metrics():
+    return {
+        "enabled": extractor_metrics.enabled,
+        "extractors": extractor_metrics.stats(),
+    }
@@ -1,4 +1,4 @@
-import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -7,7 +7,41 @@ class Config(BaseSettings):
     model_config = ConfigDict(env_file=".env", case_sensitive=False)
     database_url: str
     environment: str = "development"
+    blob_store_dir: str = "blobs"
     spacy_model: str = "es_core_news_sm"
+    spacy_profile: str = "lean"
+    spacy_chunk_chars: Optional[int] = 100_000
+    spacy_gazetteer_path: Optional[str] = None
+    extraction_mode: str = "nlp"
+    extraction_pipelined: bool = False
+    extractor_metrics_enabled: bool = True
+    record_cache_enabled: bool = True
+    record_cache_memory_max_bytes: int = 32 * 1024 * 1024
+    record_cache_dir: Optional[str] = None
+    record_cache_max_bytes: int = 256 * 1024 * 1024
+    ocr_engine: str = "tesseract"
+    ocr_language: str = "eng"
+    ocr_pool_size: Optional[int] = None
+    ocr_scheduler_workers: Optional[int] = None
+    ocr_tesseract_threads: int = 1
+    ocr_pdf_page_window: int = 4
+    ocr_use_pdf_text_layer: bool = True
+    ocr_text_layer_min_chars: int = 20
+    ocr_cache_enabled: bool = True
+    ocr_cache_memory_max_bytes: int = 64 * 1024 * 1024
+    ocr_cache_dir: Optional[str] = None
+    ocr_cache_max_bytes: int = 512 * 1024 * 1024
+    ocr_page_cache_enabled: bool = False
+    ocr_preprocess_enabled: bool = True
+    ocr_target_dpi: int = 200
+    ocr_binarize: bool = False
+    ocr_binarize_threshold: int = 160
+    ocr_tiered_enabled: bool = False
+    ocr_fast_scale: float = 0.5
+    ocr_fast_config: str = "--psm 6"
+    ocr_confidence_threshold: float = 80.0
+    ocr_page_timeout: Optional[float] = 60.0
+    ocr_document_timeout: Optional[float] = 300.0
 
 
 config = Config()
@@ -1,14 +1,46 @@
 from functools import lru_cache
+from typing import Optional
 from fastapi import Depends
 from app.domain.document_service import DocumentService
 from app.domain.document_repository import DocumentRepository
 from app.domain.text_extractor import TextExtractor
-from app.domain.medical_record_extractor import MedicalRecordExtractor
+from app.domain.blob_store import BlobStore
+from app.domain.medical_record_extractor import (
+    EXTRACTION_MODE_FAST,
+    EXTRACTION_MODE_NLP,
+    EXTRACTION_MODES,
+    MedicalRecordExtractor,
+)
 from app.adapters.postgres.sql_repository import SQLDocumentRepository
+from app.adapters.blob.local_blob_store import LocalBlobStore
 from app.adapters.ocr.tesseract_ocr_adapter import TesseractOCRAdapter
+from app.adapters.ocr.tesserocr_pool_adapter import TesserocrPoolAdapter
+from app.adapters.ocr.cached_text_extractor import CachedTextExtractor
+from app.adapters.ocr.image_preprocessor import ImagePreprocessor
+from app.adapters.ocr.ocr_scheduler import OCRScheduler, shared_scheduler
+from app.adapters.cache.memory_cache import LRUMemoryCache
+from app.adapters.cache.disk_cache import DiskCache
+from app.adapters.cache.tiered_cache import TieredCache
+from app.adapters.cache.cached_medical_record_extractor import (
+    CachedMedicalRecordExtractor,
+)
+from app.adapters.formats.docx_text_extractor import DocxTextExtractor
+from app.adapters.formats.plain_text_extractor import PlainTextExtractor
+from app.adapters.formats.text_extractor_registry import TextExtractorRegistry
+from app.adapters.formats.format_sniffer import (
+    FORMAT_DOCX,
+    FORMAT_JPEG,
+    FORMAT_PDF,
+    FORMAT_PNG,
+    FORMAT_TXT,
+)
 from app.adapters.spacy.spacy_medical_record_extractor import (
     SpacyMedicalRecordExtractor,
 )
+from app.adapters.spacy.fast_medical_record_extractor import (
+    FastMedicalRecordExtractor,
+)
+from app.adapters.spacy.extractors.instrumentation import extractor_metrics
 from app.adapters.postgres.database import SessionLocal
 from app.core.config import config
 
@@ -18,13 +50,136 @@ def get_document_repository() -> DocumentRepository:
     return SQLDocumentRepository(db)
 
 
+@lru_cache()
+def get_blob_store() -> BlobStore:
+    return LocalBlobStore(config.blob_store_dir)
+
+
+@lru_cache()
+def get_ocr_cache() -> Optional[TieredCache]:
+    if not config.ocr_cache_enabled:
+        return None
+    disk = (
+        DiskCache(config.ocr_cache_dir, max_bytes=config.ocr_cache_max_bytes)
+        if config.ocr_cache_dir
+        else None
+    )
+    memory = LRUMemoryCache(max_bytes=config.ocr_cache_memory_max_bytes)
+    return TieredCache(memory, disk)
+
+
+@lru_cache()
+def get_record_cache() -> Optional[TieredCache]:
+    if not config.record_cache_enabled:
+        return None
+    disk = (
+        DiskCache(config.record_cache_dir, max_bytes=config.record_cache_max_bytes)
+        if config.record_cache_dir
+        else None
+    )
+    memory = LRUMemoryCache(max_bytes=config.record_cache_memory_max_bytes)
+    return TieredCache(memory, disk)
+
+
+@lru_cache()
+def get_ocr_scheduler() -> OCRScheduler:
+    return shared_scheduler(
+        workers=config.ocr_scheduler_workers,
+        tesseract_threads=config.ocr_tesseract_threads,
+    )
+
+
+def _build_image_preprocessor() -> Optional[ImagePreprocessor]:
+    if not config.ocr_preprocess_enabled:
+        return None
+    return ImagePreprocessor(
+        target_dpi=config.ocr_target_dpi,
+        binarize=config.ocr_binarize,
+        binarize_threshold=config.ocr_binarize_threshold,
+    )
+
+
+def _build_ocr_engine() -> TesseractOCRAdapter:
+    page_cache = get_ocr_cache() if config.ocr_page_cache_enabled else None
+    preprocessor = _build_image_preprocessor()
+    if config.ocr_engine == "tesserocr_pool":
+        return TesserocrPoolAdapter(
+            pool_size=config.ocr_pool_size,
+            pdf_page_window=config.ocr_pdf_page_window,
+            scheduler=get_ocr_scheduler(),
+            lang=config.ocr_language,
+            use_pdf_text_layer=config.ocr_use_pdf_text_layer,
+            text_layer_min_chars=config.ocr_text_layer_min_chars,
+            page_cache=page_cache,
+            preprocessor=preprocessor,
+            tiered=config.ocr_tiered_enabled,
+            fast_scale=config.ocr_fast_scale,
+            confidence_threshold=config.ocr_confidence_threshold,
+            page_timeout=config.ocr_page_timeout,
+            document_timeout=config.ocr_document_timeout,
+        )
+    if config.ocr_engine == "tesseract":
+        return TesseractOCRAdapter(
+            pdf_page_window=config.ocr_pdf_page_window,
+            scheduler=get_ocr_scheduler(),
+            lang=config.ocr_language,
+            use_pdf_text_layer=config.ocr_use_pdf_text_layer,
+            text_layer_min_chars=config.ocr_text_layer_min_chars,
+            page_cache=page_cache,
+            preprocessor=preprocessor,
+            tiered=config.ocr_tiered_enabled,
+            fast_scale=config.ocr_fast_scale,
+            fast_config=config.ocr_fast_config,
+            confidence_threshold=config.ocr_confidence_threshold,
+            page_timeout=config.ocr_page_timeout,
+            document_timeout=config.ocr_document_timeout,
+        )
+    raise ValueError(f"Unknown OCR engine: {config.ocr_engine}")
+
+
+@lru_cache()
 def get_text_extractor() -> TextExtractor:
-    return TesseractOCRAdapter()
+    registry = TextExtractorRegistry()
+    ocr = _build_ocr_engine()
+    for file_format in (FORMAT_PDF, FORMAT_JPEG, FORMAT_PNG):
+        registry.register(file_format, ocr)
+    registry.register(FORMAT_TXT, PlainTextExtractor())
+    registry.register(FORMAT_DOCX, DocxTextExtractor())
+
+    cache = get_ocr_cache()
+    if cache is not None:
+        return CachedTextExtractor(registry, cache)
+    return registry
+
+
+@lru_cache()
+def get_spacy_medical_record_extractor() -> SpacyMedicalRecordExtractor:
+    extractor_metrics.enabled = config.extractor_metrics_enabled
+    return SpacyMedicalRecordExtractor(
+        model_name=config.spacy_model,
+        profile=config.spacy_profile,
+        chunk_chars=config.spacy_chunk_chars,
+        gazetteer_path=config.spacy_gazetteer_path,
+    )
 
 
 @lru_cache()
+def get_medical_record_extractor_for_mode(mode: str) -> MedicalRecordExtractor:
+    if mode == EXTRACTION_MODE_NLP:
+        extractor = get_spacy_medical_record_extractor()
+    elif mode == EXTRACTION_MODE_FAST:
+        extractor = FastMedicalRecordExtractor(get_spacy_medical_record_extractor())
+    else:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+
+    cache = get_record_cache()
+    if cache is not None:
+        return CachedMedicalRecordExtractor(extractor, cache)
+    return extractor
+
+
 def get_medical_record_extractor() -> MedicalRecordExtractor:
-    return SpacyMedicalRecordExtractor(model_name=config.spacy_model)
+    return get_medical_record_extractor_for_mode(config.extraction_mode)
 
 
 def get_document_service(
@@ -33,5 +188,16 @@ def get_document_service(
     medical_record_extractor: MedicalRecordExtractor = Depends(
         get_medical_record_extractor
     ),
+    blob_store: BlobStore = Depends(get_blob_store),
 ) -> DocumentService:
-    return DocumentService(repository, text_extractor, medical_record_extractor)
+    return DocumentService(
+        repository,
+        text_extractor,
+        medical_record_extractor,
+        pipelined=config.extraction_pipelined,
+        medical_record_extractors={
+            mode: get_medical_record_extractor_for_mode(mode)
+            for mode in EXTRACTION_MODES
+        },
+        blob_store=blob_store,
+    )
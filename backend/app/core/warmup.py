@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from io import BytesIO
+from typing import Optional
+from PIL import Image, ImageDraw, ImageFont
+from app.adapters.ocr.cached_text_extractor import CachedTextExtractor
+from app.adapters.spacy.extractors.instrumentation import extractor_metrics
+from app.core.dependencies import (
+    get_spacy_medical_record_extractor,
+    get_text_extractor,
+)
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = """CLINICA VETERINARIA
+Datos de la Mascota
+Nombre: Toby
+Especie: perro
+= 01/01/20 - 10:00 -
+Motivo: revision
+Exploracion:
+- peso 4,1 kg
+- temperatura 38,5°C
+Diagnostico:
+- sano
+Tratamiento:
+- amoxicilina
+"""
+
+# Printed on the OCR warm-up image, whose last word OCR has to read back
+WARMUP_OCR_TEXT = "Datos de la Mascota"
+
+
+class Readiness:
+    """Whether the models have been loaded and exercised once."""
+
+    def __init__(self):
+        self.models_ready = False
+        # Why the warm-up failed, which keeps the pod unready
+        self.error: Optional[str] = None
+        self.warmup_seconds = None
+
+
+readiness = Readiness()
+
+
+def warm_up(stop: Optional[threading.Event] = None) -> None:
+    """
+    Load the record extractor and the OCR engine and run a dummy document
+    through each, so the first real upload does not pay for it. Both are
+    called past their caches, which could otherwise answer without them,
+    and their calls are left out of the extractor metrics.
+
+    Args:
+        stop: Set on shutdown; the step running finishes and the next ones
+            are skipped
+    """
+    start_time = time.time()
+    logger.info("Warming up models")
+
+    with extractor_metrics.paused():
+        try:
+            get_spacy_medical_record_extractor().extract(WARMUP_TEXT)
+        except Exception as e:
+            # Uploads would fail the same way
+            _fail(f"Medical record extractor warm-up failed: {e}")
+            return
+
+    if stop is not None and stop.is_set():
+        logger.info("Warm-up stopped before OCR")
+        return
+
+    text_extractor = get_text_extractor()
+    if isinstance(text_extractor, CachedTextExtractor):
+        text_extractor = text_extractor.extractor
+    try:
+        text = text_extractor.extract(_warmup_image(), "png").text
+    except Exception as e:
+        _fail(f"OCR warm-up failed: {e}")
+        return
+    # Extraction errors are logged and come back as empty text, so the text
+    # read is what tells whether OCR works
+    expected = WARMUP_OCR_TEXT.split()[-1]
+    if expected.lower() not in text.lower():
+        _fail(f"OCR warm-up read {text!r} instead of {WARMUP_OCR_TEXT!r}")
+        return
+
+    readiness.warmup_seconds = time.time() - start_time
+    readiness.models_ready = True
+    logger.info(f"Models warmed up in {readiness.warmup_seconds:.2f} seconds")
+
+
+def _fail(message: str) -> None:
+    logger.error(message)
+    readiness.error = message
+
+
+def _warmup_image() -> bytes:
+    # Printed large, as the default bitmap font is too small for Tesseract
+    # to read reliably, and at the resolution the preprocessor targets
+    font = ImageFont.load_default(size=48)
+    left, top, right, bottom = font.getbbox(WARMUP_OCR_TEXT)
+    image = Image.new("L", (right - left + 80, bottom - top + 80), color=255)
+    ImageDraw.Draw(image).text(
+        (40 - left, 40 - top), WARMUP_OCR_TEXT, fill=0, font=font
+    )
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", dpi=(200, 200))
+    return buffer.getvalue()
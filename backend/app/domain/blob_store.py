@@ -0,0 +1,55 @@
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+def blob_hash(data: bytes) -> str:
+    """SHA-256 hex digest a blob is stored and referenced by."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed storage for the original uploaded files, which are
+    kept out of the documents table. A blob is stored once however many
+    documents reference it.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob, unless one with the same content is already stored
+
+        Args:
+            data: Raw file bytes
+
+        Returns:
+            SHA-256 hex digest of the data, to read it back with
+        """
+        pass
+
+    @abstractmethod
+    def get(self, digest: str) -> Optional[bytes]:
+        """
+        Read a blob
+
+        Args:
+            digest: SHA-256 hex digest returned by put
+
+        Returns:
+            The blob bytes, or None if no such blob is stored
+        """
+        pass
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        """
+        Check whether a blob is stored
+
+        Args:
+            digest: SHA-256 hex digest returned by put
+
+        Returns:
+            True if the blob is stored
+        """
+        pass
@@ -1,5 +1,15 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
 from app.domain.models.document import Document
+from app.domain.models.medical_record import MedicalRecord
+
+# What get_by_id reads: the metadata columns alone, those and the medical
+# record, or every field. Fields left out are loaded lazily by the Document
+# when first accessed.
+PROJECTION_METADATA = "metadata"
+PROJECTION_RECORD = "record"
+PROJECTION_FULL = "full"
 
 
 class DocumentRepository(ABC):
@@ -18,12 +28,15 @@ class DocumentRepository(ABC):
         pass
 
     @abstractmethod
-    def get_by_id(self, document_id: str) -> Document:
+    def get_by_id(
+        self, document_id: str, projection: str = PROJECTION_FULL
+    ) -> Document:
         """
         Get a document by ID
 
         Args:
             document_id: Document ID
+            projection: Fields read up front, one of the PROJECTION_* values
 
         Returns:
             Document object or None if not found
@@ -33,7 +46,8 @@ class DocumentRepository(ABC):
     @abstractmethod
     def update(self, document: Document) -> Document:
         """
-        Update a document
+        Update a document. Heavy fields left out of its load, or only read
+        lazily since, are left as stored.
 
         Args:
             document: Domain Document object
@@ -42,3 +56,59 @@ class DocumentRepository(ABC):
             Updated Document object
         """
         pass
+
+    @abstractmethod
+    def update_medical_record(
+        self, document_id: str, medical_record: MedicalRecord, edited_at: datetime
+    ) -> Optional[Document]:
+        """
+        Replace the medical record of a document as edited by hand, in a
+        single statement that also returns the updated document
+
+        Args:
+            document_id: Document ID
+            medical_record: New medical record
+            edited_at: When the record was edited
+
+        Returns:
+            The updated document, with its extracted text left unloaded, or
+            None if no document has that ID
+        """
+        pass
+
+    @abstractmethod
+    def stream_extracted_texts(
+        self,
+        after_id: Optional[str] = None,
+        skip_edited: bool = False,
+        chunk_size: int = 500,
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Stream the extracted text of every document that has any, in ID
+        order, without loading them all in memory
+
+        Args:
+            after_id: Only documents with a greater ID, to resume a pass
+            skip_edited: Leave out documents whose record was edited by hand
+            chunk_size: Rows fetched from the database at a time
+
+        Returns:
+            Iterator of (document ID, extracted text)
+        """
+        pass
+
+    @abstractmethod
+    def update_medical_records(
+        self, records: Dict[str, MedicalRecord], skip_edited: bool = False
+    ) -> int:
+        """
+        Replace the medical records of many documents in one transaction
+
+        Args:
+            records: New medical record by document ID
+            skip_edited: Leave records edited by hand in the meantime untouched
+
+        Returns:
+            Number of documents updated
+        """
+        pass
@@ -1,11 +1,21 @@
 import uuid
 import logging
+import queue
+import threading
 import time
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
 from app.domain.models.document import Document
 from app.domain.document_repository import DocumentRepository
 from app.domain.text_extractor import TextExtractor
-from app.domain.medical_record_extractor import MedicalRecordExtractor
+from app.domain.blob_store import BlobStore, blob_hash
+from app.domain.medical_record_extractor import (
+    IncrementalExtraction,
+    MedicalRecordExtractor,
+    normalize_page,
+    normalize_text,
+)
+from app.domain.models.text_extraction import TextExtraction
 
 from app.domain.models.medical_record import MedicalRecord
 
@@ -18,64 +28,193 @@ class DocumentService:
         repository: DocumentRepository,
         text_extractor: TextExtractor,
         medical_record_extractor: Optional[MedicalRecordExtractor] = None,
+        pipelined: bool = False,
+        medical_record_extractors: Optional[Dict[str, MedicalRecordExtractor]] = None,
+        blob_store: Optional[BlobStore] = None,
     ):
         self.repository = repository
         self.text_extractor = text_extractor
         self.medical_record_extractor = medical_record_extractor
+        # Feed pages to the record extractor while later pages are still read
+        self.pipelined = pipelined
+        # Extractors that can be picked per document, by extraction mode
+        self.medical_record_extractors = medical_record_extractors or {}
+        # Keeps the original files; without one only their hash is recorded
+        self.blob_store = blob_store
 
     def create_document(
         self,
         filename: str,
         file_type: str,
         file_data: bytes,
+        extraction_mode: Optional[str] = None,
     ) -> Document:
         document_id = str(uuid.uuid4())
+        extractor = self._medical_record_extractor(extraction_mode)
 
-        start_time = time.time()
-        logger.info(f"Starting text extraction for document {document_id} ({filename})")
-        extracted_text = self.text_extractor.extract_text(file_data, file_type)
-        ocr_duration = time.time() - start_time
-        logger.info(
-            f"Text extraction for document {document_id} took {ocr_duration:.2f} seconds"
-        )
-
-        medical_record = None
-        if self.medical_record_extractor and extracted_text:
-            try:
-                start_time = time.time()
-                logger.info(
-                    f"Starting medical record extraction for document {document_id}"
-                )
-                medical_record = self.medical_record_extractor.extract(extracted_text)
-                extraction_duration = time.time() - start_time
-                logger.info(
-                    f"Medical record extraction for document {document_id} took {extraction_duration:.2f} seconds"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Error extracting medical record for document {document_id}: {e}"
-                )
-                pass
+        if self.pipelined and extractor:
+            text_extraction, medical_record = self._extract_pipelined(
+                document_id, filename, file_type, file_data, extractor
+            )
+        else:
+            text_extraction = self._extract_text(
+                document_id, filename, file_type, file_data
+            )
+            medical_record = self._extract_medical_record(
+                document_id, text_extraction.text, extractor
+            )
 
+        # Stored before the row that references it is saved
+        file_hash = (
+            self.blob_store.put(file_data) if self.blob_store else blob_hash(file_data)
+        )
         document = Document(
             id=document_id,
             filename=filename,
             file_type=file_type,
             file_size=len(file_data),
             file_data=file_data,
-            extracted_text=extracted_text,
+            file_hash=file_hash,
+            extracted_text=text_extraction.text,
             medical_record=medical_record,
+            extraction_report=text_extraction.report,
         )
         saved_document = self.repository.save(document)
         return saved_document
 
+    def _medical_record_extractor(
+        self, extraction_mode: Optional[str]
+    ) -> Optional[MedicalRecordExtractor]:
+        if extraction_mode is None:
+            return self.medical_record_extractor
+        if extraction_mode not in self.medical_record_extractors:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        return self.medical_record_extractors[extraction_mode]
+
+    def _extract_text(
+        self,
+        document_id: str,
+        filename: str,
+        file_type: str,
+        file_data: bytes,
+        on_page: Optional[Callable[[str], None]] = None,
+    ) -> TextExtraction:
+        start_time = time.time()
+        logger.info(f"Starting text extraction for document {document_id} ({filename})")
+        if on_page is None:
+            text_extraction = self.text_extractor.extract(file_data, file_type)
+        else:
+            text_extraction = self.text_extractor.extract_streaming(
+                file_data, file_type, on_page
+            )
+        ocr_duration = time.time() - start_time
+        logger.info(
+            f"Text extraction for document {document_id} took {ocr_duration:.2f} seconds"
+        )
+        if text_extraction.report.pages:
+            logger.info(
+                f"Pages read per method for document {document_id}: "
+                f"{text_extraction.report.pages_by_method()}"
+            )
+        if text_extraction.report.timed_out_pages():
+            logger.warning(
+                f"Document {document_id} stored with partial text, pages "
+                f"{text_extraction.report.timed_out_pages()} timed out"
+            )
+        return text_extraction
+
+    def _extract_medical_record(
+        self,
+        document_id: str,
+        extracted_text: str,
+        extractor: Optional[MedicalRecordExtractor],
+        incremental: Optional[IncrementalExtraction] = None,
+    ) -> Optional[MedicalRecord]:
+        if not extractor or not extracted_text:
+            return None
+        try:
+            start_time = time.time()
+            logger.info(
+                f"Starting medical record extraction for document {document_id}"
+            )
+            if incremental is not None:
+                medical_record = incremental.finish()
+            else:
+                medical_record = extractor.extract(extracted_text)
+            extraction_duration = time.time() - start_time
+            logger.info(
+                f"Medical record extraction for document {document_id} took {extraction_duration:.2f} seconds"
+            )
+            return medical_record
+        except Exception as e:
+            logger.error(
+                f"Error extracting medical record for document {document_id}: {e}"
+            )
+            return None
+
+    def _extract_pipelined(
+        self,
+        document_id: str,
+        filename: str,
+        file_type: str,
+        file_data: bytes,
+        extractor: MedicalRecordExtractor,
+    ) -> tuple[TextExtraction, Optional[MedicalRecord]]:
+        """
+        Extract the medical record page by page on a separate thread while
+        the following pages are still being read, so the total time nears
+        the slower of both stages instead of their sum.
+        """
+        incremental = extractor.start_incremental()
+        pages: queue.Queue = queue.Queue()
+        errors: list[Exception] = []
+
+        def consume_pages():
+            while (page := pages.get()) is not None:
+                if errors:
+                    continue
+                try:
+                    # Same line breaks and Unicode form as the normalized text
+                    incremental.add_page(normalize_page(page))
+                except Exception as e:
+                    errors.append(e)
+
+        consumer = threading.Thread(
+            target=consume_pages, name=f"record-extraction-{document_id}"
+        )
+        consumer.start()
+        try:
+            text_extraction = self._extract_text(
+                document_id, filename, file_type, file_data, on_page=pages.put
+            )
+        finally:
+            pages.put(None)
+            consumer.join()
+
+        extracted_text = text_extraction.text
+        if errors:
+            # The pages fed so far are given up on, not the record
+            logger.error(
+                f"Error extracting medical record page by page for document "
+                f"{document_id}, extracting it from the whole text: {errors[0]}"
+            )
+            return text_extraction, self._extract_medical_record(
+                document_id, extracted_text, extractor
+            )
+        if normalize_text(incremental.text) != normalize_text(extracted_text):
+            # Nothing was streamed (cache hit, formats read in one go) or the
+            # extraction failed half way, so the final text goes the regular
+            # way, chunked and through the record cache
+            return text_extraction, self._extract_medical_record(
+                document_id, extracted_text, extractor
+            )
+        return text_extraction, self._extract_medical_record(
+            document_id, extracted_text, extractor, incremental
+        )
+
     def update_medical_record(
         self, document_id: str, medical_record: MedicalRecord
     ) -> Optional[Document]:
-        document = self.repository.get_by_id(document_id)
-        if not document:
-            return None
-
-        document.medical_record = medical_record
-        updated_document = self.repository.update(document)
-        return updated_document
+        return self.repository.update_medical_record(
+            document_id, medical_record, datetime.now(timezone.utc)
+        )
@@ -1,5 +1,32 @@
+import unicodedata
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
 from app.domain.models.medical_record import MedicalRecord
+from app.domain.models.record_extraction import RecordExtraction
+
+# Full NLP extraction, or regexes alone escalating to NLP when key fields
+# come back empty
+EXTRACTION_MODE_NLP = "nlp"
+EXTRACTION_MODE_FAST = "fast"
+EXTRACTION_MODES = (EXTRACTION_MODE_NLP, EXTRACTION_MODE_FAST)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a text for comparing and keying records: NFC, '\\n'
+    line breaks and no surrounding whitespace. OCR runs and re-uploads of
+    the same document that differ only in these get the same record.
+    """
+    return normalize_page(text).strip()
+
+
+def normalize_page(text: str) -> str:
+    """
+    normalize_text without the stripping, for pages that are joined into a
+    text: NFC and '\\n' line breaks.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
 
 
 class MedicalRecordExtractor(ABC):
@@ -16,3 +43,72 @@ class MedicalRecordExtractor(ABC):
             MedicalRecord: Structured medical record with pet info, visits, treatments, etc.
         """
         pass
+
+    def extract_many(
+        self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1
+    ) -> Iterator[RecordExtraction]:
+        """
+        Extract medical records from many texts, e.g. to reprocess stored
+        documents. A failure on one text is reported in its result and does
+        not stop the others.
+
+        Args:
+            texts: Raw texts, consumed lazily
+            batch_size: Texts processed together, for extractors that batch
+            n_process: Worker processes, for extractors that parallelize
+
+        Returns:
+            Iterator of RecordExtraction in the same order as the texts
+        """
+        for index, text in enumerate(texts):
+            try:
+                yield RecordExtraction(index=index, record=self.extract(text))
+            except Exception as e:
+                yield RecordExtraction(index=index, error=str(e))
+
+    def settings(self) -> dict:
+        """
+        Settings and rules version that change the extracted record for the
+        same text, used to key cached extraction results.
+
+        Returns:
+            JSON-serializable dict of settings
+        """
+        return {}
+
+    def start_incremental(self) -> "IncrementalExtraction":
+        """
+        Start extracting a record from a document whose pages arrive one by
+        one, e.g. while later pages are still being OCR'd.
+
+        Returns:
+            IncrementalExtraction to feed pages to and finish once all arrived
+        """
+        return IncrementalExtraction(self)
+
+
+class IncrementalExtraction:
+    """
+    Record extraction fed page by page. This base version only collects the
+    pages and extracts on finish(); extractors that can do work per page
+    return a subclass from start_incremental().
+    """
+
+    def __init__(self, extractor: MedicalRecordExtractor):
+        self.extractor = extractor
+        self.pages: list[str] = []
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.pages).strip()
+
+    def add_page(self, text: str) -> None:
+        self.pages.append(text)
+
+    def finish(self) -> MedicalRecord:
+        """
+        Returns:
+            MedicalRecord for all pages added, the same as extract() would
+            return for their text
+        """
+        return self.extractor.extract(self.text)
@@ -1,33 +1,95 @@
 from datetime import datetime, timezone
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Callable, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.domain.models.medical_record import MedicalRecord
+    from app.domain.models.text_extraction import ExtractionReport
+
+
+class _NotLoaded:
+    def __repr__(self) -> str:
+        return "NOT_LOADED"
+
+
+# Value of a heavy field a repository left out of a load
+NOT_LOADED: Any = _NotLoaded()
+
+
+class _LazyField:
+    """
+    Heavy Document field that, when left out of a load, is read through the
+    document's loader the first time it is accessed. Assigning it replaces
+    the value without reading the stored one, and marks the field as one to
+    write back.
+    """
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+        self.attribute = f"_{name}"
+
+    def __get__(self, document: "Document", owner=None) -> Any:
+        if document is None:
+            return self
+        value = getattr(document, self.attribute)
+        if value is NOT_LOADED:
+            value = document._loader(self.name)
+            setattr(document, self.attribute, value)
+        return value
+
+    def __set__(self, document: "Document", value: Any) -> None:
+        setattr(document, self.attribute, value)
+        if value is not NOT_LOADED:
+            document._assigned.add(self.name)
 
 
 class Document:
 
+    extracted_text = _LazyField()
+    medical_record = _LazyField()
+    extraction_report = _LazyField()
+
     def __init__(
         self,
         id: str,
         filename: str,
         file_type: str,
         file_size: int,
-        file_data: bytes,
+        file_data: Optional[bytes] = None,
         extracted_text: Optional[str] = None,
         medical_record: Optional["MedicalRecord"] = None,
+        extraction_report: Optional["ExtractionReport"] = None,
         created_at: Optional[datetime] = None,
         updated_at: Optional[datetime] = None,
+        medical_record_edited_at: Optional[datetime] = None,
+        file_hash: Optional[str] = None,
+        loader: Optional[Callable[[str], Any]] = None,
     ):
         self.id = id
         self.filename = filename
         self.file_type = file_type
         self.file_size = file_size
+        # The original file lives in the blob store under file_hash; its
+        # bytes are only set on documents being created
         self.file_data = file_data
+        self.file_hash = file_hash
+        # Reads a field passed as NOT_LOADED, by name, when first accessed
+        self._loader = loader
+        self._assigned = set()
         self.extracted_text = extracted_text
         self.medical_record = medical_record
+        self.extraction_report = extraction_report
         self.created_at = created_at or datetime.now(timezone.utc)
         self.updated_at = updated_at or datetime.now(timezone.utc)
+        # Set when the record is edited by hand, which re-extraction keeps
+        self.medical_record_edited_at = medical_record_edited_at
+
+    def is_loaded(self, field: str) -> bool:
+        """Whether a heavy field holds a value, loaded or assigned."""
+        return getattr(self, f"_{field}") is not NOT_LOADED
+
+    def is_assigned(self, field: str) -> bool:
+        """Whether a heavy field was given a value rather than loaded lazily."""
+        return field in self._assigned
 
     def __repr__(self) -> str:
         return f"Document(id={self.id}, filename={self.filename})"
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional
+from app.domain.models.medical_record import MedicalRecord
+
+
+@dataclass
+class RecordExtraction:
+
+    # Position of the text in the batch it was extracted from
+    index: int
+    record: Optional[MedicalRecord] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,40 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+PAGE_METHOD_TEXT_LAYER = "text_layer"
+PAGE_METHOD_OCR = "ocr"
+OCR_TIER_FAST = "fast"
+OCR_TIER_ACCURATE = "accurate"
+
+
+@dataclass
+class PageExtraction:
+
+    page_number: int
+    method: str
+    tier: Optional[str] = None
+    confidence: Optional[float] = None
+    timed_out: bool = False
+
+
+@dataclass
+class ExtractionReport:
+
+    pages: list[PageExtraction] = field(default_factory=list)
+
+    def pages_by_method(self) -> dict[str, int]:
+        return dict(Counter(page.method for page in self.pages))
+
+    def pages_by_tier(self) -> dict[str, int]:
+        return dict(Counter(page.tier for page in self.pages if page.tier))
+
+    def timed_out_pages(self) -> list[int]:
+        return [page.page_number for page in self.pages if page.timed_out]
+
+
+@dataclass
+class TextExtraction:
+
+    text: str
+    report: ExtractionReport = field(default_factory=ExtractionReport)
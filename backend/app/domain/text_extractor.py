@@ -1,9 +1,45 @@
 from abc import ABC, abstractmethod
+from typing import Callable
+from app.domain.models.text_extraction import TextExtraction
 
 
 class TextExtractor(ABC):
 
     @abstractmethod
+    def extract(self, file_data: bytes, file_type: str) -> TextExtraction:
+        """
+        Extract text from document, reporting how each page was read
+
+        Args:
+            file_data: Raw file bytes
+            file_type: File extension (pdf, jpg, png, etc.)
+
+        Returns:
+            TextExtraction with the text content and a per-page report
+        """
+        pass
+
+    def extract_streaming(
+        self, file_data: bytes, file_type: str, on_page: Callable[[str], None]
+    ) -> TextExtraction:
+        """
+        Extract text like extract(), handing each page's text to on_page in
+        page order as soon as it and every page before it are ready.
+
+        Extractors that cannot stream return without calling on_page, and the
+        caller uses the returned text as a whole. Otherwise the pages joined
+        by newlines make up the returned text.
+
+        Args:
+            file_data: Raw file bytes
+            file_type: File extension (pdf, jpg, png, etc.)
+            on_page: Called with the text of each page
+
+        Returns:
+            TextExtraction with the text content and a per-page report
+        """
+        return self.extract(file_data, file_type)
+
     def extract_text(self, file_data: bytes, file_type: str) -> str:
         """
         Extract text from document
@@ -15,4 +51,14 @@ class TextExtractor(ABC):
         Returns:
             Extracted text content
         """
-        pass
+        return self.extract(file_data, file_type).text
+
+    def settings(self) -> dict:
+        """
+        Settings that change the extracted text for the same input, used to
+        key cached extraction results.
+
+        Returns:
+            JSON-serializable dict of settings
+        """
+        return {}
@@ -0,0 +1,230 @@
+"""
+Re-extract the medical records of the documents already stored, e.g. after
+the extraction rules in app/adapters/spacy/extractors have changed.
+
+Usage (from backend/):
+    python -m app.jobs.reextract_records --workers 4 --batch-size 200 \\
+        --max-rate 50 --skip-edited --checkpoint reextract_checkpoint.json
+
+Extracted texts are streamed from the database in ID order and extracted in
+batches across a process pool. Each batch is written back in one
+transaction, then the checkpoint is saved, so an interrupted run started
+again with the same checkpoint resumes after the last batch written.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from app.domain.document_repository import DocumentRepository
+from app.domain.medical_record_extractor import MedicalRecordExtractor
+from app.domain.models.record_extraction import RecordExtraction
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReextractionCheckpoint:
+    last_id: Optional[str] = None
+    processed: int = 0
+    updated: int = 0
+    failed: int = 0
+
+    @staticmethod
+    def load(path: Optional[str]) -> "ReextractionCheckpoint":
+        if not path or not os.path.exists(path):
+            return ReextractionCheckpoint()
+        with open(path, "r", encoding="utf-8") as f:
+            return ReextractionCheckpoint(**json.load(f))
+
+    def save(self, path: Optional[str]) -> None:
+        if not path:
+            return
+        # Replaced atomically, so a crash never leaves a truncated checkpoint
+        directory = Path(path).resolve().parent
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+
+# The extractor of a pool worker process, built once by _init_worker
+_worker_extractor: Optional[MedicalRecordExtractor] = None
+
+
+def _init_worker() -> None:
+    global _worker_extractor
+    from app.core.dependencies import get_medical_record_extractor
+
+    _worker_extractor = get_medical_record_extractor()
+
+
+def _extract_in_worker(texts: List[str]) -> List[RecordExtraction]:
+    return list(_worker_extractor.extract_many(texts))
+
+
+class RecordReextractionJob:
+    """
+    Streams the stored texts, re-extracts their records and writes them
+    back batch by batch, pacing itself to at most max_rate documents per
+    second so live traffic keeps its share of the database and CPU.
+    """
+
+    def __init__(
+        self,
+        repository: DocumentRepository,
+        extractor: Optional[MedicalRecordExtractor],
+        batch_size: int = 100,
+        workers: int = 1,
+        max_rate: Optional[float] = None,
+        skip_edited: bool = False,
+        checkpoint_path: Optional[str] = None,
+    ):
+        self.repository = repository
+        self.extractor = extractor
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_rate = max_rate
+        self.skip_edited = skip_edited
+        self.checkpoint_path = checkpoint_path
+
+    def run(self) -> ReextractionCheckpoint:
+        checkpoint = ReextractionCheckpoint.load(self.checkpoint_path)
+        if checkpoint.last_id is not None:
+            logger.info(
+                f"Resuming re-extraction after document {checkpoint.last_id} "
+                f"({checkpoint.processed} already processed)"
+            )
+
+        batches = self._batches(
+            self.repository.stream_extracted_texts(
+                after_id=checkpoint.last_id,
+                skip_edited=self.skip_edited,
+                chunk_size=self.batch_size,
+            )
+        )
+
+        start_time = time.monotonic()
+        processed_this_run = 0
+        for ids, results in self._extract(batches):
+            records = {}
+            for document_id, result in zip(ids, results):
+                if result.ok:
+                    records[document_id] = result.record
+                else:
+                    checkpoint.failed += 1
+                    logger.error(
+                        f"Re-extraction failed for document {document_id}: {result.error}"
+                    )
+
+            checkpoint.updated += self.repository.update_medical_records(
+                records, skip_edited=self.skip_edited
+            )
+            checkpoint.processed += len(ids)
+            checkpoint.last_id = ids[-1]
+            checkpoint.save(self.checkpoint_path)
+
+            processed_this_run += len(ids)
+            logger.info(
+                f"Re-extracted {checkpoint.processed} documents, "
+                f"{checkpoint.updated} updated, {checkpoint.failed} failed"
+            )
+            self._throttle(processed_this_run, start_time)
+
+        logger.info(
+            f"Re-extraction finished in {time.monotonic() - start_time:.2f} seconds"
+        )
+        return checkpoint
+
+    def _batches(
+        self, rows: Iterable[Tuple[str, str]]
+    ) -> Iterator[Tuple[List[str], List[str]]]:
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            ids, texts = zip(*batch)
+            yield list(ids), list(texts)
+
+    def _extract(
+        self, batches: Iterator[Tuple[List[str], List[str]]]
+    ) -> Iterator[Tuple[List[str], List[RecordExtraction]]]:
+        if self.workers <= 1:
+            for ids, texts in batches:
+                yield ids, list(self.extractor.extract_many(texts))
+            return
+
+        # Batches are completed in order with a bounded number in flight, so
+        # the checkpoint only moves past batches that are fully written
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker
+        ) as pool:
+            in_flight: deque = deque()
+            for ids, texts in batches:
+                in_flight.append((ids, pool.submit(_extract_in_worker, texts)))
+                if len(in_flight) >= self.workers * 2:
+                    ids, future = in_flight.popleft()
+                    yield ids, future.result()
+            while in_flight:
+                ids, future = in_flight.popleft()
+                yield ids, future.result()
+
+    def _throttle(self, processed: int, start_time: float) -> None:
+        if not self.max_rate:
+            return
+        ahead = processed / self.max_rate - (time.monotonic() - start_time)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--max-rate", type=float, default=None, help="Documents per second"
+    )
+    parser.add_argument(
+        "--skip-edited",
+        action="store_true",
+        help="Keep records edited by hand through the API",
+    )
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    from app.core.dependencies import (
+        get_document_repository,
+        get_medical_record_extractor,
+    )
+
+    # With a pool the records are extracted in the workers, which load
+    # their own extractor
+    job = RecordReextractionJob(
+        get_document_repository(),
+        get_medical_record_extractor() if args.workers <= 1 else None,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        max_rate=args.max_rate,
+        skip_edited=args.skip_edited,
+        checkpoint_path=args.checkpoint,
+    )
+    checkpoint = job.run()
+    print(json.dumps(asdict(checkpoint)))
+
+
+if __name__ == "__main__":
+    main()
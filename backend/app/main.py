@@ -1,7 +1,13 @@
+import asyncio
 import logging
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api import document_router
+from fastapi.responses import JSONResponse
+from app.api import document_router, metrics_router
+from app.adapters.postgres import database
 from app.adapters.postgres.database import Base, engine
+from app.core.warmup import readiness, warm_up
 
 # Configure logging
 logging.basicConfig(
@@ -9,10 +15,45 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
-app = FastAPI(title="barkibu-api", version="0.1.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health answers while models load, and
+    # /ready tells the load balancer when the pod can take traffic
+    stop_warmup = threading.Event()
+    asyncio.get_running_loop().run_in_executor(None, warm_up, stop_warmup)
+    yield
+    # A model call cannot be interrupted, so a warm-up still running only
+    # skips its remaining steps
+    stop_warmup.set()
+
+
+app = FastAPI(title="barkibu-api", version="0.1.0", lifespan=lifespan)
 app.include_router(document_router.router, prefix="/api/v1")
+app.include_router(metrics_router.router, prefix="/api/v1")
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check():
+    if readiness.error:
+        return JSONResponse(status_code=503, content={"status": "warmup_failed"})
+    if not readiness.models_ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    try:
+        database.check_connection()
+    except Exception as e:
+        logger.warning(f"Readiness check failed, database unavailable: {e}")
+        return JSONResponse(
+            status_code=503, content={"status": "database_unavailable"}
+        )
+    return {
+        "status": "ready",
+        "warmup_seconds": readiness.warmup_seconds,
+    }
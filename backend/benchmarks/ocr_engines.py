@@ -0,0 +1,84 @@
+"""
+Compare the per-file OCR latency of the available Tesseract engines.
+
+Usage (from backend/):
+    python -m benchmarks.ocr_engines [files...] --repeat 5
+
+The first run of every engine is reported separately as the cold start so the
+cost of spawning the tesserocr pool does not skew the steady-state numbers.
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from app.adapters.ocr.ocr_scheduler import shared_scheduler
+from app.adapters.ocr.tesseract_ocr_adapter import TesseractOCRAdapter
+from app.adapters.ocr.tesserocr_pool_adapter import TesserocrPoolAdapter
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "tests" / "examples"
+DEFAULT_FILES = [
+    EXAMPLES_DIR / "medical_scan.png",
+    EXAMPLES_DIR / "medical_scan.jpg",
+    EXAMPLES_DIR / "clinical_history.pdf",
+]
+
+
+def run_engine(engine, files: list[Path], repeat: int) -> list[dict]:
+    rows = []
+    for path in files:
+        data = path.read_bytes()
+        file_type = path.suffix.lstrip(".").lower()
+
+        start = time.perf_counter()
+        engine.extract_text(data, file_type)
+        cold = time.perf_counter() - start
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.extract_text(data, file_type)
+            timings.append(time.perf_counter() - start)
+
+        rows.append(
+            {
+                "file": path.name,
+                "cold": cold,
+                "mean": statistics.mean(timings),
+                "p50": statistics.median(timings),
+                "min": min(timings),
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, default=DEFAULT_FILES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--lang", default="eng")
+    args = parser.parse_args()
+
+    scheduler = shared_scheduler(workers=args.pool_size)
+    engines = {
+        "tesseract": TesseractOCRAdapter(scheduler=scheduler, lang=args.lang),
+        "tesserocr_pool": TesserocrPoolAdapter(scheduler=scheduler, lang=args.lang),
+    }
+
+    print(f"{'engine':<16} {'file':<28} {'cold':>8} {'mean':>8} {'p50':>8} {'min':>8}")
+    for name, engine in engines.items():
+        try:
+            for row in run_engine(engine, args.files, args.repeat):
+                print(
+                    f"{name:<16} {row['file']:<28} {row['cold']:>8.3f} "
+                    f"{row['mean']:>8.3f} {row['p50']:>8.3f} {row['min']:>8.3f}"
+                )
+        finally:
+            if hasattr(engine, "close"):
+                engine.close()
+
+
+if __name__ == "__main__":
+    main()
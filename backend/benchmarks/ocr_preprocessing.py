@@ -0,0 +1,45 @@
+"""
+Measure per-file OCR latency with and without the image preprocessing stage.
+
+Usage (from backend/):
+    python -m benchmarks.ocr_preprocessing [files...] --repeat 5 --target-dpi 200
+"""
+
+import argparse
+from pathlib import Path
+
+from app.adapters.ocr.image_preprocessor import ImagePreprocessor
+from app.adapters.ocr.tesseract_ocr_adapter import TesseractOCRAdapter
+from benchmarks.ocr_engines import DEFAULT_FILES, run_engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, default=DEFAULT_FILES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-dpi", type=int, default=200)
+    parser.add_argument("--binarize", action="store_true")
+    parser.add_argument("--lang", default="eng")
+    args = parser.parse_args()
+
+    variants = {
+        "raw": TesseractOCRAdapter(lang=args.lang),
+        "preprocessed": TesseractOCRAdapter(
+            lang=args.lang,
+            preprocessor=ImagePreprocessor(
+                target_dpi=args.target_dpi, binarize=args.binarize
+            ),
+        ),
+    }
+
+    print(f"{'variant':<14} {'file':<28} {'cold':>8} {'mean':>8} {'p50':>8} {'min':>8}")
+    for name, engine in variants.items():
+        for row in run_engine(engine, args.files, args.repeat):
+            print(
+                f"{name:<14} {row['file']:<28} {row['cold']:>8.3f} "
+                f"{row['mean']:>8.3f} {row['p50']:>8.3f} {row['min']:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Measure end-to-end document throughput: text extraction (OCR included),
+medical record extraction and persistence, as DocumentService.create_document
+runs them.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///benchmark.db python -m benchmarks.pipeline \\
+        --documents 20 --visits 20 --pages 3 --noise 0.02 --seed 1 \\
+        --json results.json --compare baseline.json
+
+The corpus is generated by benchmarks.synthetic_corpus from the seed and
+options, or read from --corpus. The OCR and record caches are disabled so
+every document does the full work, and one warm-up document per format is
+processed before timing. Per-stage p50/p95/p99 and documents per second are
+reported per format and overall; --json saves them with the commit and
+settings they were measured with, and --compare prints the change against a
+saved run.
+"""
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic_corpus import FORMATS, generate_corpus
+
+STAGES = ["text_extraction", "record_extraction", "persistence", "total"]
+
+
+class _Timed:
+    """
+    Proxy timing the given methods of the wrapped component into the stage
+    they belong to, and passing everything else through.
+    """
+
+    def __init__(self, inner: Any, methods: Dict[str, str], timings: Dict[str, float]):
+        self._inner = inner
+        self._methods = methods
+        self._timings = timings
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._inner, name)
+        stage = self._methods.get(name)
+        if stage is None:
+            return attribute
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self._timings[stage] += time.perf_counter() - start
+
+        return timed
+
+
+def percentile(values: List[float], q: float) -> float:
+    # Nearest rank, so every reported value is one that was measured
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(samples: List[Dict[str, float]]) -> dict:
+    total = sum(sample["total"] for sample in samples)
+    return {
+        "documents": len(samples),
+        "docs_per_second": len(samples) / total if total else 0.0,
+        "stages": {
+            stage: {
+                "mean": statistics.mean(s[stage] for s in samples),
+                "p50": percentile([s[stage] for s in samples], 0.50),
+                "p95": percentile([s[stage] for s in samples], 0.95),
+                "p99": percentile([s[stage] for s in samples], 0.99),
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def build_service(timings: Dict[str, float]):
+    from app.core.config import config
+
+    config.ocr_cache_enabled = False
+    config.record_cache_enabled = False
+
+    from app.adapters.postgres.database import Base, SessionLocal, engine
+    from app.adapters.postgres.schema import DocumentSchema  # noqa: F401
+    from app.adapters.postgres.sql_repository import SQLDocumentRepository
+    from app.core.dependencies import (
+        get_blob_store,
+        get_medical_record_extractor,
+        get_text_extractor,
+    )
+    from app.domain.document_service import DocumentService
+
+    Base.metadata.create_all(bind=engine)
+    # Stages run one after the other, so each is timed on its own. Writing
+    # the original file to the blob store counts as persistence.
+    return DocumentService(
+        _Timed(
+            SQLDocumentRepository(SessionLocal()), {"save": "persistence"}, timings
+        ),
+        _Timed(
+            get_text_extractor(),
+            {"extract": "text_extraction", "extract_streaming": "text_extraction"},
+            timings,
+        ),
+        _Timed(
+            get_medical_record_extractor(), {"extract": "record_extraction"}, timings
+        ),
+        pipelined=False,
+        blob_store=_Timed(get_blob_store(), {"put": "persistence"}, timings),
+    ), config
+
+
+def load_corpus(args) -> List[Tuple[str, str, str, bytes]]:
+    """(format, filename, file_type, file_data) of every document."""
+    if args.corpus:
+        corpus = []
+        for path in sorted(args.corpus.iterdir()):
+            if not path.is_file():
+                continue
+            file_type = path.suffix.lstrip(".").lower()
+            # Generated files end in their format, e.g. history_0001_scan_pdf.pdf
+            file_format = next(
+                (
+                    f
+                    for f in sorted(FORMATS, key=len, reverse=True)
+                    if path.stem.endswith(f"_{f}")
+                ),
+                file_type,
+            )
+            corpus.append((file_format, path.name, file_type, path.read_bytes()))
+        return corpus
+    corpus = []
+    for file_format in args.formats:
+        generated = generate_corpus(
+            args.documents,
+            [file_format],
+            args.visits,
+            args.pages,
+            args.noise,
+            args.seed,
+        )
+        for filename, file_type, file_data in generated:
+            corpus.append((file_format, filename, file_type, file_data))
+    return corpus
+
+
+def run(service, timings: Dict[str, float], corpus, repeat: int) -> Dict[str, list]:
+    samples = defaultdict(list)
+    for _ in range(repeat):
+        for file_format, filename, file_type, file_data in corpus:
+            for stage in STAGES:
+                timings[stage] = 0.0
+            start = time.perf_counter()
+            document = service.create_document(filename, file_type, file_data)
+            timings["total"] = time.perf_counter() - start
+            samples[file_format].append(dict(timings))
+            if not document.extracted_text:
+                # e.g. Tesseract or Poppler missing, which skews the numbers
+                print(f"WARNING: no text extracted from {filename}")
+    return samples
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def print_results(results: dict, baseline: Optional[dict]) -> None:
+    print(
+        f"{'format':<10} {'stage':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'docs/s':>8}" + (f" {'p50 vs base':>12}" if baseline else "")
+    )
+    rows = {**results["formats"], "overall": results["overall"]}
+    base_rows = (
+        {**baseline["formats"], "overall": baseline["overall"]} if baseline else {}
+    )
+    for name, summary in rows.items():
+        base = base_rows.get(name)
+        for stage in STAGES:
+            stats = summary["stages"][stage]
+            line = (
+                f"{name:<10} {stage:<18} {stats['p50'] * 1000:>9.1f} "
+                f"{stats['p95'] * 1000:>9.1f} {stats['p99'] * 1000:>9.1f}"
+            )
+            line += (
+                f" {summary['docs_per_second']:>8.2f}" if stage == "total" else " " * 9
+            )
+            if base and base["stages"][stage]["p50"]:
+                change = stats["p50"] / base["stages"][stage]["p50"] - 1
+                line += f" {change:>+12.0%}"
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=None, help="Directory of files")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--visits", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", type=Path, default=None, help="Save results")
+    parser.add_argument("--compare", type=Path, default=None, help="Saved results")
+    args = parser.parse_args()
+
+    timings: Dict[str, float] = {}
+    service, config = build_service(timings)
+    corpus = load_corpus(args)
+
+    warm_up = {}
+    for document in corpus:
+        warm_up.setdefault(document[0], document)
+    run(service, timings, list(warm_up.values()), 1)
+
+    samples = run(service, timings, corpus, args.repeat)
+    results = {
+        "run": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "corpus": str(args.corpus)
+            if args.corpus
+            else {
+                "documents": args.documents,
+                "visits": args.visits,
+                "pages": args.pages,
+                "noise": args.noise,
+                "seed": args.seed,
+            },
+            "repeat": args.repeat,
+            "settings": {
+                "ocr_engine": config.ocr_engine,
+                "spacy_profile": config.spacy_profile,
+                "extraction_mode": config.extraction_mode,
+                "database": config.database_url.split(":", 1)[0],
+            },
+        },
+        "formats": {name: summarize(s) for name, s in samples.items()},
+        "overall": summarize([s for values in samples.values() for s in values]),
+    }
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_results(results, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
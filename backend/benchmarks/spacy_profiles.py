@@ -0,0 +1,89 @@
+"""
+Compare the CPU time per document of the full and lean spaCy profiles.
+
+Usage (from backend/):
+    python -m benchmarks.spacy_profiles [files...] --repeat 5
+
+Each text file is extracted with both profiles after one warm-up run, and
+the records are checked to be identical so the saving costs no accuracy.
+"""
+
+import argparse
+import statistics
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from app.adapters.spacy.spacy_medical_record_extractor import (
+    SPACY_PROFILE_FULL,
+    SPACY_PROFILE_LEAN,
+    SpacyMedicalRecordExtractor,
+)
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "tests" / "examples"
+DEFAULT_FILES = [
+    EXAMPLES_DIR / "clinical_history_1.txt",
+    EXAMPLES_DIR / "medical_record.txt",
+]
+
+
+def run_profile(extractor, texts: dict[str, str], repeat: int) -> list[dict]:
+    rows = []
+    for name, text in texts.items():
+        extractor.extract(text)
+
+        cpu_timings = []
+        wall_timings = []
+        for _ in range(repeat):
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            extractor.extract(text)
+            cpu_timings.append(time.process_time() - cpu_start)
+            wall_timings.append(time.perf_counter() - wall_start)
+
+        rows.append(
+            {
+                "file": name,
+                "cpu": statistics.mean(cpu_timings),
+                "wall": statistics.mean(wall_timings),
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, default=DEFAULT_FILES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--model", default="es_core_news_sm")
+    args = parser.parse_args()
+
+    texts = {path.name: path.read_text(encoding="utf-8") for path in args.files}
+    extractors = {
+        profile: SpacyMedicalRecordExtractor(model_name=args.model, profile=profile)
+        for profile in (SPACY_PROFILE_FULL, SPACY_PROFILE_LEAN)
+    }
+
+    for name, text in texts.items():
+        full = asdict(extractors[SPACY_PROFILE_FULL].extract(text))
+        lean = asdict(extractors[SPACY_PROFILE_LEAN].extract(text))
+        if full != lean:
+            print(f"WARNING: profiles extract different records for {name}")
+
+    results = {
+        profile: run_profile(extractor, texts, args.repeat)
+        for profile, extractor in extractors.items()
+    }
+
+    print(f"{'profile':<8} {'file':<28} {'cpu ms':>10} {'wall ms':>10} {'saved':>8}")
+    for profile, rows in results.items():
+        for row, full_row in zip(rows, results[SPACY_PROFILE_FULL]):
+            saved = 1 - row["cpu"] / full_row["cpu"] if full_row["cpu"] else 0.0
+            print(
+                f"{profile:<8} {row['file']:<28} {row['cpu'] * 1000:>10.1f} "
+                f"{row['wall'] * 1000:>10.1f} {saved:>7.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""
+Generate synthetic Spanish veterinary clinical histories to benchmark the
+document pipeline with.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic_corpus --out corpus --documents 20 \\
+        --visits 20 --pages 3 --noise 0.02 --seed 1 --formats txt docx pdf
+
+Histories are laid out like the clinic exports in tests/examples: clinic
+header, pet data and dated visits with their exploration, diagnosis,
+treatment and tests. Each is rendered as TXT, DOCX, a PDF with a text layer,
+a scanned PDF and a PNG of its first page. The same seed and options give
+the same files byte for byte, so runs on different commits read the same
+corpus.
+"""
+
+import argparse
+import random
+import unicodedata
+import zipfile
+from datetime import date, timedelta
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+FORMAT_TXT = "txt"
+FORMAT_DOCX = "docx"
+FORMAT_PDF = "pdf"
+FORMAT_SCANNED_PDF = "scan_pdf"
+FORMAT_PNG = "png"
+FORMATS = (FORMAT_TXT, FORMAT_DOCX, FORMAT_PDF, FORMAT_SCANNED_PDF, FORMAT_PNG)
+
+# File extension each format is uploaded with
+FILE_TYPES = {
+    FORMAT_TXT: "txt",
+    FORMAT_DOCX: "docx",
+    FORMAT_PDF: "pdf",
+    FORMAT_SCANNED_PDF: "pdf",
+    FORMAT_PNG: "png",
+}
+
+CLINICS = [
+    ("BOS PARQUE OESTE", "AVDA EUROPA 12", "28922 ALCORCON"),
+    ("CLINICA VETERINARIA LOS OLMOS", "C/ MAYOR 45", "28013 MADRID"),
+    ("HOSPITAL VETERINARIO DEL MAR", "PASEO MARITIMO 3", "08003 BARCELONA"),
+    ("CENTRO VETERINARIO LA VEGA", "C/ ALAMEDA 7", "41001 SEVILLA"),
+]
+# Names, breeds and adult weight range in kg of each species
+PETS = {
+    "perro": (
+        ["Toby", "Luna", "Rocky", "Lola", "Max", "Kira"],
+        ["Labrador", "Mestizo", "Beagle", "Yorkshire"],
+        (3, 35),
+    ),
+    "gato": (
+        ["Misi", "Nala", "Simba", "Coco", "Tom"],
+        ["Europeo", "Siames", "Persa"],
+        (2.5, 7),
+    ),
+    "conejo": (["Tambor", "Nube", "Copito"], ["Belier", "Enano"], (1, 3)),
+}
+REASONS = [
+    "revision de la herida",
+    "vacunacion anual",
+    "vómitos desde hace dos días",
+    "diarrea con sangre",
+    "cojera de la pata trasera derecha",
+    "tos y estornudos",
+    "prurito intenso y alopecia en el lomo",
+    "inapetencia y decaimiento",
+]
+FINDINGS = [
+    "mucosas rosadas",
+    "temperatura {temp}°C",
+    "ligera deshidratación",
+    "dolor a la palpación abdominal",
+    "auscultación cardiopulmonar normal",
+    "ganglios normales",
+    "otitis externa en oído izquierdo",
+    "placa dental moderada",
+]
+DIAGNOSES = [
+    "gastroenteritis",
+    "dermatitis alérgica",
+    "otitis externa",
+    "traumatismo leve",
+    "parasitosis intestinal",
+    "sano",
+]
+MEDICATIONS = [
+    "amoxicilina {dose}mg cada 12 horas durante 7 días",
+    "metronidazol {dose}mg cada 12 horas",
+    "meloxicam 0,5mg cada 24 horas",
+    "omeprazol {dose}mg en ayunas",
+    "milbemax 1 comprimido",
+]
+TESTS = [
+    "Coprologico: negativo",
+    "Analitica: hemograma y bioquímica dentro de rangos",
+    "Radiografia: sin hallazgos",
+    "Ecografia: leve engrosamiento de pared intestinal",
+    "Test de leishmania: negativo",
+]
+
+QUARTERS = ["00", "15", "30", "45"]
+
+# Characters misread by OCR, as seen in real scans of clinic histories
+_OCR_CONFUSIONS = {
+    "ñ": "fi",
+    "m": "rn",
+    "l": "1",
+    "o": "0",
+    "e": "c",
+    "i": "l",
+    "a": "o",
+}
+
+# Layout shared by the PDF renderers: A4 in points, with margins
+_PAGE_WIDTH = 595
+_PAGE_HEIGHT = 842
+_MARGIN = 50
+_MAX_FONT_SIZE = 10
+
+
+def generate_history(rng: random.Random, visits: int, noise: float = 0.0) -> str:
+    """
+    A clinical history with the given number of visits, one week or more
+    apart, with OCR-like character errors in about `noise` of its letters.
+    """
+    clinic_name, address, city = rng.choice(CLINICS)
+    species = rng.choice(sorted(PETS))
+    names, breeds, (min_weight, max_weight) = PETS[species]
+    birth = date(2010, 1, 1) + timedelta(days=rng.randrange(3650))
+
+    lines = [
+        clinic_name,
+        "",
+        address,
+        city,
+        "",
+        "Datos de la Mascota",
+        "",
+        f"Nombre: {rng.choice(names)}",
+        f"Especie: {species}",
+        f"Raza: {rng.choice(breeds)}",
+        f"Nacimiento: {birth:%d/%m/%Y}",
+        f"Sexo: {rng.choice(['Macho', 'Hembra'])}",
+        f"Chip: {rng.randrange(10**14, 10**15)}",
+        "",
+        "HISTORIAL COMPLETO DESDE LA PRIMERA VISITA A NUESTRO CENTRO",
+    ]
+
+    day = birth + timedelta(days=rng.randrange(60, 365))
+    weight = rng.uniform(min_weight, max_weight)
+    for _ in range(visits):
+        day += timedelta(days=rng.randrange(7, 90))
+        weight = max(0.5, weight * rng.uniform(0.95, 1.05))
+        lines += _visit_lines(rng, day, weight)
+
+    text = "\n".join(lines) + "\n"
+    return add_noise(rng, text, noise) if noise > 0 else text
+
+
+def _visit_lines(rng: random.Random, day: date, weight: float) -> List[str]:
+    lines = [
+        "",
+        f"- {day:%d/%m/%y} - {rng.randrange(9, 20):02d}:{rng.choice(QUARTERS)} -",
+        "",
+        f"Motivo: {rng.choice(REASONS)}",
+        f"Peso: {weight:.1f} kg".replace(".", ","),
+        "",
+        "Exploracion:",
+    ]
+    for finding in rng.sample(FINDINGS, rng.randrange(2, 5)):
+        lines.append("- " + finding.format(temp=f"{rng.uniform(37.5, 39.5):.1f}"))
+    lines += ["", "Diagnostico:", f"- {rng.choice(DIAGNOSES)}", "", "Tratamiento:"]
+    for medication in rng.sample(MEDICATIONS, rng.randrange(1, 3)):
+        lines.append("- " + medication.format(dose=rng.choice([50, 100, 250])))
+    if rng.random() < 0.5:
+        lines += ["", rng.choice(TESTS)]
+    lines += ["", f"Revision en {rng.choice([3, 7, 15, 30])} dias"]
+    return lines
+
+
+def add_noise(rng: random.Random, text: str, noise: float) -> str:
+    """Replace about `noise` of the letters with common OCR misreadings."""
+    chars = []
+    for c in text:
+        if c.isalpha() and rng.random() < noise:
+            chars.append(_OCR_CONFUSIONS.get(c.lower(), c.swapcase()))
+        else:
+            chars.append(c)
+    return "".join(chars)
+
+
+def paginate(text: str, pages: int) -> List[str]:
+    """Split the lines of a text evenly into the given number of pages."""
+    lines = text.rstrip("\n").split("\n")
+    per_page = -(-len(lines) // max(pages, 1))
+    return [
+        "\n".join(lines[i : i + per_page]) for i in range(0, len(lines), per_page)
+    ] or [""]
+
+
+def _font_size(pages: List[str]) -> float:
+    # The largest font, up to _MAX_FONT_SIZE, that fits the longest page
+    lines = max(page.count("\n") + 1 for page in pages)
+    return min(_MAX_FONT_SIZE, (_PAGE_HEIGHT - 2 * _MARGIN) / lines / 1.2)
+
+
+def render_txt(pages: List[str]) -> bytes:
+    return ("\n\n".join(pages) + "\n").encode("utf-8")
+
+
+def render_docx(pages: List[str]) -> bytes:
+    """A minimal DOCX with one paragraph per line and page breaks."""
+    body = []
+    for i, page in enumerate(pages):
+        if i:
+            body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        for line in page.split("\n"):
+            body.append(
+                f'<w:p><w:r><w:t xml:space="preserve">{_xml_escape(line)}</w:t></w:r></w:p>'
+            )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{''.join(body)}</w:body></w:document>"
+    )
+    parts = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+            "</Relationships>"
+        ),
+        "word/document.xml": document,
+    }
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            # A fixed timestamp keeps the archive identical between runs
+            archive.writestr(zipfile.ZipInfo(name, (2020, 1, 1, 0, 0, 0)), content)
+    return buffer.getvalue()
+
+
+def _xml_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def render_text_pdf(pages: List[str]) -> bytes:
+    """
+    A PDF whose pages carry their lines as text in Helvetica, the way clinic
+    software exports them, so it is read from its text layer.
+    """
+    size = _font_size(pages)
+    leading = size * 1.2
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        top = _PAGE_HEIGHT - _MARGIN
+        stream = [f"BT /F1 {size:.2f} Tf {leading:.2f} TL {_MARGIN} {top} Td"]
+        for line in page.split("\n"):
+            stream.append(f"({_pdf_escape(line)}) Tj T*")
+        stream.append("ET")
+        content = "\n".join(stream).encode("cp1252", errors="replace")
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        )
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R "
+                f"/MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> "
+                f"/Contents {len(objects)} 0 R >>"
+            ).encode("ascii")
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode(
+        "ascii"
+    )
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(pdf)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_page_images(
+    rng: random.Random, pages: List[str], noise: float = 0.0, dpi: int = 150
+) -> List[Image.Image]:
+    """
+    Grayscale scans of the pages: the text drawn at the PDF layout's size,
+    with specks of dirt and a slight skew that grow with noise.
+    """
+    scale = dpi / 72
+    width, height = int(_PAGE_WIDTH * scale), int(_PAGE_HEIGHT * scale)
+    size = _font_size(pages)
+    font = _load_font(size * scale)
+    leading = size * 1.2 * scale
+    if not _has_accents(font):
+        pages = [_strip_accents(page) for page in pages]
+
+    images = []
+    for page in pages:
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        y = _MARGIN * scale
+        for line in page.split("\n"):
+            draw.text((_MARGIN * scale, y), line, fill=0, font=font)
+            y += leading
+        for _ in range(int(noise * width * height / 100)):
+            x, y = rng.randrange(width), rng.randrange(height)
+            draw.point((x, y), fill=rng.randrange(0, 128))
+        if noise > 0:
+            image = image.rotate(
+                rng.uniform(-1, 1) * min(noise * 50, 2), fillcolor=255, expand=False
+            )
+        images.append(image)
+    return images
+
+
+def _load_font(size: float, path: Optional[str] = None) -> ImageFont.ImageFont:
+    # DejaVu Sans where installed, else Pillow's bundled font
+    try:
+        return ImageFont.truetype(path or "DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def _has_accents(font: ImageFont.ImageFont) -> bool:
+    # Fonts without the glyph draw the same box as for any missing character
+    return _draw_glyph(font, "ó") != _draw_glyph(font, "\uffff")
+
+
+def _draw_glyph(font: ImageFont.ImageFont, c: str) -> bytes:
+    left, top, right, bottom = font.getbbox(c)
+    image = Image.new("L", (right + 1, bottom + 1), 0)
+    ImageDraw.Draw(image).text((0, 0), c, fill=255, font=font)
+    return image.tobytes()
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def render_scanned_pdf(
+    rng: random.Random, pages: List[str], noise: float = 0.0, dpi: int = 150
+) -> bytes:
+    """A PDF of page images without a text layer, so every page is OCRed."""
+    images = render_page_images(rng, pages, noise, dpi)
+    buffer = BytesIO()
+    images[0].save(
+        buffer,
+        "PDF",
+        save_all=True,
+        append_images=images[1:],
+        resolution=dpi,
+        # Fixed dates keep the file identical between runs
+        creationDate=None,
+        modDate=None,
+    )
+    return buffer.getvalue()
+
+
+def render_png(
+    rng: random.Random, pages: List[str], noise: float = 0.0, dpi: int = 150
+) -> bytes:
+    """A PNG of the first page, as a photo or scan of a single sheet."""
+    image = render_page_images(rng, pages[:1], noise, dpi)[0]
+    buffer = BytesIO()
+    image.save(buffer, "PNG", dpi=(dpi, dpi))
+    return buffer.getvalue()
+
+
+def render(
+    file_format: str, rng: random.Random, pages: List[str], noise: float = 0.0
+) -> bytes:
+    renderers: Dict[str, Callable[[], bytes]] = {
+        FORMAT_TXT: lambda: render_txt(pages),
+        FORMAT_DOCX: lambda: render_docx(pages),
+        FORMAT_PDF: lambda: render_text_pdf(pages),
+        FORMAT_SCANNED_PDF: lambda: render_scanned_pdf(rng, pages, noise),
+        FORMAT_PNG: lambda: render_png(rng, pages, noise),
+    }
+    if file_format not in renderers:
+        raise ValueError(f"Unknown format: {file_format}")
+    return renderers[file_format]()
+
+
+def generate_corpus(
+    documents: int,
+    formats: List[str],
+    visits: int = 20,
+    pages: int = 3,
+    noise: float = 0.0,
+    seed: int = 1,
+) -> List[tuple[str, str, bytes]]:
+    """
+    Returns:
+        (filename, file_type, file_data) of every document in every format.
+        Each document has its own generator seeded from seed and its index,
+        so adding formats or documents leaves the others unchanged.
+    """
+    corpus = []
+    for index in range(documents):
+        text = generate_history(random.Random(f"{seed}-{index}"), visits, noise)
+        paged = paginate(text, pages)
+        for file_format in formats:
+            rng = random.Random(f"{seed}-{index}-{file_format}")
+            file_type = FILE_TYPES[file_format]
+            corpus.append(
+                (
+                    f"history_{index:04d}_{file_format}.{file_type}",
+                    file_type,
+                    render(file_format, rng, paged, noise),
+                )
+            )
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--visits", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument(
+        "--noise", type=float, default=0.0, help="Fraction of letters misread"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    corpus = generate_corpus(
+        args.documents, args.formats, args.visits, args.pages, args.noise, args.seed
+    )
+    for filename, _, file_data in corpus:
+        (args.out / filename).write_bytes(file_data)
+    print(f"Wrote {len(corpus)} files to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measure how visit segmentation and visit extraction scale with the number
+of visits in a history.
+
+Usage (from backend/):
+    python -m benchmarks.visit_segmentation --visits 10 100 1000 --repeat 5
+
+Histories are synthesized by repeating a visit with increasing dates. Time
+per visit should stay flat as the history grows.
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+import spacy
+
+from app.adapters.spacy.extractors.visit_extractor import VisitExtractor
+from app.adapters.spacy.extractors.visit_segmenter import segment_visits
+
+HEADER = "BOS PARQUE OESTE\n\nAVDA EUROPA\n28922 ALCORCON\n\nDatos de la Mascota\n"
+VISIT = """
+- {date} - 10:25 -
+
+Acude a consulta para revision de la herida.
+Peso: 4,1 kg
+
+Exploracion:
+- temperatura 38,5°C
+- mucosas rosadas
+
+Diagnostico:
+- dermatitis
+
+Tratamiento:
+- amoxicilina 50mg cada 12 horas
+
+Coprologico: negativo
+
+Revision en 7 dias
+"""
+
+
+def build_history(visits: int) -> str:
+    first = date(2015, 1, 1)
+    return HEADER + "".join(
+        VISIT.format(date=(first + timedelta(days=7 * i)).strftime("%d/%m/%y"))
+        for i in range(visits)
+    )
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--visits", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Visits are read with regexes, a blank pipeline is enough to build it
+    extractor = VisitExtractor(spacy.blank("es"))
+
+    print(
+        f"{'visits':>8} {'chars':>10} {'segment ms':>12} {'us/visit':>10} "
+        f"{'extract ms':>12} {'us/visit':>10}"
+    )
+    for visits in args.visits:
+        text = build_history(visits)
+        found = sum(1 for _ in segment_visits(text))
+        if found != visits:
+            print(f"WARNING: found {found} of {visits} visits")
+
+        segment = measure(lambda: list(segment_visits(text)), args.repeat)
+        extract = measure(lambda: extractor.extract_from_text(text), args.repeat)
+        print(
+            f"{visits:>8} {len(text):>10} {segment * 1000:>12.2f} "
+            f"{segment / visits * 1e6:>10.1f} {extract * 1000:>12.2f} "
+            f"{extract / visits * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import pytest
 import os
+import tempfile
 from pathlib import Path
 
 
@@ -10,6 +11,9 @@ def pytest_configure(config):
 
         load_dotenv(env_test_path, override=True)
 
+    # Uploaded files are kept out of the source tree
+    os.environ.setdefault("BLOB_STORE_DIR", tempfile.mkdtemp(prefix="blobs-"))
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
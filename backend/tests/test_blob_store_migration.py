@@ -0,0 +1,79 @@
+from pathlib import Path
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from app.adapters.blob.local_blob_store import LocalBlobStore
+from app.core.config import config
+
+ALEMBIC_DIR = Path(__file__).parent.parent / "alembic"
+BLOB_REVISION = "9c2e4b7a1d38"
+
+
+class TestBlobStoreMigration:
+
+    def test_interrupted_upgrade_resumes_when_rerun(self, tmp_path, monkeypatch):
+        """
+        Scenario: Rerunning the blob store migration after it was interrupted
+
+        GIVEN documents still holding their file in file_data
+        WHEN the upgrade stops after its first committed batch and is run again
+        THEN the rerun should move only the remaining files, and every
+        document should end up referencing a readable blob with file_data
+        dropped, the index on file_hash being created only if missing
+        """
+        database_url = f"sqlite:///{tmp_path / 'migration.db'}"
+        monkeypatch.setattr(config, "database_url", database_url)
+        monkeypatch.setattr(config, "blob_store_dir", str(tmp_path / "blobs"))
+        alembic_config = Config()
+        alembic_config.set_main_option("script_location", str(ALEMBIC_DIR))
+
+        command.upgrade(alembic_config, "5d0f3a8e6c21")
+        engine = sa.create_engine(database_url)
+        contents = {f"{i:04d}": f"file {i}".encode() for i in range(501)}
+        with engine.begin() as connection:
+            connection.execute(
+                sa.text(
+                    "INSERT INTO documents (id, filename, file_type, file_size, "
+                    "file_data, created_at, updated_at) VALUES (:id, 'a.txt', "
+                    "'text/plain', 1, :data, '2026-01-01', '2026-01-01')"
+                ),
+                [{"id": key, "data": data} for key, data in contents.items()],
+            )
+
+        put = LocalBlobStore.put
+        calls = []
+        interrupt_after = [500]
+
+        def counting_put(store, data):
+            if len(calls) == interrupt_after[0]:
+                raise KeyboardInterrupt
+            calls.append(data)
+            return put(store, data)
+
+        monkeypatch.setattr(LocalBlobStore, "put", counting_put)
+        with pytest.raises(KeyboardInterrupt):
+            command.upgrade(alembic_config, BLOB_REVISION)
+
+        # Databases without transactional DDL may keep the index of a run
+        # interrupted past its last step
+        with engine.begin() as connection:
+            connection.execute(
+                sa.text("CREATE INDEX ix_documents_file_hash ON documents (file_hash)")
+            )
+        calls.clear()
+        interrupt_after[0] = None
+        command.upgrade(alembic_config, BLOB_REVISION)
+
+        assert calls == [contents["0500"]]
+        columns = {c["name"] for c in sa.inspect(engine).get_columns("documents")}
+        assert "file_data" not in columns
+        indexes = {i["name"] for i in sa.inspect(engine).get_indexes("documents")}
+        assert "ix_documents_file_hash" in indexes
+        store = LocalBlobStore(config.blob_store_dir)
+        with engine.connect() as connection:
+            rows = connection.execute(
+                sa.text("SELECT id, file_hash FROM documents")
+            ).all()
+        assert {key: store.get(file_hash) for key, file_hash in rows} == contents
+        engine.dispose()
@@ -0,0 +1,351 @@
+from dataclasses import asdict
+from pathlib import Path
+from app.core.dependencies import get_medical_record_extractor
+from app.adapters.cache.cached_medical_record_extractor import (
+    CachedMedicalRecordExtractor,
+)
+from app.adapters.cache.memory_cache import LRUMemoryCache
+from app.adapters.cache.tiered_cache import TieredCache
+from app.adapters.spacy.extractors.section_index import SectionIndex
+from app.adapters.spacy.extractors.visit_segmenter import segment_visits
+from app.adapters.spacy.extractors.text_chunker import chunk_text
+from app.adapters.spacy.extractors.gazetteer import Gazetteer
+from app.adapters.spacy.extractors.instrumentation import extractor_metrics
+from app.adapters.spacy.fast_medical_record_extractor import (
+    FastMedicalRecordExtractor,
+)
+from app.adapters.spacy.spacy_medical_record_extractor import (
+    SPACY_PROFILE_FULL,
+    SpacyMedicalRecordExtractor,
+)
+
+EXAMPLES_DIR = Path(__file__).parent / "examples"
+
+
+class TestMedicalRecordExtractor:
+
+    def test_lean_profile_only_runs_the_gazetteer(self):
+        """
+        Scenario: Default spaCy pipeline
+
+        GIVEN the medical record extractor with the default lean profile
+        WHEN its pipeline is inspected
+        THEN only the gazetteer should run after the tokenizer
+        """
+        extractor = SpacyMedicalRecordExtractor()
+
+        assert extractor.nlp.pipe_names == ["gazetteer"]
+
+    def test_full_profile_runs_gazetteer_before_ner(self):
+        """
+        Scenario: Full spaCy pipeline
+
+        GIVEN the medical record extractor with the full profile
+        WHEN its pipeline is inspected
+        THEN the statistical components should run, with the gazetteer before the NER
+        """
+        extractor = SpacyMedicalRecordExtractor(profile=SPACY_PROFILE_FULL)
+
+        pipe_names = extractor.nlp.pipe_names
+        assert "parser" in pipe_names
+        assert pipe_names.index("gazetteer") == pipe_names.index("ner") - 1
+
+    def test_incremental_extraction_matches_whole_document(self):
+        """
+        Scenario: Extracting a record from pages as they are read
+
+        GIVEN a clinical history split into pages
+        WHEN the pages are fed one by one to an incremental extraction
+        THEN the visits closed by each page should be timed apart from whole
+        texts, and the merged record equal the one extracted from the whole text
+        """
+        extractor = get_medical_record_extractor()
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+        lines = text.split("\n")
+        page_size = len(lines) // 5 + 1
+
+        def calls(name: str) -> int:
+            return extractor_metrics.stats().get(name, {}).get("calls", 0)
+
+        closed_before, visits_before = calls("visits.closed"), calls("visits")
+        incremental = extractor.start_incremental()
+        for i in range(0, len(lines), page_size):
+            incremental.add_page("\n".join(lines[i : i + page_size]))
+        assert calls("visits.closed") == closed_before + len(incremental.pages)
+        assert calls("visits") == visits_before
+        record = incremental.finish()
+
+        expected = extractor.extract(text.strip())
+        assert len(record.visits) > 1
+        assert asdict(record) == asdict(expected)
+
+    def test_incremental_extraction_chunks_long_pages(self):
+        """
+        Scenario: Feeding a page longer than spaCy's max_length
+
+        GIVEN a whole clinical history arriving as a single page
+        WHEN it is fed to an incremental extraction with a smaller chunk size
+        THEN the page should be parsed in chunks and the record equal the
+        one extracted from the whole text
+        """
+        extractor = SpacyMedicalRecordExtractor(chunk_chars=1500)
+        extractor.nlp.max_length = 2000
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+
+        incremental = extractor.start_incremental()
+        incremental.add_page(text)
+        record = incremental.finish()
+
+        assert len(record.visits) > 1
+        assert asdict(record) == asdict(extractor.extract(text.strip()))
+
+    def test_extract_many_keeps_order_and_isolates_failures(self):
+        """
+        Scenario: Extracting records for a batch of documents
+
+        GIVEN a batch of texts where one cannot be processed
+        WHEN the records are extracted in batch
+        THEN results should come back in input order, with the failure
+        reported on its own result and the other records unaffected
+        """
+        extractor = get_medical_record_extractor()
+        history = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+        record = (EXAMPLES_DIR / "medical_record.txt").read_text(encoding="utf-8")
+        texts = [history, "", 12345, record]
+
+        results = list(extractor.extract_many(texts, batch_size=2))
+
+        assert [result.index for result in results] == [0, 1, 2, 3]
+        assert not results[2].ok
+        assert results[1].record == extractor.extract("")
+        assert asdict(results[0].record) == asdict(extractor.extract(history))
+        assert asdict(results[3].record) == asdict(extractor.extract(record))
+
+    def test_section_index_reads_sections_and_lab_results(self):
+        """
+        Scenario: Reading visit sections from the section index
+
+        GIVEN a visit with anamnesis, diagnosis, treatment and a lab test
+        WHEN the section index of its text is queried
+        THEN each section should run from its header to the next stop keyword,
+        and lab results should be read from the rest of the test line
+        """
+        sections = SectionIndex(
+            "Anamnesis: vomitos desde ayer\n"
+            "Coprologico: negativo\n"
+            "Diagnostico:\n- gastritis\n"
+            "Tratamiento:\n- omeprazol\nRevision en 7 dias"
+        )
+
+        assert sections.section(["Anamnesis"], ["Tratamiento", "Pruebas"]) == (
+            "vomitos desde ayer\nCoprologico: negativo\nDiagnostico:\n- gastritis"
+        )
+        assert sections.section(["Diagnostico", "Dx"], ["Tratamiento"]) == "- gastritis"
+        assert sections.section(["Tratamiento"], ["Revision"]) == "- omeprazol"
+        assert sections.section(["Exploracion", "EFG"], ["Tratamiento"]) is None
+        assert sections.labelled_lines(["Coprologico"]) == [("Coprologico", " negativo")]
+
+    def test_visit_segmenter_splits_every_kind_of_header(self):
+        """
+        Scenario: Splitting a history into visits
+
+        GIVEN a history with dated, explicit and numbered visit headers
+        WHEN it is segmented
+        THEN one ordered span per visit should cover the text up to the next header
+        """
+        text = (
+            "Datos de la Mascota\n"
+            "= 08/12/19 - 16:12 -\nprimera\n"
+            "- 10/12/19\nsegunda\n"
+            "VISITA DEL DIA 13/12/2019\ntercera\n"
+            "Visita 4\ncuarta"
+        )
+
+        spans = list(segment_visits(text))
+
+        assert [(span.date_str, span.time_str) for span in spans] == [
+            ("08/12/19", "16:12"),
+            ("10/12/19", None),
+            ("13/12/2019", None),
+            (None, None),
+        ]
+        assert [text[span.content_start : span.end].strip() for span in spans] == [
+            "-\nprimera",
+            "segunda",
+            "tercera",
+            "cuarta",
+        ]
+        assert all(a.end == b.start for a, b in zip(spans, spans[1:]))
+
+    def test_chunked_extraction_matches_whole_document(self):
+        """
+        Scenario: Extracting a record from a document too long to parse at once
+
+        GIVEN a clinical history longer than the chunk size
+        WHEN it is extracted in chunks cut on visit boundaries
+        THEN the chunks should cover the text and the record should equal
+        the one from a whole-document parse
+        """
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+        whole = SpacyMedicalRecordExtractor(chunk_chars=None)
+        chunked = SpacyMedicalRecordExtractor(chunk_chars=1500)
+
+        spans = list(chunk_text(text, 1500))
+
+        assert len(spans) > 1
+        assert "".join(text[start:end] for start, end in spans) == text
+        assert all(end - start <= 1500 for start, end in spans)
+        assert asdict(chunked.extract(text)) == asdict(whole.extract(text))
+
+    def test_identical_text_is_served_from_record_cache(self):
+        """
+        Scenario: Extracting the same text again
+
+        GIVEN a text whose record has already been extracted
+        WHEN the same text arrives again, with Windows line breaks
+        THEN the record should come from the cache and equal the extracted one,
+        and a new rules version should not be served the old record
+        """
+        spacy_extractor = get_medical_record_extractor().extractor
+        cache = TieredCache(LRUMemoryCache())
+        extractor = CachedMedicalRecordExtractor(spacy_extractor, cache)
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+
+        first = extractor.extract(text)
+        second = extractor.extract(text.replace("\n", "\r\n"))
+
+        assert cache.stats()["hits"] == 1
+        assert second is not first
+        assert asdict(second) == asdict(first)
+        assert asdict(first) == asdict(spacy_extractor.extract(text.strip()))
+
+        next_rules = CachedMedicalRecordExtractor(
+            spacy_extractor,
+            cache,
+            settings={**extractor.settings(), "rules_version": "next"},
+        )
+        next_rules.extract(text)
+        assert cache.stats()["misses"] == 2
+
+    def test_gazetteer_matches_whole_words_ignoring_case_and_accents(self, tmp_path):
+        """
+        Scenario: Tagging terms from a gazetteer file
+
+        GIVEN a gazetteer file with species, symptoms and medications
+        WHEN a text writes them with other casing and without accents
+        THEN every whole-word term should be found with its label, preferring
+        the longest term, and words merely containing a term should not match
+        """
+        path = tmp_path / "gazetteer.tsv"
+        path.write_text(
+            "# label and term\n"
+            "SPECIES\thurón\n"
+            "SYMPTOM\tdolor\n"
+            "SYMPTOM\tdolor abdominal\n"
+            "MEDICATION\tÁcido fusídico\n",
+            encoding="utf-8",
+        )
+        gazetteer = Gazetteer.load(str(path))
+        text = "HURON con Dolor Abdominal, tratado con acido fusidico. Hurones: dolor"
+
+        matches = [
+            (text[start:end], label) for start, end, label in gazetteer.find(text)
+        ]
+
+        assert gazetteer.size == 4
+        assert matches == [
+            ("HURON", "SPECIES"),
+            ("Dolor Abdominal", "SYMPTOM"),
+            ("acido fusidico", "MEDICATION"),
+            ("dolor", "SYMPTOM"),
+        ]
+
+    def test_gazetteer_first_term_of_a_label(self):
+        """
+        Scenario: Looking up the first term of one label
+
+        GIVEN a gazetteer with overlapping terms of several labels
+        WHEN the first term of a label is looked up, also after adding a term
+        THEN it should be the earliest whole-word term of that label, the
+        longest where several start there, and terms added later should match
+        """
+        gazetteer = Gazetteer(
+            [("perro", "SPECIES"), ("perro pastor", "SPECIES"), ("dolor", "SYMPTOM")]
+        )
+        text = "Dolor en perros; el Perro Pastor y el perro"
+
+        assert gazetteer.first(text, "SPECIES") == (20, 32)
+        assert gazetteer.first(text, "SYMPTOM") == (0, 5)
+        assert gazetteer.first(text, "MEDICATION") is None
+
+        gazetteer.add("perros", "SPECIES")
+        assert gazetteer.first(text, "SPECIES") == (9, 15)
+        assert [label for _, _, label in gazetteer.find(text)] == [
+            "SYMPTOM",
+            "SPECIES",
+            "SPECIES",
+            "SPECIES",
+        ]
+
+    def test_gazetteer_feeds_entity_labels(self):
+        """
+        Scenario: Entities tagged by the bundled gazetteer
+
+        GIVEN the default medical record extractor
+        WHEN a text mentioning a species, a symptom and a medication is parsed
+        THEN they should be tagged with the SPECIES, SYMPTOM and MEDICATION labels
+        """
+        extractor = SpacyMedicalRecordExtractor()
+
+        doc = extractor.nlp("Gata con VOMITOS, se pauta Metronidazol.")
+
+        assert [(ent.text, ent.label_) for ent in doc.ents] == [
+            ("Gata", "SPECIES"),
+            ("VOMITOS", "SYMPTOM"),
+            ("Metronidazol", "MEDICATION"),
+        ]
+
+    def test_species_is_normalized_whatever_its_case_and_accents(self):
+        """
+        Scenario: Species written capitalized, in upper case or without accents
+
+        GIVEN the default medical record extractor
+        WHEN texts name the species as "Gato", "PERRA", "HURON" or "Hurón"
+        THEN dogs and cats should be Canine and Feline and other species be
+        spelled as in the gazetteer, with or without the NLP pass
+        """
+        extractor = SpacyMedicalRecordExtractor()
+        cases = {
+            "Especie: Gato": "Feline",
+            "Especie: PERRA": "Canine",
+            "Paciente: Max - HURON": "Hurón",
+            "Hurón de 3 años": "Hurón",
+        }
+
+        for text, species in cases.items():
+            assert extractor.extract(text).pet_info.species == species
+            assert extractor.extract_without_nlp(text).pet_info.species == species
+
+    def test_fast_mode_matches_nlp_and_escalates_missing_fields(self):
+        """
+        Scenario: Extracting records with regexes alone
+
+        GIVEN the fast extractor wrapping the spaCy extractor
+        WHEN a clinical history where the regexes find the species is extracted
+        THEN the record should match the NLP one without escalating, and a
+        text whose species the regexes miss should be escalated to NLP
+        """
+        extractor = SpacyMedicalRecordExtractor()
+        fast_extractor = FastMedicalRecordExtractor(extractor)
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+
+        def escalations() -> int:
+            stats = extractor_metrics.stats().get("medical_record.escalated", {})
+            return stats.get("calls", 0)
+
+        before = escalations()
+        assert asdict(fast_extractor.extract(text)) == asdict(extractor.extract(text))
+        assert escalations() == before
+
+        fast_extractor.extract("Nombre - Toby\nConsulta general")
+        assert escalations() == before + 1
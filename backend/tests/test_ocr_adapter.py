@@ -0,0 +1,375 @@
+import concurrent.futures
+import multiprocessing
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+import pytest
+import pytesseract
+from PIL import Image
+from app.adapters.ocr import (
+    ocr_scheduler,
+    tesseract_ocr_adapter,
+    tesserocr_pool_adapter,
+)
+from app.adapters.ocr.image_preprocessor import ImagePreprocessor
+from app.adapters.ocr.ocr_scheduler import OCRScheduler
+from app.adapters.ocr.tesseract_ocr_adapter import OCRTimeoutError, TesseractOCRAdapter
+from app.adapters.ocr.tesserocr_pool_adapter import TesserocrPoolAdapter
+
+
+class SlowOCRAdapter(TesseractOCRAdapter):
+    """Tesseract adapter whose OCR takes a fixed time per page and honours
+    the timeout it is given, as pytesseract does."""
+
+    def __init__(self, seconds_per_page: float, **kwargs):
+        super().__init__(scheduler=OCRScheduler(workers=2), **kwargs)
+        self.seconds_per_page = seconds_per_page
+
+    def _ocr_image(self, image, timeout=None):
+        if timeout is not None and timeout < self.seconds_per_page:
+            time.sleep(timeout)
+            raise OCRTimeoutError("Tesseract process timeout")
+        time.sleep(self.seconds_per_page)
+        return "page text"
+
+
+def _init_without_tesseract(lang: str) -> None:
+    pass
+
+
+def _sleep_in_worker(image) -> str:
+    """Pool task taking the seconds in image.info, reporting its worker."""
+    time.sleep(image.info["seconds"])
+    return str(os.getpid())
+
+
+def _die_once_in_worker(image) -> str:
+    """Pool task whose worker dies the first time it runs it."""
+    marker = Path(image.info["marker"])
+    if not marker.exists():
+        marker.touch()
+        time.sleep(0.3)
+        os._exit(1)
+    time.sleep(0.9)
+    return "page text"
+
+
+def _task_image(**info) -> Image.Image:
+    image = Image.new("L", (20, 20), 255)
+    image.info.update(info)
+    return image
+
+
+def stub_pdf(monkeypatch, page_count: int, **image_kwargs) -> list:
+    """
+    Stub poppler with a PDF of page_count pages whose images carry their page
+    number in info["page"]. Returns the (first, last, options) of every
+    conversion, in order.
+    """
+    conversions = []
+
+    def convert_from_path(path, first_page, last_page, **kwargs):
+        conversions.append((first_page, last_page, kwargs))
+        return [_page_image(n, **image_kwargs) for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(
+        tesseract_ocr_adapter, "pdfinfo_from_path", lambda path: {"Pages": page_count}
+    )
+    monkeypatch.setattr(tesseract_ocr_adapter, "convert_from_path", convert_from_path)
+    return conversions
+
+
+class TestPDFPageWindows:
+
+    def test_pdf_pages_are_rasterized_in_bounded_windows(self, monkeypatch):
+        """
+        Scenario: OCR of a long scanned PDF
+
+        GIVEN a ten page PDF whose pages 3 and 4 have a text layer
+        WHEN it is extracted with a window of four pages
+        THEN only the scanned pages should be rasterized, in contiguous
+        windows of at most four pages, and the text kept in page order
+        """
+        conversions = stub_pdf(monkeypatch, 10)
+        monkeypatch.setattr(
+            pytesseract, "image_to_string", lambda image, **kwargs: image.info["page"]
+        )
+        adapter = TesseractOCRAdapter(pdf_page_window=4, scheduler=OCRScheduler(2))
+        adapter._read_text_layer = lambda path, page_count, deadline: [
+            f"layer {n}" if n in (3, 4) else None for n in range(1, page_count + 1)
+        ]
+
+        result = adapter.extract(b"%PDF-1.4", "pdf")
+
+        assert [(first, last) for first, last, _ in conversions] == [
+            (1, 2),
+            (5, 8),
+            (9, 10),
+        ]
+        assert result.text.split("\n") == [
+            "page 1",
+            "page 2",
+            "layer 3",
+            "layer 4",
+        ] + [f"page {n}" for n in range(5, 11)]
+        assert result.report.pages_by_method() == {"text_layer": 2, "ocr": 8}
+
+
+class TestImagePreprocessing:
+
+    def test_pages_are_preprocessed_before_ocr(self, monkeypatch):
+        """
+        Scenario: Normalizing page images before OCR
+
+        GIVEN a preprocessor targeting 100 DPI with grayscale and binarization
+        WHEN a 300 DPI colour photo and a scanned PDF are extracted
+        THEN the photo should reach Tesseract resampled to 100 DPI, grayscale
+        and black and white, and the PDF be rendered straight at 100 DPI in
+        grayscale
+        """
+        seen = []
+
+        def image_to_string(image, **kwargs):
+            colors = sorted(color for _, color in image.getcolors())
+            seen.append((image.mode, image.size, colors))
+            return "text"
+
+        monkeypatch.setattr(pytesseract, "image_to_string", image_to_string)
+        conversions = stub_pdf(monkeypatch, 1)
+        adapter = TesseractOCRAdapter(
+            scheduler=OCRScheduler(2),
+            use_pdf_text_layer=False,
+            preprocessor=ImagePreprocessor(target_dpi=100, binarize=True),
+        )
+        photo = Image.new("RGB", (600, 300), (250, 240, 230))
+        photo.paste((20, 30, 40), (0, 0, 300, 300))
+        buffer = BytesIO()
+        photo.save(buffer, format="PNG", dpi=(300, 300))
+
+        adapter.extract(buffer.getvalue(), "png")
+        adapter.extract(b"%PDF-1.4", "pdf")
+
+        assert seen[0] == ("L", (200, 100), [0, 255])
+        assert conversions[0][2]["dpi"] == 100
+        assert conversions[0][2]["grayscale"] is True
+
+
+class TestTieredOCR:
+
+    def test_report_records_the_tier_of_each_page(self, monkeypatch):
+        """
+        Scenario: Tiered OCR of a scanned PDF
+
+        GIVEN a three page PDF whose fast pass is confident on page 1, not
+        confident on page 2 and recognizes no word on page 3
+        WHEN it is extracted in tiered mode
+        THEN page 1 should keep the fast pass text and the others be OCR'd
+        again at full quality, with each page's tier and fast pass
+        confidence in the report
+        """
+        confidences = {"page 1": 92, "page 2": 40, "page 3": -1}
+        fast_sizes = []
+
+        def image_to_data(image, config, **kwargs):
+            fast_sizes.append(image.size)
+            page = image.info["page"]
+            words = ["fast", page] if confidences[page] >= 0 else [""]
+            return {
+                "text": words,
+                "conf": [confidences[page]] * len(words),
+                "block_num": [1] * len(words),
+                "par_num": [1] * len(words),
+                "line_num": [1] * len(words),
+            }
+
+        monkeypatch.setattr(pytesseract, "image_to_data", image_to_data)
+        monkeypatch.setattr(
+            pytesseract,
+            "image_to_string",
+            lambda image, **kwargs: f"accurate {image.info['page']}",
+        )
+        stub_pdf(monkeypatch, 3)
+        adapter = TesseractOCRAdapter(
+            scheduler=OCRScheduler(2),
+            use_pdf_text_layer=False,
+            tiered=True,
+            fast_scale=0.5,
+            confidence_threshold=80,
+        )
+
+        result = adapter.extract(b"%PDF-1.4", "pdf")
+
+        assert fast_sizes == [(10, 10)] * 3
+        assert result.text.split("\n") == [
+            "fast page 1",
+            "accurate page 2",
+            "accurate page 3",
+        ]
+        assert [
+            (page.page_number, page.tier, page.confidence)
+            for page in result.report.pages
+        ] == [(1, "fast", 92), (2, "accurate", 40), (3, "accurate", None)]
+        assert result.report.pages_by_tier() == {"fast": 1, "accurate": 2}
+
+
+class TestSharedScheduler:
+
+    def test_adapters_default_to_the_shared_scheduler(self, monkeypatch):
+        """
+        Scenario: Building OCR engines without a scheduler
+
+        GIVEN no Tesseract thread limit in the environment
+        WHEN schedulers and engines without a scheduler are created
+        THEN the engines should share the process-wide scheduler, and only
+        creating that one should set the thread limit
+        """
+        monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+        OCRScheduler(workers=1)
+        assert "OMP_THREAD_LIMIT" not in os.environ
+
+        monkeypatch.setattr(ocr_scheduler, "_shared", None)
+        tesseract = TesseractOCRAdapter()
+        pool = TesserocrPoolAdapter(pool_size=1)
+
+        assert tesseract.scheduler is ocr_scheduler.shared_scheduler()
+        assert pool.scheduler is tesseract.scheduler
+        assert os.environ["OMP_THREAD_LIMIT"] == "1"
+
+
+class TestOCRTimeBudgets:
+
+    def test_page_exceeding_its_timeout_is_reported_timed_out(self):
+        """
+        Scenario: OCR of an image running past the page timeout
+
+        GIVEN an OCR engine slower than the page timeout
+        WHEN an image is extracted
+        THEN it should come back empty and reported as a timed out page
+        """
+        adapter = SlowOCRAdapter(seconds_per_page=1.0, page_timeout=0.1)
+
+        start = time.monotonic()
+        result = adapter.extract(_png(), "png")
+
+        assert time.monotonic() - start < 0.9
+        assert result.text == ""
+        assert result.report.timed_out_pages() == [1]
+
+    def test_document_budget_leaves_a_partial_extraction_report(self, monkeypatch):
+        """
+        Scenario: A scanned PDF running out of its document time budget
+
+        GIVEN a four page PDF whose pages are OCR'd one window at a time, and
+        a document budget for two and a half pages
+        WHEN it is extracted
+        THEN the pages read in time should be kept, the page running when the
+        budget ran out and the windows after it reported as timed out
+        """
+        monkeypatch.setattr(
+            tesseract_ocr_adapter, "pdfinfo_from_path", lambda path: {"Pages": 4}
+        )
+        monkeypatch.setattr(
+            tesseract_ocr_adapter,
+            "convert_from_path",
+            lambda path, first_page, last_page, **kwargs: [
+                Image.new("L", (20, 20), 255)
+                for _ in range(first_page, last_page + 1)
+            ],
+        )
+        adapter = SlowOCRAdapter(
+            seconds_per_page=0.2,
+            pdf_page_window=1,
+            use_pdf_text_layer=False,
+            document_timeout=0.5,
+        )
+
+        result = adapter.extract(b"%PDF-1.4", "pdf")
+
+        assert result.text == "page text\npage text"
+        assert [page.page_number for page in result.report.pages] == [1, 2, 3, 4]
+        assert result.report.timed_out_pages() == [3, 4]
+        assert result.report.pages_by_method() == {"ocr": 4}
+
+    def test_pool_timeout_kills_only_the_late_page_worker(self, monkeypatch):
+        """
+        Scenario: A tesserocr pool page running past its timeout while
+        another request's page runs on the pool
+
+        GIVEN a pool of two workers, each running a page
+        WHEN one page times out before the other finishes
+        THEN only the worker of the late page should be killed, and the
+        other page finish on its worker without being retried
+        """
+        monkeypatch.setattr(
+            tesserocr_pool_adapter, "_init_worker", _init_without_tesseract
+        )
+        monkeypatch.setattr(tesserocr_pool_adapter, "_ocr_in_worker", _sleep_in_worker)
+        adapter = TesserocrPoolAdapter(pool_size=2, scheduler=OCRScheduler(2))
+        try:
+            with concurrent.futures.ThreadPoolExecutor(2) as threads:
+                # Both workers started before anything is timed
+                workers = set(
+                    threads.map(
+                        lambda _: adapter._ocr_image(
+                            _task_image(seconds=0.5), timeout=30
+                        ),
+                        range(2),
+                    )
+                )
+                late = threads.submit(
+                    adapter._ocr_image, _task_image(seconds=30), timeout=0.5
+                )
+                on_time = threads.submit(
+                    adapter._ocr_image, _task_image(seconds=1.5), timeout=30
+                )
+
+                with pytest.raises(OCRTimeoutError):
+                    late.result()
+                on_time_worker = on_time.result()
+
+            alive = {str(p.pid) for p in multiprocessing.active_children()}
+            assert len(workers) == 2
+            assert on_time_worker in workers
+            assert workers & alive == {on_time_worker}
+        finally:
+            adapter.close()
+
+    def test_pool_retry_only_gets_the_time_left(self, monkeypatch, tmp_path):
+        """
+        Scenario: Retrying a page whose pool worker died under it
+
+        GIVEN a page whose worker dies after part of the page timeout passed,
+        and which would finish on a fresh worker within a full timeout
+        WHEN the page is OCR'd
+        THEN the retry should only wait for what is left of the timeout
+        """
+        monkeypatch.setattr(
+            tesserocr_pool_adapter, "_init_worker", _init_without_tesseract
+        )
+        monkeypatch.setattr(
+            tesserocr_pool_adapter, "_ocr_in_worker", _die_once_in_worker
+        )
+        adapter = TesserocrPoolAdapter(pool_size=1, scheduler=OCRScheduler(1))
+        image = _task_image(marker=str(tmp_path / "died"))
+        try:
+            start = time.monotonic()
+            with pytest.raises(OCRTimeoutError):
+                adapter._ocr_image(image, timeout=1.0)
+
+            assert (tmp_path / "died").exists()
+            assert time.monotonic() - start < 1.3
+        finally:
+            adapter.close()
+
+
+def _page_image(page_number: int, mode: str = "L", size=(20, 20)) -> Image.Image:
+    image = Image.new(mode, size, "white")
+    image.info["page"] = f"page {page_number}"
+    return image
+
+
+def _png() -> bytes:
+    buffer = BytesIO()
+    Image.new("L", (20, 20), 255).save(buffer, format="PNG")
+    return buffer.getvalue()
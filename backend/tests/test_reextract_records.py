@@ -0,0 +1,90 @@
+from pathlib import Path
+from io import BytesIO
+from fastapi.testclient import TestClient
+from app.main import app
+from app.adapters.postgres.schema.DocumentSchema import DocumentSchema
+from app.adapters.postgres.sql_repository import SQLDocumentRepository
+from app.core.dependencies import get_medical_record_extractor
+from app.jobs.reextract_records import ReextractionCheckpoint, RecordReextractionJob
+
+client = TestClient(app)
+EXAMPLES_DIR = Path(__file__).parent / "examples"
+
+
+class TestRecordReextraction:
+
+    def test_stale_records_are_reextracted_keeping_edited_ones(
+        self, db_session, tmp_path
+    ):
+        """
+        Scenario: Re-extracting stored documents after the rules changed
+
+        GIVEN stored documents with stale records, one of them edited by hand
+        WHEN the re-extraction job runs skipping edited records
+        THEN the stale records should be extracted again from the stored text,
+        the edited one left as it was, and the progress checkpointed
+        """
+        ids = [self._upload(f"history_{i}.txt") for i in range(3)]
+        edited_id = ids[1]
+        client.put(
+            f"/api/v1/document/{edited_id}", json={"pet_info": {"name": "Edited"}}
+        )
+        db_session.query(DocumentSchema).filter(
+            DocumentSchema.id != edited_id
+        ).update({DocumentSchema.medical_record_data: None})
+        db_session.commit()
+
+        checkpoint_path = str(tmp_path / "checkpoint.json")
+        checkpoint = self._job(db_session, checkpoint_path).run()
+
+        assert checkpoint.processed == 2
+        assert checkpoint.updated == 2
+        assert checkpoint.last_id == max(set(ids) - {edited_id})
+        assert ReextractionCheckpoint.load(checkpoint_path) == checkpoint
+
+        db_session.expire_all()
+        records = {
+            orm.id: orm.medical_record_data
+            for orm in db_session.query(DocumentSchema).all()
+        }
+        assert records[edited_id]["pet_info"]["name"] == "Edited"
+        for document_id in set(ids) - {edited_id}:
+            clinic = records[document_id]["veterinary_info"]["clinic_name"]
+            assert clinic == "BOS PARQUE OESTE"
+
+    def test_job_resumes_after_the_checkpoint(self, db_session, tmp_path):
+        """
+        Scenario: Resuming an interrupted re-extraction
+
+        GIVEN a checkpoint left by a run that stopped after the first document
+        WHEN the job runs again with that checkpoint
+        THEN only the documents after it should be processed
+        """
+        ids = sorted(self._upload(f"history_{i}.txt") for i in range(3))
+        checkpoint_path = str(tmp_path / "checkpoint.json")
+        ReextractionCheckpoint(last_id=ids[0], processed=1, updated=1).save(
+            checkpoint_path
+        )
+
+        checkpoint = self._job(db_session, checkpoint_path, batch_size=1).run()
+
+        assert checkpoint.processed == 3
+        assert checkpoint.updated == 3
+        assert checkpoint.last_id == ids[-1]
+
+    def _job(self, db_session, checkpoint_path: str, batch_size: int = 10):
+        return RecordReextractionJob(
+            SQLDocumentRepository(db_session),
+            get_medical_record_extractor(),
+            batch_size=batch_size,
+            skip_edited=True,
+            checkpoint_path=checkpoint_path,
+        )
+
+    def _upload(self, filename: str) -> str:
+        content = (EXAMPLES_DIR / "clinical_history_1.txt").read_bytes()
+        response = client.post(
+            "/api/v1/document",
+            files={"file": (filename, BytesIO(content), "text/plain")},
+        )
+        return response.json()["document_id"]
@@ -1,10 +1,16 @@
 import pytest
 import uuid
 from pathlib import Path
-from io import BytesIO
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.adapters.postgres.database import engine
 from app.main import app
 from app.adapters.postgres.schema.DocumentSchema import DocumentSchema
+from app.adapters.postgres.sql_repository import SQLDocumentRepository
+from app.domain.document_repository import PROJECTION_METADATA
+from app.domain.models.medical_record import MedicalRecord
+from app.domain.models.pet_info import PetInfo
+from app.domain.blob_store import blob_hash
 
 client = TestClient(app)
 EXAMPLES_DIR = Path(__file__).parent / "examples"
@@ -95,14 +101,96 @@ class TestDocumentUpdate:
 
         assert response.status_code == 422
 
+    def test_update_is_a_single_statement(self, db_session):
+        """
+        Scenario: Editing a record in one round trip
+
+        GIVEN an existing document
+        WHEN the user sends a PUT request with a new medical record
+        THEN the system should:
+          1. Run a single UPDATE returning the row, with no SELECT
+          2. Not send the stored text back, and return the edited record
+        """
+        document_id = self._create_document_in_db(db_session)
+        if not engine.dialect.update_returning:
+            pytest.skip("Database without UPDATE ... RETURNING")
+
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(" ".join(statement.split()))
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        try:
+            response = self._update_document(
+                document_id, {"pet_info": {"name": "Updated Rex"}}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+
+        assert response.status_code == 200
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE documents SET")
+        assert "extracted_text" not in statements[0]
+        data = response.json()
+        assert data["extracted_text"] is None
+        assert data["medical_record"]["pet_info"]["name"] == "Updated Rex"
+
+    def test_projections_read_only_their_columns(self, db_session):
+        """
+        Scenario: Loading and editing a document without its heavy columns
+
+        GIVEN an existing document with extracted text
+        WHEN it is loaded with the metadata projection, its text is read and
+        its record is replaced and saved
+        THEN the system should:
+          1. Leave the text, record and report out of the load
+          2. Read only the text column when the text is first accessed
+          3. Write the record without reading the row or writing the text
+        """
+        document_id = self._create_document_in_db(db_session)
+        repository = SQLDocumentRepository(db_session)
+        bind = db_session.get_bind()
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(" ".join(statement.split()))
+
+        event.listen(bind, "before_cursor_execute", record_statement)
+        try:
+            document = repository.get_by_id(document_id, PROJECTION_METADATA)
+            loaded = list(statements)
+            assert document.extracted_text == "Initial text"
+            text_load = statements[len(loaded):]
+            document.medical_record = MedicalRecord(pet_info=PetInfo(name="Rex"))
+            written = len(statements)
+            repository.update(document)
+            update = statements[written:]
+        finally:
+            event.remove(bind, "before_cursor_execute", record_statement)
+
+        heavy = ("extracted_text", "medical_record_data", "extraction_report")
+        assert len(loaded) == 1
+        assert not any(column in loaded[0] for column in heavy)
+        assert not document.is_loaded("extraction_report")
+        assert len(text_load) == 1
+        assert text_load[0].startswith("SELECT documents.extracted_text FROM")
+        assert len(update) == 1
+        assert update[0].startswith("UPDATE documents SET medical_record_data=")
+        assert "extracted_text" not in update[0]
+        db_session.expire_all()
+        stored = db_session.get(DocumentSchema, document_id)
+        assert stored.extracted_text == "Initial text"
+        assert stored.medical_record_data["pet_info"]["name"] == "Rex"
+
     def _create_document_in_db(self, session) -> str:
         doc_id = str(uuid.uuid4())
         document = DocumentSchema(
             id=doc_id,
             filename="test_doc.txt",
             file_type="txt",
-            file_size=100,
-            file_data=b"test content",
+            file_size=len(b"test content"),
+            file_hash=blob_hash(b"test content"),
             extracted_text="Initial text",
             medical_record_data={},
         )
@@ -1,8 +1,36 @@
+import hashlib
+import logging
 import pytest
+import shutil
+import threading
+import time
 from pathlib import Path
 from io import BytesIO
 from fastapi.testclient import TestClient
+from dataclasses import asdict
 from app.main import app
+from app.core import warmup
+from app.core.dependencies import get_blob_store, get_text_extractor
+from app.domain.document_service import DocumentService
+from app.domain.medical_record_extractor import IncrementalExtraction
+from app.domain.text_extractor import TextExtractor
+from app.adapters.cache.cached_medical_record_extractor import (
+    CachedMedicalRecordExtractor,
+)
+from app.adapters.cache.memory_cache import LRUMemoryCache
+from app.adapters.ocr.cached_text_extractor import CachedTextExtractor
+from app.domain.models.text_extraction import TextExtraction
+from app.adapters.cache.tiered_cache import TieredCache
+from app.adapters.postgres.schema.DocumentSchema import DocumentSchema
+from app.adapters.postgres.sql_repository import SQLDocumentRepository
+from app.adapters.spacy.extractors.instrumentation import (
+    extractor_metrics,
+    instrumented,
+)
+from app.adapters.spacy.spacy_medical_record_extractor import (
+    SpacyMedicalRecordExtractor,
+)
+from benchmarks.synthetic_corpus import generate_corpus
 
 client = TestClient(app)
 EXAMPLES_DIR = Path(__file__).parent / "examples"
@@ -78,6 +106,84 @@ class TestDocumentUpload:
         if "scan" in filename or "history" in filename:
             assert len(data["extracted_text"]) > 0
 
+    def test_upload_utf16_text_file(self):
+        """
+        Scenario: Uploading a text file exported as UTF-16
+
+        GIVEN a clinical history saved as UTF-16 with a byte order mark
+        WHEN uploaded
+        THEN the text should be decoded with its accents intact
+        """
+        content = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+        response = self._upload_content(
+            "utf16_history.txt", content.encode("utf-16"), "text/plain"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "BOS PARQUE OESTE" in data["extracted_text"]
+        assert "después" in data["extracted_text"]
+        assert data["medical_record"]["veterinary_info"]["clinic_name"] == "BOS PARQUE OESTE"
+
+    def test_upload_docx_with_tab_stops_and_text_box(self):
+        """
+        Scenario: Uploading a Word document with tab stops and a text box
+
+        GIVEN a DOCX whose paragraphs define tab stops, one of them with a
+        text box stored both as a drawing and as its VML fallback
+        WHEN uploaded
+        THEN only the tabs typed in the text should be kept, and the text
+        box read once without breaking the paragraph around it
+        """
+        response = self._upload_example("tab_stops_text_box.docx")
+
+        assert response.status_code == 200
+        assert response.json()["extracted_text"].split("\n") == [
+            "Paciente:\tMax",
+            "Nota:\ten ayunas",
+            "Motivo: vomitos desde ayer",
+            "Peso: 12 kg",
+        ]
+
+    def test_pdf_with_text_layer_is_read_without_ocr(self):
+        """
+        Scenario: Uploading a PDF that already carries embedded text
+
+        GIVEN a PDF generated by clinic software with a text layer
+        WHEN uploaded
+        THEN the system should read the text layer instead of running OCR
+        and report how many pages took each path
+        """
+        if shutil.which("pdftotext") is None:
+            pytest.skip("Poppler is not installed")
+
+        response = self._upload_example("text_layer.pdf")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "BOS PARQUE OESTE" in data["extracted_text"]
+        assert data["extraction_report"]["pages_by_method"] == {"text_layer": 1}
+
+    @pytest.mark.parametrize("file_format", ["txt", "docx"])
+    def test_upload_synthetic_history(self, file_format):
+        """
+        Scenario: Uploading a generated benchmark history
+
+        GIVEN a synthetic clinical history with 12 visits over 3 pages
+        WHEN uploaded
+        THEN every visit and the pet data should be extracted
+        """
+        filename, _, content = generate_corpus(
+            1, [file_format], visits=12, pages=3, seed=7
+        )[0]
+        response = self._upload_content(filename, content, "application/octet-stream")
+
+        assert response.status_code == 200
+        record = response.json()["medical_record"]
+        assert len(record["visits"]) == 12
+        assert record["pet_info"]["name"]
+        assert record["pet_info"]["species"]
+
     def test_upload_duplicate_files_creates_separate_entries(self):
         """
         Scenario: Uploading the same file twice
@@ -93,6 +199,279 @@ class TestDocumentUpload:
         assert response2.status_code == 200
         assert response1.json()["document_id"] != response2.json()["document_id"]
 
+    def test_identical_uploads_share_one_blob(self, db_session):
+        """
+        Scenario: Storing the original file of an upload
+
+        GIVEN the same file uploaded twice
+        WHEN the documents are stored
+        THEN both rows should keep only the file's SHA-256 and size, and
+        reference a single copy of the file in the blob store
+        """
+        content = (EXAMPLES_DIR / "medical_record.txt").read_bytes() + b"\nblob"
+        response1 = self._upload_content("blob_a.txt", content, "text/plain")
+        response2 = self._upload_content("blob_b.txt", content, "text/plain")
+
+        rows = [
+            db_session.get(DocumentSchema, response.json()["document_id"])
+            for response in (response1, response2)
+        ]
+        assert rows[0].file_hash == hashlib.sha256(content).hexdigest()
+        assert rows[1].file_hash == rows[0].file_hash
+        assert rows[0].file_size == len(content)
+        assert not hasattr(rows[0], "file_data")
+        assert get_blob_store().get(rows[0].file_hash) == content
+
+    def test_repeat_upload_is_served_from_ocr_cache(self):
+        """
+        Scenario: Uploading the same file again
+
+        GIVEN a file that has already been processed
+        WHEN uploaded again
+        THEN the extracted text should be served from the OCR cache
+        """
+        hits_before = client.get("/api/v1/metrics/cache").json()["ocr"]["hits"]
+
+        response1 = self._upload_example("medical_record.txt")
+        response2 = self._upload_example("medical_record.txt")
+
+        hits_after = client.get("/api/v1/metrics/cache").json()["ocr"]["hits"]
+        assert response2.json()["extracted_text"] == response1.json()["extracted_text"]
+        assert hits_after >= hits_before + 1
+
+    def test_memory_cache_is_bounded_by_bytes(self):
+        """
+        Scenario: Caching texts larger than the memory tier allows
+
+        GIVEN a memory cache of 1000 bytes
+        WHEN two 400 byte texts are cached and a third one after them, and
+        then a text larger than the whole cache
+        THEN the least recently used text should be evicted to stay within
+        1000 bytes, and the oversized text should not be kept
+        """
+        cache = LRUMemoryCache(max_bytes=1000)
+        texts = {key: {"text": key * 388} for key in "abc"}
+
+        cache.set("a", texts["a"])
+        cache.set("b", texts["b"])
+        cache.get("a")
+        cache.set("c", texts["c"])
+        cache.set("d", {"text": "d" * 1000})
+
+        assert cache.get("a") == texts["a"]
+        assert cache.get("b") is None
+        assert cache.get("c") == texts["c"]
+        assert cache.get("d") is None
+        stats = cache.stats()
+        assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 800, 1)
+
+    def test_reprocessed_text_is_served_from_record_cache(self):
+        """
+        Scenario: Uploading a document whose text was already extracted
+
+        GIVEN a document that has already been processed
+        WHEN a file with the same text is uploaded again
+        THEN its medical record should be served from the record cache
+        """
+        content = (EXAMPLES_DIR / "clinical_history_1.txt").read_bytes()
+        response1 = self._upload_content("history_a.txt", content, "text/plain")
+        hits_before = client.get("/api/v1/metrics/cache").json()["medical_record"]["hits"]
+
+        # Different bytes, so the OCR cache misses but the text is the same
+        response2 = self._upload_content(
+            "history_b.txt", content.replace(b"\n", b"\r\n"), "text/plain"
+        )
+
+        metrics = client.get("/api/v1/metrics/cache").json()["medical_record"]
+        assert metrics["hits"] == hits_before + 1
+        assert 0 < metrics["hit_rate"] <= 1
+        assert response2.json()["medical_record"] == response1.json()["medical_record"]
+
+    def test_pipelined_upload_of_text_read_in_one_go(self, db_session):
+        """
+        Scenario: Uploading a long text file with pipelined extraction on
+
+        GIVEN a text file longer than spaCy's max_length, which is not read
+        page by page
+        WHEN it is uploaded twice with the pipelined mode on
+        THEN its record should be extracted in chunks as without the
+        pipelined mode, and the second upload served from the record cache
+        """
+        spacy_extractor = SpacyMedicalRecordExtractor(chunk_chars=1500)
+        spacy_extractor.nlp.max_length = 2000
+        cache = TieredCache(LRUMemoryCache())
+        service = DocumentService(
+            SQLDocumentRepository(db_session),
+            get_text_extractor(),
+            CachedMedicalRecordExtractor(spacy_extractor, cache),
+            pipelined=True,
+            blob_store=get_blob_store(),
+        )
+        content = (EXAMPLES_DIR / "clinical_history_1.txt").read_bytes()
+
+        first = service.create_document("pipelined_a.txt", "txt", content)
+        second = service.create_document("pipelined_b.txt", "txt", content)
+
+        expected = spacy_extractor.extract(first.extracted_text.strip())
+        assert len(first.medical_record.visits) > 1
+        assert asdict(first.medical_record) == asdict(expected)
+        assert asdict(second.medical_record) == asdict(expected)
+        assert cache.stats()["hits"] == 1
+
+    def test_pipelined_extraction_error_falls_back_to_whole_text(
+        self, db_session, caplog
+    ):
+        """
+        Scenario: Page by page record extraction failing half way
+
+        GIVEN a record extractor whose page by page extraction raises
+        WHEN a multi-page document is uploaded with the pipelined mode on
+        THEN the error should be logged and the record extracted from the
+        whole text instead of being dropped
+        """
+        spacy_extractor = SpacyMedicalRecordExtractor()
+
+        class FailingPages(IncrementalExtraction):
+            def add_page(self, text):
+                raise RuntimeError("page parser crashed")
+
+        spacy_extractor.start_incremental = lambda: FailingPages(spacy_extractor)
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+        service = self._pipelined_service(db_session, spacy_extractor, text, "\n")
+
+        with caplog.at_level(logging.ERROR):
+            document = service.create_document("history.pdf", "pdf", b"%PDF-1.4")
+
+        assert "page parser crashed" in caplog.text
+        assert document.medical_record is not None
+        assert asdict(document.medical_record) == asdict(
+            spacy_extractor.extract(document.extracted_text)
+        )
+
+    def test_pipelined_pages_differing_only_in_line_breaks(self, db_session):
+        """
+        Scenario: Streamed pages whose line breaks differ from the final text
+
+        GIVEN a text extractor streaming pages with Windows line breaks and
+        returning the text with Unix ones
+        WHEN the document is uploaded with the pipelined mode on
+        THEN the record extracted page by page should be kept, without
+        extracting the whole text again
+        """
+        spacy_extractor = SpacyMedicalRecordExtractor()
+        text = (EXAMPLES_DIR / "clinical_history_1.txt").read_text(encoding="utf-8")
+        expected = spacy_extractor.extract(text.strip())
+        whole_text_calls = []
+        extract = spacy_extractor.extract
+
+        def counting_extract(text):
+            whole_text_calls.append(text)
+            return extract(text)
+
+        spacy_extractor.extract = counting_extract
+        service = self._pipelined_service(db_session, spacy_extractor, text, "\r\n")
+
+        document = service.create_document("history.pdf", "pdf", b"%PDF-1.4")
+
+        assert whole_text_calls == []
+        assert asdict(document.medical_record) == asdict(expected)
+
+    def test_extractor_calls_are_instrumented(self):
+        """
+        Scenario: Finding out which extractor is slow on a document
+
+        GIVEN a clinical history that has not been processed before
+        WHEN uploaded
+        THEN every extractor call should be aggregated with its duration,
+        input size and matches in the extraction metrics
+        """
+        before = client.get("/api/v1/metrics/extraction").json()["extractors"]
+
+        content = (EXAMPLES_DIR / "clinical_history_1.txt").read_bytes()
+        self._upload_content(
+            "instrumented_history.txt", content + b"\nInstrumented", "text/plain"
+        )
+
+        after = client.get("/api/v1/metrics/extraction").json()["extractors"]
+        for name in [
+            "medical_record",
+            "nlp",
+            "pet_info",
+            "veterinary_info",
+            "visits",
+            "visits.section",
+            "visits.physical_examination",
+            "visits.medication",
+            "visits.laboratory_test",
+        ]:
+            calls_before = before.get(name, {}).get("calls", 0)
+            assert after[name]["calls"] > calls_before, name
+            assert after[name]["input_chars"] > 0, name
+            assert after[name]["p50_seconds"] <= after[name]["max_seconds"], name
+        assert after["visits"]["matches"] > before.get("visits", {}).get("matches", 0)
+
+    def test_upload_with_fast_extraction_mode(self):
+        """
+        Scenario: Choosing the fast extraction mode for an upload
+
+        GIVEN a clinical history whose key fields the regexes can find
+        WHEN uploaded with the fast extraction mode
+        THEN the medical record should be the same as with full NLP
+        """
+        content = (EXAMPLES_DIR / "clinical_history_1.txt").read_bytes()
+        nlp_response = client.post(
+            "/api/v1/document",
+            params={"extraction_mode": "nlp"},
+            files={"file": ("nlp_history.txt", BytesIO(content), "text/plain")},
+        )
+        fast_response = client.post(
+            "/api/v1/document",
+            params={"extraction_mode": "fast"},
+            files={"file": ("fast_history.txt", BytesIO(content), "text/plain")},
+        )
+
+        assert fast_response.status_code == 200
+        assert fast_response.json()["medical_record"] == nlp_response.json()["medical_record"]
+
+    def test_reject_unsupported_extraction_mode(self):
+        """
+        Scenario: Uploading with an unknown extraction mode
+
+        GIVEN an extraction mode that does not exist
+        WHEN a file is uploaded with it
+        THEN the system should reject it with a 400 Bad Request
+        """
+        response = client.post(
+            "/api/v1/document",
+            params={"extraction_mode": "fastest"},
+            files={"file": ("history.txt", BytesIO(b"Simple content"), "text/plain")},
+        )
+
+        assert response.status_code == 400
+        assert "unsupported extraction mode" in response.json()["detail"].lower()
+
+    def test_image_pages_run_on_shared_ocr_scheduler(self):
+        """
+        Scenario: OCR work goes through the process-wide scheduler
+
+        GIVEN the shared OCR scheduler
+        WHEN an image is uploaded
+        THEN its page should be run by the scheduler and the queue drained
+        """
+        before = client.get("/api/v1/metrics/ocr").json()["scheduler"]
+
+        self._upload_content(
+            "scheduled_scan.png",
+            (EXAMPLES_DIR / "medical_scan.png").read_bytes() + b"scheduler",
+            "image/png",
+        )
+
+        after = client.get("/api/v1/metrics/ocr").json()["scheduler"]
+        assert after["workers"] >= 1
+        assert after["tesseract_threads"] == 1
+        assert after["completed"] >= before["completed"] + 1
+        assert after["queue_length"] == 0
+
     def test_preserve_special_characters_in_filename(self):
         """
         Scenario: Filenames with special characters
@@ -214,3 +593,108 @@ class TestDocumentUpload:
         return client.post(
             "/api/v1/document", files={"file": (filename, BytesIO(content), mime_type)}
         )
+
+    def _pipelined_service(
+        self, session, extractor, text: str, streamed_line_break: str
+    ) -> DocumentService:
+        # Streams the text five lines a page, with the given line breaks, and
+        # returns it whole with '\n' ones
+        lines = text.strip().split("\n")
+        pages = ["\n".join(lines[i : i + 5]) for i in range(0, len(lines), 5)]
+
+        class PagedTextExtractor(TextExtractor):
+            def extract(self, file_data, file_type):
+                return TextExtraction(text="\n".join(pages))
+
+            def extract_streaming(self, file_data, file_type, on_page):
+                for page in pages:
+                    on_page(page.replace("\n", streamed_line_break))
+                return self.extract(file_data, file_type)
+
+        return DocumentService(
+            SQLDocumentRepository(session),
+            PagedTextExtractor(),
+            extractor,
+            pipelined=True,
+            blob_store=get_blob_store(),
+        )
+
+
+class TestReadiness:
+
+    def test_ready_once_models_are_warmed_up(self):
+        """
+        Scenario: Pod startup
+
+        GIVEN the application starting up
+        WHEN the models have been warmed up in the background
+        THEN the readiness endpoint should report ready, with the database reachable
+        """
+        if shutil.which("tesseract") is None:
+            pytest.skip("tesseract is not installed, OCR warm-up fails")
+        with TestClient(app) as startup_client:
+            deadline = time.monotonic() + 60
+            response = startup_client.get("/ready")
+            while response.status_code == 503 and time.monotonic() < deadline:
+                assert response.json()["status"] == "warming_up"
+                time.sleep(0.1)
+                response = startup_client.get("/ready")
+
+            assert response.status_code == 200
+            assert response.json()["status"] == "ready"
+            assert startup_client.get("/health").json() == {"status": "ok"}
+
+    def test_warm_up_bypasses_caches_and_detects_ocr_reading_nothing(
+        self, monkeypatch
+    ):
+        """
+        Scenario: Warming up with an OCR engine that reads nothing
+
+        GIVEN an OCR engine whose errors come back as empty text, behind the
+        OCR cache, and an instrumented spaCy extractor
+        WHEN the models are warmed up
+        THEN the system should:
+          1. Call the spaCy extractor and the engine past their caches
+          2. Leave the warm-up calls out of the extractor metrics
+          3. Keep the pod unready, with the OCR failure reported by /ready
+        """
+        calls = []
+
+        class SpacyExtractor:
+            @instrumented("warmup.test")
+            def extract(self, text):
+                calls.append("nlp")
+
+        class Engine:
+            def extract(self, file_data, file_type):
+                calls.append("ocr")
+                return TextExtraction(text="")
+
+        spacy_extractor = SpacyExtractor()
+        engine = Engine()
+        cache = TieredCache(LRUMemoryCache())
+        monkeypatch.setattr(warmup.readiness, "models_ready", False)
+        monkeypatch.setattr(warmup.readiness, "error", None)
+        monkeypatch.setattr(
+            warmup, "get_spacy_medical_record_extractor", lambda: spacy_extractor
+        )
+        monkeypatch.setattr(
+            warmup, "get_text_extractor", lambda: CachedTextExtractor(engine, cache)
+        )
+
+        warmup.warm_up()
+
+        assert calls == ["nlp", "ocr"]
+        assert cache.stats()["misses"] == 0
+        assert "warmup.test" not in extractor_metrics.stats()
+        assert not warmup.readiness.models_ready
+        assert "OCR" in warmup.readiness.error
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "warmup_failed"}
+
+        calls.clear()
+        stop = threading.Event()
+        stop.set()
+        warmup.warm_up(stop)
+        assert calls == ["nlp"]
@@ -45,7 +45,8 @@ function App() {
     
     try {
       const response = await axios.put<DocumentResponse>(`/api/v1/document/${document.document_id}`, data);
-      setDocument(response.data);
+      // The edit response leaves the extracted text out, so the one shown is kept
+      setDocument(prev => ({ ...response.data, extracted_text: prev?.extracted_text }));
       setShowSuccessModal(true);
     } catch (err) {
       console.error(err);